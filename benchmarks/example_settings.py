@@ -0,0 +1,108 @@
+"""
+Run simojio modules with their bundled example settings (modules/<name>/example_setting.json) without the GUI.
+
+The setting is read with the SettingManager and resolved into a module input container as done by the module executor.
+Plots and callbacks that the module puts into its queue are collected in a list instead of being sent to the plot
+window.
+"""
+
+import copy
+import json
+import os
+import sys
+import tempfile
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+simojio_path = os.path.join(root_path, "simojio")
+
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+
+class ResultQueue(list):
+    """Replaces the multiprocessing queue of a module and collects everything that is put into it."""
+
+    def put(self, item):
+        self.append(item)
+
+
+def prepare_working_directory():
+    """Module and resource paths are relative to the simojio folder (as for the GUI, see main.py)."""
+
+    import matplotlib
+    matplotlib.use("Agg")   # no plot window, figures are only collected
+
+    from simojio.main import __version__
+
+    os.chdir(simojio_path)
+
+    # the SettingManager reads the version from the product info which is written by main.py on startup
+    if not os.path.exists("product-info.json"):
+        json_file = open("product-info.json", 'w', encoding='utf-8')
+        json.dump({"name": "simojio", "version": __version__}, json_file, sort_keys=True, indent=4)
+        json_file.close()
+
+
+def load_example_setting(module_name: str, sample_idx=0, evaluation_set_idx=0):
+    """
+    Read the example setting of a module and return the module class and the input container of the given sample.
+    :return: module_cls, input_container
+    """
+
+    prepare_working_directory()
+
+    from simojio.lib.SettingManager import SettingManager
+    from simojio.lib.VariationContainer import VariationContainer
+    import simojio.lib.BasicFunctions as BasicFunctions
+
+    setting_path = os.path.join("modules", module_name, "example_setting.json")
+    global_settings, sample_list, success = SettingManager().read_setting(setting_path)
+    if len(sample_list) == 0:
+        raise ValueError("No samples found in " + setting_path)
+
+    sample = sample_list[sample_idx]
+
+    # write the layer values back into the layer parameters of the current module (as done by the parameter widgets)
+    for layer in sample.get_layer_list():
+        layer.set_parameters(layer.get_all_parameters_content())
+
+    variation_container = VariationContainer(sample, global_settings)
+    input_container = variation_container.get_input_container_single(evaluation_set_idx)
+
+    module_cls = BasicFunctions.get_module_class_from_path_given_as_list(global_settings.module_path)
+
+    return module_cls, input_container
+
+
+def run_module(module_cls, input_container, generic_parameter_values=None):
+    """
+    Run a module (as done by the SingleModuleProcess) and return the module instance after the run.
+    :param generic_parameter_values: {parameter name: value} that replace the values given in the input container
+    """
+
+    from simojio.lib.parameters import NestedParameter
+
+    generic_parameters = copy.deepcopy(input_container.generic_parameters)
+    if generic_parameter_values is not None:
+        for parameter in generic_parameters:
+            if parameter.name in generic_parameter_values:
+                if isinstance(parameter, NestedParameter):
+                    value, valid_value = parameter.set_parameter_values(generic_parameter_values[parameter.name])
+                else:
+                    value, valid_value = parameter.set_value(generic_parameter_values[parameter.name])
+                if not valid_value:
+                    raise ValueError("Invalid value for parameter '" + parameter.name + "': "
+                                     + str(generic_parameter_values[parameter.name]))
+
+    module = module_cls()
+    module.queue = ResultQueue()
+    module.simoji_save_dir = tempfile.mkdtemp(prefix="simojio_benchmark_")
+
+    module.generic_parameters = generic_parameters
+    module.evaluation_set_parameters = input_container.evaluation_set_parameters
+    if module.has_layers():
+        module.layer_list = input_container.layer_list
+
+    module.run()
+
+    return module
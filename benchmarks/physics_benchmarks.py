@@ -0,0 +1,307 @@
+"""
+Benchmark suite of the physics hot paths of the simojio modules.
+
+All inputs are fixed and available offline: synthetic layer stacks built from the bundled optical constants
+(modules/shared_resources/optical_constants), the bundled example settings and the SriPlotter example data. Each benchmark
+consists of a setup (not timed) that returns the function to be timed. Every benchmark is run once for warm-up (e.g.
+compilation of the numba kernels, file system caches) and then several times. The minimum, median and mean run times are
+stored in a JSON file together with the git commit and the versions of the main dependencies.
+
+Two result files (e.g. of two commits) can be compared with --compare. Benchmarks that got slower than the threshold
+are marked as regressions (exit code 1).
+
+Usage (from the top level folder):
+    python benchmarks/physics_benchmarks.py [--repeat 5] [--filter transfer_matrix] [--output results.json]
+    python benchmarks/physics_benchmarks.py --compare old_results.json new_results.json [--threshold 1.2]
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import example_settings
+
+# -- synthetic transfer matrix inputs --
+layer_counts = [4, 16, 64]                                  # number of layers between the two semi-infinite layers
+grid_sizes = [(51, 46), (201, 181)]                         # (number of wavelengths, number of angles)
+stack_materials = ["TiO2.fmf", "SiO2.fmf", "organic.fmf"]   # repeated between glass (top) and air (bottom)
+stack_thicknesses = [60., 90., 50.]                         # (nm) of the stack materials
+
+# -- SriCorrection inputs (geometry of the SriSimulator defaults) --
+sri_correction_angles = np.arange(0., 85., 1.)
+sri_correction_wavelengths = np.arange(400., 801., 4.)
+
+# -- AngleSpectrumReader inputs (processing parameters of the SriPlotter example setting) --
+sri_data_path = os.path.join("modules", "SriPlotter", "example_data")
+sri_processing_parameters = {"angles": list(np.arange(5., 90.1, 5.)), "wavelengths": list(np.arange(500., 700.1, 2.)),
+                             "reference_angle": 10., "angle_offset": 0., "boxcar": 20, "cycle": 0, "normalize": True}
+
+# -- VariationContainerEvaluationSet inputs (RTA example setting with a fine variation grid) --
+variation_variables = {"VAR_0": [69., 0., 200., 1., True], "VAR_1": [104., 0., 200., 1., True]}
+nb_variation_input_containers = 200
+
+
+@functools.lru_cache(maxsize=None)
+def get_nk(material_file: str, wavelengths: tuple) -> np.array:
+    """Complex refractive index of a bundled material interpolated to the wavelengths"""
+
+    from simojio.modules.RTA.MaterialFileReader import MaterialFileReader
+
+    material_path = os.path.join("modules", "shared_resources", "optical_constants", material_file)
+    wl_list, n_list, k_list = MaterialFileReader().read_optical_constants_from_fmf_file(material_path)
+
+    return np.interp(wavelengths, wl_list, n_list) + 1.j * np.interp(wavelengths, wl_list, k_list)
+
+
+def get_transfer_matrix(nb_layers: int, nb_wavelengths: int, nb_angles: int):
+    """TransferMatrix of glass | nb_layers x (TiO2, SiO2, organic) | air with propagation angles set in the glass"""
+
+    from simojio.modules.RTA.TransferMatrix import TransferMatrix
+    from simojio.modules.RTA.Polarization import Polarization
+
+    wavelengths = tuple(np.linspace(400., 800., nb_wavelengths))
+
+    materials = ["glass.fmf"] + [stack_materials[i % len(stack_materials)] for i in range(nb_layers)] + ["air.fmf"]
+    thicknesses = [0.] + [stack_thicknesses[i % len(stack_thicknesses)] for i in range(nb_layers)] + [0.]
+
+    transfer_matrix = TransferMatrix(nk_list=[get_nk(material, wavelengths) for material in materials],
+                                     thickness_list=thicknesses, vacuum_wavelengths_list=np.array(wavelengths))
+    transfer_matrix.set_polarization(Polarization.S)
+    transfer_matrix.set_angles(list(np.linspace(0., 89., nb_angles)), layer_idx=0)
+
+    return transfer_matrix
+
+
+def setup_run_tm(nb_layers: int, nb_wavelengths: int, nb_angles: int):
+    transfer_matrix = get_transfer_matrix(nb_layers, nb_wavelengths, nb_angles)
+    return transfer_matrix.run_tm
+
+
+def setup_run_tm_sub_stack(nb_layers: int, nb_wavelengths: int, nb_angles: int):
+    """Sub-stack from the bottom (air) up to the glass, i.e. the stack in reversed order"""
+
+    transfer_matrix = get_transfer_matrix(nb_layers, nb_wavelengths, nb_angles)
+    layer_indices = list(range(nb_layers + 2))[::-1]
+    return functools.partial(transfer_matrix.run_tm_sub_stack, layer_indices=layer_indices)
+
+
+def setup_module_run(module_name: str):
+    module_cls, input_container = load_example_setting_cached(module_name)
+    return functools.partial(example_settings.run_module, module_cls, input_container)
+
+
+@functools.lru_cache(maxsize=None)
+def load_example_setting_cached(module_name: str):
+    return example_settings.load_example_setting(module_name)
+
+
+def setup_sri_correction():
+
+    from simojio.modules.SriSimulator.SriCorrection import SriCorrection
+
+    sri_correction = SriCorrection()
+    sri_correction.set_emission_point(x=0., z=-1.)
+    sri_correction.set_substrate(thickness=1.1, n=1.5)
+    sri_correction.set_cylinder(x=0., z=0., radius=20., n=1.5)
+    sri_correction.add_lens(x=0., z=0., f=50., overlap_focus_with_last_lens_focus=True, shift_z=0.)
+    sri_correction.add_lens(x=0., z=0., f=11., overlap_focus_with_last_lens_focus=True, shift_z=139.)
+    sri_correction.set_detector(x=0., z=0., width=0.4, NA=0.1, tilt_angle=0., place_in_last_lens_focus=True,
+                                shift_z=0.2)
+
+    # Lambertian emitter with a gaussian spectrum (wavelength, angle)
+    spectrum = np.exp(-0.5 * ((sri_correction_wavelengths - 600.) / 40.) ** 2)
+    intensities = np.outer(spectrum, np.cos(sri_correction_angles * np.pi / 180.))
+
+    return functools.partial(sri_correction.calculate_sri_correction, sri_correction_angles,
+                             sri_correction_wavelengths, intensities)
+
+
+def setup_angle_spectrum_reader(drift_fit_type_value: str):
+
+    from simojio.modules.SriPlotter.AngleSpectrumReader import AngleSpectrumReader
+    from simojio.modules.SriPlotter.FitType import FitType
+
+    # no cache, i.e. the files are read and processed in each run
+    return functools.partial(AngleSpectrumReader().read_angle_spectrum_from_path, sri_data_path,
+                             drift_fit_type=FitType(drift_fit_type_value), **sri_processing_parameters)
+
+
+def setup_variation_container():
+
+    from simojio.lib.SettingManager import SettingManager
+    from simojio.lib.VariationContainerEvaluationSet import VariationContainerEvaluationSet
+
+    example_settings.prepare_working_directory()
+    global_settings, sample_list, success = SettingManager().read_setting(
+        os.path.join("modules", "RTA", "example_setting.json"))
+    sample = sample_list[0]
+    for layer in sample.get_layer_list():
+        layer.set_parameters(layer.get_all_parameters_content())
+    sample.variables.set_values(dict(variation_variables))
+
+    def run():
+        variation_container = VariationContainerEvaluationSet(sample, global_settings, evaluation_set_idx=0)
+        variation_container.get_variation_grid()
+        for variation_idx in range(nb_variation_input_containers):
+            variation_container.get_input_container_for_variation(variation_idx)
+
+    return run
+
+
+def get_benchmarks() -> dict:
+    """{benchmark name: setup function}, the setup function returns the function to be timed"""
+
+    benchmarks = {}
+
+    for nb_layers in layer_counts:
+        for nb_wavelengths, nb_angles in grid_sizes:
+            parameters_str = "[layers=" + str(nb_layers) + ",grid=" + str(nb_wavelengths) + "x" + str(nb_angles) + "]"
+            benchmarks["transfer_matrix.run_tm" + parameters_str] = functools.partial(
+                setup_run_tm, nb_layers, nb_wavelengths, nb_angles)
+            benchmarks["transfer_matrix.run_tm_sub_stack" + parameters_str] = functools.partial(
+                setup_run_tm_sub_stack, nb_layers, nb_wavelengths, nb_angles)
+
+    benchmarks["oled_optics.run[example_setting]"] = functools.partial(setup_module_run, "OledOptics")
+    benchmarks["rta.run[example_setting]"] = functools.partial(setup_module_run, "RTA")
+
+    benchmarks["sri_correction.calculate_sri_correction[" + str(len(sri_correction_wavelengths)) + "x"
+               + str(len(sri_correction_angles)) + "]"] = setup_sri_correction
+
+    benchmarks["angle_spectrum_reader.read_angle_spectrum_from_path[drift=no]"] = functools.partial(
+        setup_angle_spectrum_reader, "no")
+    benchmarks["angle_spectrum_reader.read_angle_spectrum_from_path[drift=linear]"] = functools.partial(
+        setup_angle_spectrum_reader, "linear")
+
+    grid_size = np.prod([len(np.arange(values[1], values[2] + values[3], values[3]))
+                         for values in variation_variables.values()])
+    benchmarks["variation_container.input_containers[grid=" + str(grid_size) + "]"] = setup_variation_container
+
+    return benchmarks
+
+
+def run_benchmark(setup_function, repeat: int) -> dict:
+    """Warm-up run and repeat timed runs (each with a new setup)"""
+
+    import matplotlib.pyplot as plt
+
+    run_times = []
+    for i in range(repeat + 1):
+        function = setup_function()
+        start_time = time.perf_counter()
+        function()
+        run_time = time.perf_counter() - start_time
+        plt.close('all')    # figures of the module runs
+        if i > 0:
+            run_times.append(run_time)
+
+    return {"min": float(np.min(run_times)), "median": float(np.median(run_times)),
+            "mean": float(np.mean(run_times)), "repeat": repeat}
+
+
+def get_environment_info() -> dict:
+
+    import scipy
+    from simojio.main import __version__
+    from simojio.modules.RTA import compiled_kernels
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=example_settings.root_path, capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = None
+
+    return {"commit": commit,
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "simojio": __version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "numba kernels": compiled_kernels.is_available,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu count": os.cpu_count()}
+
+
+def run_benchmarks(repeat: int, name_filter=None) -> dict:
+
+    example_settings.prepare_working_directory()
+
+    environment = get_environment_info()
+    print("Benchmarks (commit " + str(environment["commit"]) + ")")
+
+    results = {}
+    for name, setup_function in get_benchmarks().items():
+        if (name_filter is not None) and (name_filter not in name):
+            continue
+        results[name] = run_benchmark(setup_function, repeat)
+        print("{:<80}{:>10.4f} s".format(name, results[name]["min"]))
+
+    return {"environment": environment, "results": results}
+
+
+def compare_results(old_file_path: str, new_file_path: str, threshold: float) -> bool:
+    """
+    Print the ratio of the minimum run times (new / old) of all benchmarks in both files.
+    :return: True if any benchmark got slower than the threshold ratio
+    """
+
+    with open(old_file_path, 'r', encoding='utf-8') as old_file:
+        old = json.load(old_file)
+    with open(new_file_path, 'r', encoding='utf-8') as new_file:
+        new = json.load(new_file)
+
+    print("old: commit " + str(old["environment"]["commit"]) + " (" + old["environment"]["date"] + ")")
+    print("new: commit " + str(new["environment"]["commit"]) + " (" + new["environment"]["date"] + ")")
+
+    any_regression = False
+    for name in new["results"]:
+        if name not in old["results"]:
+            continue
+        ratio = new["results"][name]["min"] / old["results"][name]["min"]
+        is_regression = ratio > threshold
+        any_regression = any_regression or is_regression
+        print("{:<80}{:>8.2f}{}".format(name, ratio, "  REGRESSION" if is_regression else ""))
+
+    return any_regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per benchmark")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this string")
+    parser.add_argument("--output", default=None, help="JSON file for the results (default: results_<commit>.json "
+                                                       "in the benchmarks folder)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), default=None,
+                        help="compare two result files instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="run time ratio (new / old) above which a benchmark is a regression")
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        sys.exit(1 if compare_results(*args.compare, threshold=args.threshold) else 0)
+
+    output_path = args.output
+    if output_path is not None:
+        output_path = os.path.abspath(output_path)   # the working directory is changed to the simojio folder
+
+    benchmark_results = run_benchmarks(args.repeat, args.filter)
+
+    if output_path is None:
+        commit_str = str(benchmark_results["environment"]["commit"])[:10]
+        output_path = os.path.join(example_settings.root_path, "benchmarks", "results_" + commit_str + ".json")
+
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump(benchmark_results, output_file, indent=4)
+    print("Results written to " + output_path)
+
+
+if __name__ == "__main__":
+    main()
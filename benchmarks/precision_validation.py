@@ -0,0 +1,99 @@
+"""
+Compare the single precision (complex64) mode of OledOptics against the double precision (complex128) reference.
+
+The bundled example setting (modules/OledOptics/example_setting.json) is run in both precision modes. For each numerical
+result and each calculated spectrum (power dissipation K, SRI) the maximum deviation relative to the maximum absolute
+value of the reference is reported together with the run times. The script fails (exit code 1) if any deviation exceeds
+the tolerance.
+
+The largest deviations occur in the power dissipation spectrum close to u = 1 (grazing emission), where the terms 1 +/- r
+of the reflection coefficient cancel and the single precision rounding of r is amplified. Integrated quantities (EQE,
+loss channels) and the SRI are much less affected.
+
+Usage (from the top level folder):
+    python benchmarks/precision_validation.py [--tolerance 1e-2] [--repeat 1]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import example_settings
+
+module_name = "OledOptics"
+precision_parameter_name = "precision"
+
+# spectra (module attributes) that are compared in addition to the results dict
+spectra_attributes = {"power dissipation K": "K_eml", "SRI": "sri"}
+
+
+def run_with_precision(module_cls, input_container, precision: str, repeat: int):
+    """Run the module and return the module instance of the fastest run and its run time."""
+
+    best_time = np.inf
+    module = None
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        module = example_settings.run_module(module_cls, input_container, {precision_parameter_name: precision})
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    return module, best_time
+
+
+def get_relative_deviation(reference, value) -> float:
+    """Maximum absolute deviation normalized to the maximum absolute value of the reference"""
+
+    reference = np.asarray(reference, dtype=float)
+    value = np.asarray(value, dtype=float)
+    scale = np.nanmax(np.abs(reference))
+    if scale == 0.:
+        scale = 1.
+    return float(np.nanmax(np.abs(value - reference)) / scale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tolerance", type=float, default=1e-2, help="maximum relative deviation")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs per precision (the fastest one is shown)")
+    args = parser.parse_args()
+
+    from simojio.modules.RTA.Precision import Precision
+
+    module_cls, input_container = example_settings.load_example_setting(module_name)
+
+    reference, reference_time = run_with_precision(module_cls, input_container, Precision.DOUBLE.value, args.repeat)
+    fast, fast_time = run_with_precision(module_cls, input_container, Precision.SINGLE.value, args.repeat)
+
+    deviations = {}
+
+    reference_results = reference.get_results_dict()
+    fast_results = fast.get_results_dict()
+    for name in reference_results:
+        if reference_results[name] is not None:
+            deviations[name] = get_relative_deviation(reference_results[name], fast_results[name])
+
+    for name, attribute in spectra_attributes.items():
+        if getattr(reference, attribute) is not None:
+            deviations[name] = get_relative_deviation(np.real(getattr(reference, attribute)),
+                                                      np.real(getattr(fast, attribute)))
+
+    print("Precision validation of " + module_name + " (example setting)")
+    print("run time " + Precision.DOUBLE.value + ": " + "{:.3f}".format(reference_time) + " s")
+    print("run time " + Precision.SINGLE.value + ": " + "{:.3f}".format(fast_time) + " s")
+    print("")
+    print("maximum relative deviation:")
+    for name, deviation in deviations.items():
+        print("  " + name.ljust(30) + "{:.2e}".format(deviation))
+
+    failed = [name for name, deviation in deviations.items() if not deviation <= args.tolerance]
+    if len(failed) > 0:
+        print("\nFAILED: deviation above tolerance (" + str(args.tolerance) + ") for " + ", ".join(failed))
+        sys.exit(1)
+
+    print("\nOK: all deviations below tolerance (" + str(args.tolerance) + ")")
+
+
+if __name__ == "__main__":
+    main()
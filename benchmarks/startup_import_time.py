@@ -0,0 +1,87 @@
+"""
+Measure the import time of the GUI launch path with 'python -X importtime' and check it against a startup budget.
+
+The GUI modules are imported and the available simojio modules are listed (as done when the main window is created) in a
+fresh interpreter. The script fails (exit code 1) if the import time exceeds the budget or if one of the packages which
+are not needed for the startup (e.g. scipy) is imported.
+
+Usage (from the top level folder):
+    python benchmarks/startup_import_time.py [--budget 1.5] [--repeat 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+startup_code = "; ".join([
+    "import PySide6.QtWidgets",
+    "app = PySide6.QtWidgets.QApplication([])",    # as in main.py, the application is created before the main window
+    "from simojio.lib.gui.MainWindow import MainWindow",
+    "from simojio.lib.ModuleLoader import ModuleLoader",
+    "ModuleLoader().get_available_modules()"
+])
+
+# packages that must not be imported during the startup (only needed for running modules)
+forbidden_packages = ["scipy"]
+
+
+def measure_import_times() -> dict:
+    """Run the startup code in a new interpreter and return the cumulative import times in seconds {name: time}."""
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([root_path] + [path for path in [env.get("PYTHONPATH")] if path])
+
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", startup_code],
+                             cwd=os.path.join(root_path, "simojio"),  # module paths are relative to this folder
+                             env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError("Startup code failed:\n" + process.stderr)
+
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative_time, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):   # top level import (nested imports are indented)
+            import_times[name.strip()] = int(cumulative_time) * 1e-6
+        else:
+            import_times.setdefault(name.strip(), 0.)
+
+    return import_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=1.5, help="maximum import time in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs (the fastest one is evaluated)")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest top level imports shown")
+    args = parser.parse_args()
+
+    runs = [measure_import_times() for _ in range(args.repeat)]
+    import_times = min(runs, key=lambda times: sum(times.values()))
+    total_time = sum(import_times.values())
+
+    print("Slowest top level imports:")
+    for name, import_time in sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print("  {:8.3f} s  {}".format(import_time, name))
+    print("Total import time: {:.3f} s (budget: {:.3f} s)".format(total_time, args.budget))
+
+    failed = False
+    imported_forbidden_packages = [package for package in forbidden_packages
+                                   if any([(name == package) or name.startswith(package + ".")
+                                           for name in import_times])]
+    if len(imported_forbidden_packages) > 0:
+        print("FAILED: Packages imported during startup: " + ", ".join(imported_forbidden_packages))
+        failed = True
+    if total_time > args.budget:
+        print("FAILED: Startup import time exceeds budget.")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compare the numpy and the compiled (numba) backend of the TransferMatrix layer recursion.
+
+The bundled OledOptics example setting (modules/OledOptics/example_setting.json) is run with both backends. Optionally,
+the in-plane wave-vector grid is refined (--u-step) to get a more realistic problem size. The compilation time of the
+numba kernels is measured separately by a warm-up run and not included in the run times.
+
+Additionally, both backends are compared on a small stack whose in-plane wave-vector grid contains kz = 0 in layers
+that are the first layer of an interface (masked kz-values in the numpy implementation).
+
+If numba is not installed, only the numpy backend is measured.
+
+Usage (from the top level folder):
+    python benchmarks/transfer_matrix_backends.py [--repeat 3] [--u-step 0.002]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import example_settings
+
+module_name = "OledOptics"
+
+
+def run_backend(module_cls, input_container, generic_parameter_values: dict, use_compiled_kernels: bool,
+                repeat: int):
+    """Run the module with the given backend and return the module instance and the best run time."""
+
+    from simojio.modules.RTA.TransferMatrix import TransferMatrix
+
+    TransferMatrix.use_compiled_kernels = use_compiled_kernels
+
+    best_time = np.inf
+    module = None
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        module = example_settings.run_module(module_cls, input_container, generic_parameter_values)
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    return module, best_time
+
+
+def get_kz_zero_deviation() -> float:
+    """
+    Maximum deviation of R and T (s, p and both polarizations at once) between the numpy and the numba backend for a
+    stack with kz = 0 in layers that are the first layer of an interface (u = 1 in the top layer and the air gap).
+    """
+
+    from simojio.modules.RTA.TransferMatrix import TransferMatrix
+    from simojio.modules.RTA.Polarization import Polarization
+
+    wavelengths = [450., 550., 650.]
+    nk_list = [[1.] * 3, [1.8 + 0.01j] * 3, [1.] * 3, [1.7 + 0.2j] * 3, [1.5] * 3]
+    thickness_list = [0., 80., 40., 20., 0.]
+    u = np.array([0., 0.4, 0.8, 0.99, 1., 1.01, 1.2, 1.4])    # u = 1: kz = 0 in the top layer and in the air gap
+
+    results = []
+    for use_compiled_kernels in [False, True]:
+        TransferMatrix.use_compiled_kernels = use_compiled_kernels
+        tm = TransferMatrix(nk_list, thickness_list, wavelengths)
+        tm.set_normalized_in_plane_wave_vectors(u, layer_idx=0)
+
+        backend_results = []
+        for polarization in [Polarization.S, Polarization.P]:
+            tm.set_polarization(polarization)
+            tm.run_tm()
+            backend_results += [tm.R, tm.T]
+        both_polarizations_results = tm.run_tm_both_polarizations()
+        for polarization in [Polarization.S, Polarization.P]:
+            backend_results += list(both_polarizations_results[polarization][2:])
+        results.append([np.ma.filled(np.ma.asarray(result, dtype=complex), np.nan) for result in backend_results])
+
+    deviations = [np.nanmax(np.abs(numba_result - numpy_result)) for numpy_result, numba_result in zip(*results)]
+    is_nan_equal = all(np.array_equal(np.isnan(numpy_result), np.isnan(numba_result))
+                       for numpy_result, numba_result in zip(*results))
+
+    return max(deviations) if is_nan_equal else np.inf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per backend (the fastest one is shown)")
+    parser.add_argument("--u-step", type=float, default=None,
+                        help="step of the in-plane wave-vector grid (default: value of the example setting)")
+    args = parser.parse_args()
+
+    from simojio.modules.RTA import compiled_kernels
+
+    module_cls, input_container = example_settings.load_example_setting(module_name)
+
+    generic_parameter_values = {}
+    if args.u_step is not None:
+        generic_parameter_values["wave-vectors"] = [0., 3.5, args.u_step]
+
+    print("Transfer matrix backends (" + module_name + " example setting)")
+
+    numpy_module, numpy_time = run_backend(module_cls, input_container, generic_parameter_values,
+                                           use_compiled_kernels=False, repeat=args.repeat)
+    print("numpy:    " + "{:.3f}".format(numpy_time) + " s")
+
+    if not compiled_kernels.is_available:
+        print("numba:    not installed (numpy backend is used)")
+        return
+
+    start_time = time.perf_counter()
+    run_backend(module_cls, input_container, generic_parameter_values, use_compiled_kernels=True, repeat=1)
+    warm_up_time = time.perf_counter() - start_time
+
+    numba_module, numba_time = run_backend(module_cls, input_container, generic_parameter_values,
+                                           use_compiled_kernels=True, repeat=args.repeat)
+    print("numba:    " + "{:.3f}".format(numba_time) + " s (first run incl. compilation: "
+          + "{:.3f}".format(warm_up_time) + " s)")
+    print("speed-up: " + "{:.2f}".format(numpy_time / numba_time))
+
+    # check that both backends give the same results
+    numpy_results = numpy_module.get_results_dict()
+    numba_results = numba_module.get_results_dict()
+    deviations = [abs(numba_results[name] - numpy_results[name]) for name in numpy_results
+                  if numpy_results[name] is not None]
+    if len(deviations) > 0:
+        print("maximum deviation of numerical results: " + "{:.2e}".format(max(deviations)))
+    print("maximum deviation of R, T at kz = 0: " + "{:.2e}".format(get_kz_zero_deviation()))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,11 @@ import datetime
 from configparser import ConfigParser
 
 from typing import List
-from scipy.interpolate import interp2d, interp1d
-from scipy.signal import savgol_filter
-from scipy.interpolate import InterpolatedUnivariateSpline
 
 from typing import Union
+from typing import Optional
+
+# Note: scipy is imported within the functions that need it (it is not needed for the startup of the GUI)
 
 
 def icon_path(relative_path):
@@ -27,10 +27,37 @@ def icon_path(relative_path):
 
 
 def find_nearest(array: list, value: float) -> (int, float):
-    idx = (np.abs(np.array(array) - value)).argmin()
+    idx = (np.abs(np.asarray(array) - value)).argmin()
     return idx, array[idx]
 
 
+def find_nearest_indices(array: np.array, values: np.array, sorter: Optional[np.array] = None) -> np.array:
+    """
+    Indices of the entries of the array that are closest to each of the given values (vectorized find_nearest() with a
+    binary search). For equally distant entries, the smaller entry is taken.
+    :param array: increasing values (or any order if sorter is given)
+    :param values: single value or array of values to look up
+    :param sorter: indices that sort the array, i.e. np.argsort(array), which can be reused for several lookups
+    :return: indices (same shape as values)
+    """
+
+    array = np.asarray(array)
+    values = np.asarray(values)
+
+    if len(array) == 1:
+        return np.zeros(values.shape, dtype=int)
+
+    # positions in the sorted array (right neighbour of each value) -> compare with left neighbour
+    right_positions = np.clip(np.searchsorted(array, values, sorter=sorter), 1, len(array) - 1)
+    left_positions = right_positions - 1
+    if sorter is not None:
+        right_positions = np.asarray(sorter)[right_positions]
+        left_positions = np.asarray(sorter)[left_positions]
+
+    return np.where(np.abs(values - array[left_positions]) <= np.abs(array[right_positions] - values),
+                    left_positions, right_positions)
+
+
 def flatten(l: Union[list, tuple]):
     out = []
     for item in l:
@@ -179,78 +206,138 @@ def remove_exclude_values_from_list(total_value_list: list, exclude_tuple_list:
     :return: remaining_values_list
     """
 
-    def is_in_exclude_tuples(check_value: float) -> bool:
-        is_in_tuple_bool = False
-        for bound_tuple in exclude_tuple_list:
-            if (check_value >= min(bound_tuple)) and (check_value <= max(bound_tuple)):
-                is_in_tuple_bool = True
-                break
-        return is_in_tuple_bool
+    is_excluded = get_exclude_mask(total_value_list, exclude_tuple_list)
+
+    return [value for value, excluded in zip(total_value_list, is_excluded) if not excluded]
+
+
+def get_exclude_mask(values: np.array, exclude_tuple_list: list) -> np.array:
+    """
+    Mask of all values that are within any of the bounds given in the exclude_tuple_list (bounds included), see
+    remove_exclude_values_from_list(). The (possibly overlapping) intervals are sorted by their lower bounds. A value
+    is excluded if the largest upper bound of all intervals starting below it is not smaller than the value.
+    :param values:
+    :param exclude_tuple_list: [(bound 1, bound 2), ...] (in any order, single values as (value,))
+    :return: is_excluded (bool array)
+    """
+
+    values = np.asarray(values, dtype=float)
+    if len(exclude_tuple_list) == 0:
+        return np.zeros(values.shape, dtype=bool)
 
-    remaining_values_list = []
-    for value in total_value_list:
-        if not is_in_exclude_tuples(value):
-            remaining_values_list.append(value)
+    bounds = np.array([(min(bound_tuple), max(bound_tuple)) for bound_tuple in exclude_tuple_list], dtype=float)
+    bounds = bounds[np.argsort(bounds[:, 0], kind='stable')]
+    max_upper_bounds = np.maximum.accumulate(bounds[:, 1])
 
-    return remaining_values_list
+    # index of the last interval with a lower bound <= value (-1: below all intervals)
+    interval_indices = np.searchsorted(bounds[:, 0], values, side='right') - 1
+
+    is_excluded = np.zeros(values.shape, dtype=bool)
+    is_above_lower_bound = interval_indices >= 0
+    is_excluded[is_above_lower_bound] = values[is_above_lower_bound] <= max_upper_bounds[
+        interval_indices[is_above_lower_bound]]
+
+    return is_excluded
+
+
+# {(initial axis, grid axis): (lower indices, upper indices, weights)} of get_linear_interpolation_weights(), the
+# oldest entries are removed first
+linear_interpolation_weights_cache = {}
+max_nb_linear_interpolation_weights = 50
+
+
+def get_linear_interpolation_weights(x_init: np.array, x_grid: np.array) -> (np.array, np.array, np.array):
+    """
+    Indices of the neighbouring points of each grid value in the (increasing) initial axis and the weights of the upper
+    neighbours for linear interpolation. Grid values outside the initial axis are projected onto the nearest boundary.
+    The weights are cached as the same axes recur, e.g. in every iteration of a fit.
+    :param x_init: increasing initial axis
+    :param x_grid: new axis
+    :return: lower_indices, upper_indices, upper_weights
+    """
+
+    x_init = np.asarray(x_init, dtype=float)
+    x_grid = np.asarray(x_grid, dtype=float)
+
+    key = (x_init.tobytes(), x_grid.tobytes())
+    if key in linear_interpolation_weights_cache:
+        return linear_interpolation_weights_cache[key]
+
+    if len(x_init) == 1:
+        # constant along this axis
+        lower_indices = np.zeros(len(x_grid), dtype=int)
+        upper_indices = lower_indices
+        upper_weights = np.zeros(len(x_grid))
+    else:
+        x_clipped = np.clip(x_grid, x_init[0], x_init[-1])
+        upper_indices = np.clip(np.searchsorted(x_init, x_clipped, side='right'), 1, len(x_init) - 1)
+        lower_indices = upper_indices - 1
+        spacing = x_init[upper_indices] - x_init[lower_indices]
+        upper_weights = np.divide(x_clipped - x_init[lower_indices], spacing, out=np.zeros(len(x_grid)),
+                                  where=spacing != 0.)
+
+    linear_interpolation_weights_cache[key] = (lower_indices, upper_indices, upper_weights)
+    while len(linear_interpolation_weights_cache) > max_nb_linear_interpolation_weights:
+        del linear_interpolation_weights_cache[next(iter(linear_interpolation_weights_cache))]
+
+    return lower_indices, upper_indices, upper_weights
 
 
 def project_2d_array_onto_grid(x_init: np.array, y_init: np.array, data2d_init: np.array, x_grid: np.array,
                                y_grid: np.array) -> np.array:
     """
-    Project a 2d-array (data2d_init) defined on the initial grid (x_init, y_init) onto a new grid (x_grid, y_grid).
-    Use 2d- or 1d-interpolation of the initial data depending on the dimensionality of data2d_init. If data2d_init is
-    only a single value, return a constant array of this value.
+    Project a 2d-array (data2d_init) defined on the initial grid (x_init, y_init) onto a new grid (x_grid, y_grid) by
+    linear interpolation on the regular initial grid (bilinear in 2d, linear along an axis with a single value and
+    constant for a single value). Grid values outside the initial grid get the value of the nearest boundary.
     :param x_init:
     :param y_init:
-    :param data2d_init:
+    :param data2d_init: (y, x)
     :param x_grid:
     :param y_grid:
-    :return: data2d_grid: np.array
+    :return: data2d_grid: np.array (y_grid, x_grid)
     """
 
-    if data2d_init.shape == (1, 1):
-        # single point given, return constant array
-        data2d_grid = data2d_init[0, 0] * np.ones((len(x_grid), len(y_grid)))
-    elif data2d_init.shape[0] == 1:
-        # 1d on x-axis
-        data_func = interp1d(x_init, data2d_init[0])
-        data2d_grid = np.array([data_func(x_grid)]).T
-        print(data2d_grid)
-    elif data2d_init.shape[1] == 1:
-        # 1d on y-axis
-        data_func = interp1d(y_init, data2d_init[:, 0])
-        data_1d = data_func(y_grid)
-        data2d_grid = np.array([[data_1d[i]] for i in range(len(data_1d))])
-    else:
-        # 2d interpolation
-        data_func = interp2d(x_init, y_init, data2d_init)
-        data2d_grid = data_func(x_grid, y_grid)
-
-        if len(x_grid) == 1:
-            data2d_grid = np.array([data2d_grid]).T
-        elif len(y_grid) == 1:
-            data2d_grid = np.array([data2d_grid])
+    x_init = np.asarray(x_init, dtype=float)
+    y_init = np.asarray(y_init, dtype=float)
+    data2d_init = np.asarray(data2d_init)
+    if data2d_init.shape != (len(y_init), len(x_init)):
+        raise ValueError("Shape of data2d_init does not match the initial grid: " + str(data2d_init.shape))
+
+    # sort initial grid (if necessary)
+    if np.any(np.diff(x_init) < 0.):
+        x_order = np.argsort(x_init, kind='stable')
+        x_init = x_init[x_order]
+        data2d_init = data2d_init[:, x_order]
+    if np.any(np.diff(y_init) < 0.):
+        y_order = np.argsort(y_init, kind='stable')
+        y_init = y_init[y_order]
+        data2d_init = data2d_init[y_order]
+
+    y_lower, y_upper, y_weights = get_linear_interpolation_weights(y_init, y_grid)
+    x_lower, x_upper, x_weights = get_linear_interpolation_weights(x_init, x_grid)
+
+    # interpolate along y first and along x afterwards
+    data2d_y = data2d_init[y_lower] * (1. - y_weights)[:, None] + data2d_init[y_upper] * y_weights[:, None]
+    data2d_grid = data2d_y[:, x_lower] * (1. - x_weights) + data2d_y[:, x_upper] * x_weights
 
     return data2d_grid
 
 
 def savgol_smooth(data: np.array, boxcar: int, polyorder: int) -> np.array:
-    """Apply a Savitzky-Golay filter to an array (to smooth the data)."""
+    """Apply a Savitzky-Golay filter to each row of a 2d-array (to smooth the data) in a single call."""
+
+    from scipy.signal import savgol_filter
 
     if boxcar == 0:
         smoothed = data
     else:
-        smoothed = []
-        for i in np.arange(len(data)):
-            window_length = boxcar
-            if not is_odd(window_length):
-                window_length = boxcar - 1
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                y = savgol_filter(data[i], window_length, polyorder, deriv=0, delta=1.0, axis=-1, mode='interp',
-                                  cval=0.0)
-            smoothed.append(y)
+        window_length = boxcar
+        if not is_odd(window_length):
+            window_length = boxcar - 1
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            smoothed = savgol_filter(np.asarray(data, dtype=float), window_length, polyorder, deriv=0, delta=1.0,
+                                     axis=-1, mode='interp', cval=0.0)
 
     return np.array(smoothed)
 
@@ -266,6 +353,8 @@ def interpol(x, y, order=None):
     :param y: values
     :return: function y(x)
     """
+    from scipy.interpolate import InterpolatedUnivariateSpline
+
     if order is None:
         if len(x) > 3:
             order = 3  # cubic interpolation (works for more than 3 entries)
@@ -276,22 +365,8 @@ def interpol(x, y, order=None):
 
     extrapolation_mode = 3  # ext=3 return boundary value for extrapolation
 
-    # sort xy list for increasing x to avoid interpolation error (not critical because function obj returned)
-    xy = np.array(sorted(np.array([x, y]).transpose(), key=lambda l: l[0])).transpose()
-    x = xy[0]
-    y = xy[1]
-
-    # remove duplicates
-    check_list = []
-    x_new = []
-    y_new = []
-    for i in range(len(x)):
-        if x[i] in check_list:
-            pass
-        else:
-            x_new.append(x[i])
-            y_new.append(y[i])
-        check_list.append(x[i])
+    # sort for increasing x to avoid interpolation error and remove duplicates (the first occurrence is kept)
+    x_new, y_new = get_unique_xy(x, y)
 
     try:
         func = InterpolatedUnivariateSpline(x_new, y_new, k=order, ext=extrapolation_mode)
@@ -300,6 +375,16 @@ def interpol(x, y, order=None):
     return func
 
 
+def get_unique_xy(x, y) -> (np.array, np.array):
+    """
+    Sort x and y for increasing x and remove the duplicates of x (the y value of the first occurrence is kept).
+    :return: x_unique, y_unique
+    """
+
+    x_unique, first_indices = np.unique(np.asarray(x), return_index=True)
+    return x_unique, np.asarray(y)[first_indices]
+
+
 def xy_to_extent(x_list: list, y_list: list) -> list:
     """
     Convert x-list and y-list to extent=[left, right, bottom, top] that can be passed to pyplots imshow.
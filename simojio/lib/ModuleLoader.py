@@ -1,5 +1,7 @@
 import os, sys
+import ast
 import importlib
+import importlib.util
 from pathlib import Path
 import simojio.lib.BasicFunctions as BasicFunctions
 
@@ -10,13 +12,25 @@ from typing import *
 
 class ModuleLoader:
 
+    # module classes loaded in this process {(module_name, package): (source file state, module class)}, shared by all
+    # instances. A module is only reloaded if its source file has changed (see load_module_class).
+    module_class_registry = {}
+
     def __init__(self):
 
         self.module_root_path = os.path.join("modules")     # in this path all modules are stored (incl. sub-dirs)
         self.abstract_modules_root_path = os.path.join("lib", "abstract_modules")
         self.module_path_dict = {}                          # {'module_name': module_path}
 
+        # names of the abstract module classes (used to identify modules without importing them)
+        self.abstract_module_names = [cls.__name__ for cls in [AbstractModule, Plotter, Calculator, Fitter]]
+
     def get_available_modules(self, print_errors=True) -> list:
+        """
+        Get the names of all modules in the module root path. A module is given by a sub-directory that contains a .py
+        file of the same name which defines a module class of the same name. To keep the startup fast, the module files
+        are only parsed but not executed (imported) unless the base classes of the module class are unknown.
+        """
 
         self.module_path_dict = {}
 
@@ -29,11 +43,8 @@ class ModuleLoader:
                 path = Path(os.path.join(self.module_root_path, module_name, module_name + ".py"))
                 try:
                     sys.path.append(os.path.join(*list(path.parts)[:-1]))
-                    module = importlib.import_module(module_name)
-                    module = importlib.reload(module)
-                    module_cls = getattr(module, module_name)
 
-                    if any([issubclass(module_cls, Plotter)]):
+                    if self._is_module(module_name, path):
                         self.module_path_dict.update({module_name: path})
                 except Exception as e:
                     if print_errors:
@@ -42,6 +53,34 @@ class ModuleLoader:
 
         return list(self.module_path_dict.keys())
 
+    def _is_module(self, module_name: str, path: Path) -> bool:
+        """
+        Check statically (without executing the code) whether the file defines a module class. Only if the module class
+        is neither derived from an abstract module nor defines a run method, the module is imported for the check.
+        """
+
+        with open(path, 'r', encoding='utf-8') as module_file:
+            syntax_tree = ast.parse(module_file.read(), filename=str(path))
+
+        class_defs = [node for node in syntax_tree.body if isinstance(node, ast.ClassDef) and node.name == module_name]
+        if len(class_defs) == 0:
+            raise AttributeError("module '" + module_name + "' has no class '" + module_name + "'")
+
+        base_names = []
+        for base in class_defs[-1].bases:
+            if isinstance(base, ast.Name):
+                base_names.append(base.id)
+            elif isinstance(base, ast.Attribute):
+                base_names.append(base.attr)
+
+        defines_run = any([isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "run"
+                           for node in class_defs[-1].body])
+
+        if defines_run or any([base_name in self.abstract_module_names for base_name in base_names]):
+            return True
+
+        return issubclass(self.load_module_class(module_name), Plotter)
+
     def get_module_path_as_list(self, module_name: str) -> list:
         module_path = self.module_path_dict[module_name]
         module_path_as_list = BasicFunctions.convert_path_str_to_list(str(module_path))
@@ -53,14 +92,40 @@ class ModuleLoader:
 
         return module_obj
 
-    @staticmethod
-    def load_module_class(module_name: str, package: Optional[str] = None):
+    @classmethod
+    def load_module_class(cls, module_name: str, package: Optional[str] = None):
+        """
+        Get the class of the module. The module code is only executed if it was not yet loaded by a ModuleLoader of this
+        process or if its source file was changed (modification time or size) in the meantime. Otherwise, the
+        registered class is returned.
+        """
+
+        registry_key = (module_name, package)
+        is_imported = importlib.util.resolve_name(module_name, package) in sys.modules
         module = importlib.import_module(module_name, package)
-        module = importlib.reload(module)
+        source_state = cls._get_source_state(module)
+
+        if registry_key in cls.module_class_registry:
+            registered_source_state, module_cls = cls.module_class_registry[registry_key]
+            if registered_source_state == source_state:
+                return module_cls
+            module = importlib.reload(module)
+        elif is_imported:
+            # imported elsewhere before -> make sure that the current source is used
+            module = importlib.reload(module)
 
         module_cls = getattr(module, module_name)
+        cls.module_class_registry[registry_key] = (source_state, module_cls)
         return module_cls
 
+    @staticmethod
+    def _get_source_state(module) -> Optional[tuple]:
+        source_path = getattr(module, "__file__", None)
+        if source_path is None:
+            return None
+        source_stat = os.stat(source_path)
+        return source_stat.st_mtime_ns, source_stat.st_size
+
     def get_parameter_categories(self, module_name: str):
         module_cls = self.load_module_class(module_name)
         categories = []
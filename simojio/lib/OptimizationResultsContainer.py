@@ -1,4 +1,7 @@
-from scipy.optimize import OptimizeResult
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from scipy.optimize import OptimizeResult     # only for type hints, scipy is not needed for the startup of the GUI
 
 
 class OptimizationResultsContainer:
@@ -20,7 +23,7 @@ class OptimizationResultsContainer:
         self.variables_out_of_bounds_dict = {}
 
     def set_results(self, optimized_value_name: str, variable_names: list, variable_bounds: list, solver_name: str,
-                    maximize: bool, results_obj: OptimizeResult):
+                    maximize: bool, results_obj: 'OptimizeResult'):
 
         # if maximize, the negative function (-f) is minimized -> replace 'fun' value in results
         self.maximize = maximize
@@ -14,17 +14,25 @@ class OptimizationSettingsContainer:
                                 "Powell",
                                 "CG",
                                 "BFGS",
-                                # "Newton-CG",      # Jacobian required as input
+                                "Newton-CG",        # only for modules that provide gradients
                                 "L-BFGS-B",
                                 "TNC",
                                 # "COBYLA",         # doesn't change coordinate but only the value
                                 "SLSQP",
                                 "trust-constr",
-                                # "dogleg",         # Jacobian required as input
-                                # "trust-ncg",      # Jacobian required as input
-                                # "trust-exact",    # Jacobian required as input
-                                # "trust-krylov"    # Jacobian required as input
+                                # "dogleg",         # Hessian required as input
+                                # "trust-ncg",      # Hessian required as input
+                                # "trust-exact",    # Hessian required as input
+                                # "trust-krylov"    # Hessian required as input
+                                "least squares (TRF)",  # only for fit modules that provide residuals
+                                "least squares (LM)",   # only for fit modules that provide residuals, no bounds
                                 ]
+        # gradient-based solvers (use the gradients of the module if available, otherwise finite differences)
+        self.solvers_using_gradients = ["CG", "BFGS", "Newton-CG", "L-BFGS-B", "TNC", "SLSQP", "trust-constr"]
+        self.solvers_requiring_gradients = ["Newton-CG"]
+
+        # least-squares solvers {solver: method of scipy.optimize.least_squares}, minimize the norm of the residuals
+        self.least_squares_solvers = {"least squares (TRF)": "trf", "least squares (LM)": "lm"}
 
         self.current_solver = self.list_of_solvers[0]
         self.maximum_number_of_iterations = 1000
@@ -1,4 +1,5 @@
 from typing import *
+import numpy as np
 
 from simojio.lib.Sample import Sample
 from simojio.lib.GlobalSettingsContainer import GlobalSettingsContainer
@@ -43,3 +44,8 @@ class VariationContainer:
     def get_varied_variables_bounds(self, evaluation_set_idx) -> List[Tuple[float]]:
         return self.variation_container_evaluation_set_list[evaluation_set_idx].get_varied_variables_bounds()
 
+    def get_variables_gradient(self, evaluation_set_idx: int, variable_values: List[float],
+                               parameters_gradient: dict) -> Optional[np.array]:
+        return self.variation_container_evaluation_set_list[evaluation_set_idx].get_variables_gradient(
+            variable_values, parameters_gradient)
+
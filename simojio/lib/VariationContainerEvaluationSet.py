@@ -243,6 +243,77 @@ class VariationContainerEvaluationSet:
 
         return category_list
 
+    def get_variables_gradient(self, variable_values: List[float], parameters_gradient: dict) -> Optional[np.array]:
+        """
+        Chain rule from the derivatives of a module result with respect to its (varied) float parameters to the
+        derivatives with respect to the varied variables. Parameters given by an expression are differentiated
+        numerically (the expression is cheap to evaluate, the module is not run again).
+
+        :param variable_values: values of the varied variables, e.g. [0.2, 1, 20]
+        :param parameters_gradient: {(ParameterCategory, layer index or None, parameter name): derivative}, see
+            Calculator.get_results_gradients_dict()
+        :return: derivatives with respect to the varied variables or None if the derivative of any varied parameter is
+            missing
+        """
+
+        varied_variables_names = self.get_varied_variables_names()
+
+        all_variables_values_dict = {}
+        all_variables_values_dict.update(self.fix_variables_dict)
+        all_variables_values_dict.update({varied_variables_names[i]: variable_values[i]
+                                          for i in range(len(variable_values))})
+
+        parameter_keys_and_values = []   # [(parameter key, variable name or expression)]
+        for category in self.varied_parameters:
+            if category in [ParameterCategory.GENERIC, ParameterCategory.EVALUATION_SET]:
+                for parameter in self.varied_parameters[category]:
+                    parameter_keys_and_values.append(((category, None, parameter.name),
+                                                      parameter.get_current_value()))
+            elif category is ParameterCategory.LAYER:
+                for layer_idx, layer_parameters in enumerate(self.varied_parameters[category]):
+                    for parameter in layer_parameters:
+                        parameter_keys_and_values.append(((category, layer_idx, parameter.name),
+                                                          parameter.get_current_value()))
+
+        gradient = np.zeros(len(varied_variables_names))
+        for parameter_key, value_str in parameter_keys_and_values:
+            if parameter_key not in parameters_gradient:
+                return None
+
+            parameter_derivatives = self._get_parameter_derivatives(value_str, all_variables_values_dict)
+            gradient += parameters_gradient[parameter_key] * parameter_derivatives
+
+        return gradient
+
+    def _get_parameter_derivatives(self, value_str: str, all_variables_values_dict: dict) -> np.array:
+        """Derivatives of a parameter value (given by a variable or an expression) with respect to the varied variables"""
+
+        varied_variables_names = self.get_varied_variables_names()
+        derivatives = np.zeros(len(varied_variables_names))
+
+        if value_str not in self.expressions_dict:
+            derivatives[varied_variables_names.index(value_str)] = 1.
+            return derivatives
+
+        # central differences of the expression
+        expression = self.expressions_dict[value_str]
+        for idx, variable_name in enumerate(varied_variables_names):
+            value = all_variables_values_dict[variable_name]
+            step = 1.e-6 * max(1., abs(value))
+
+            shifted_values = []
+            for shift in [step, -step]:
+                values_dict = dict(all_variables_values_dict)
+                values_dict[variable_name] = value + shift
+                success, expression_value, used_variables = check_expression(expression, values_dict)
+                if not success:
+                    raise ValueError("Expression " + value_str + " (" + expression + ") could not be evaluated")
+                shifted_values.append(expression_value)
+
+            derivatives[idx] = (shifted_values[0] - shifted_values[1]) / (2. * step)
+
+        return derivatives
+
     def _fill_module_input_container(self, varied_parameters: dict) -> ModuleInputContainer:
 
         module_input_container = ModuleInputContainer()
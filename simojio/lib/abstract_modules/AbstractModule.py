@@ -50,6 +50,7 @@ class AbstractModule(metaclass=abc.ABCMeta):
     def plot_fig(self, fig: plt.Figure, title: str, save=True):
         plot_container = PlotContainer(fig=fig, title=title, save=save)
         self.queue.put(plot_container)
+        plt.close(fig)     # figure is only needed for sending it to the plot window
 
     def get_save_dir(self) -> str:
         return self.simoji_save_dir
@@ -1,4 +1,5 @@
 import abc
+from typing import Optional
 from .AbstractModule import AbstractModule
 
 
@@ -22,3 +23,14 @@ class Calculator(AbstractModule, metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def get_results_dict(self) -> dict:
         return {}
+
+    def get_results_gradients_dict(self) -> Optional[dict]:
+        """
+        Optional: derivatives of the numerical results with respect to float parameters of the module. They are passed
+        to gradient-based optimizers instead of finite differences. The keys of the parameters are
+        (ParameterCategory, layer index (None for generic and evaluation set parameters), parameter name).
+
+        Example: {"R design": {(ParameterCategory.LAYER, 1, "thickness"): 0.002}}
+        :return: {result name: {parameter key: derivative}} or None if no gradients are available
+        """
+        return None
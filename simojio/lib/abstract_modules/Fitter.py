@@ -1,4 +1,6 @@
 import abc
+import numpy as np
+from typing import Optional
 from .AbstractModule import AbstractModule
 
 
@@ -23,6 +25,30 @@ class Fitter(AbstractModule, metaclass=abc.ABCMeta):
         fit_name, fit_value = self.get_fit_name_and_value()
         return {fit_name: fit_value}
 
+    def get_results_gradients_dict(self) -> Optional[dict]:
+        fit_gradient = self.get_fit_gradient()
+        if fit_gradient is None:
+            return None
+        fit_name, fit_value = self.get_fit_name_and_value()
+        return {fit_name: fit_gradient}
+
     @abc.abstractmethod
     def get_fit_name_and_value(self) -> (str, float):
         pass
+
+    def get_fit_residuals(self) -> Optional[np.array]:
+        """
+        Optional: residuals of the fit (e.g. experimental - simulated data) as flat array. The fit value has to be the
+        norm of the residuals. The residuals are required for the least-squares solvers, which use the structure of the
+        fit problem and usually need much less module runs than general solvers.
+        :return: residuals or None if not available
+        """
+        return None
+
+    def get_fit_gradient(self) -> Optional[dict]:
+        """
+        Optional: derivatives of the fit value with respect to float parameters of the module, see
+        Calculator.get_results_gradients_dict().
+        :return: {parameter key: derivative} or None if no gradient is available
+        """
+        return None
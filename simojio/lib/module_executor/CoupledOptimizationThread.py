@@ -1,12 +1,12 @@
 import PySide6.QtCore as QtCore
 from typing import List, Tuple
 import numpy as np
-from scipy.optimize import minimize
 import multiprocessing as mp
 
 from simojio.lib.GlobalSettingsContainer import GlobalSettingsContainer
 from simojio.lib.MyNode import MyNode
 from simojio.lib.OptimizationResultsContainer import OptimizationResultsContainer
+from simojio.lib.OptimizationSettingsContainer import OptimizationSettingsContainer
 
 from simojio.lib.module_executor.ProcessManager import ProcessManager
 from simojio.lib.module_executor.SingleModuleProcess import SingleModuleProcess
@@ -57,6 +57,13 @@ class CoupledOptimizationThread(QtCore.QThread):
         self.variable_values_store = []
         self.optimization_values = []
 
+        # the coupled optimization only passes the optimization values of the samples (no residuals or gradients)
+        method = self.global_settings.optimization_settings.current_solver
+        optimization_settings = OptimizationSettingsContainer(False)
+        if method in optimization_settings.least_squares_solvers or \
+                method in optimization_settings.solvers_requiring_gradients:
+            raise ValueError("Solver " + method + " is not available for coupled optimizations")
+
         # we need to construct a single list of input variables from all samples, global variables need to be there only
         # once whereas sample variables need to be treated as independent even if they have the same name
         variable_names_list = []
@@ -96,7 +103,7 @@ class CoupledOptimizationThread(QtCore.QThread):
         method = self.global_settings.optimization_settings.current_solver
         maximum_number_of_iterations = self.global_settings.optimization_settings.maximum_number_of_iterations
         maximize = self.global_settings.optimization_settings.maximize
-        if isinstance(ModuleLoader().load_module(self.module_name), Fitter):
+        if issubclass(ModuleLoader().load_module_class(self.module_name), Fitter):
             maximize = False
 
         optimized_value_name = ", ".join([leave.sample.optimization_settings.name_of_value_to_be_optimized
@@ -104,6 +111,8 @@ class CoupledOptimizationThread(QtCore.QThread):
 
         self.do_initialization_list = [True for i in range(len(leave_group) - 1)]
 
+        from scipy.optimize import minimize     # imported here to keep the startup of the GUI fast
+
         result = minimize(self._optimization_fct,
                           x0=np.array(variable_values_list),
                           method=method,
@@ -23,6 +23,7 @@ class SampleListResolver:
 
         self.module_loader = module_loader
         self.module_name = None
+        self.module_cls = None      # module class shared by all samples of the run
         self.module_has_evaluation_set_parameters = bool()
         self.is_variation_mode = bool()
 
@@ -36,8 +37,8 @@ class SampleListResolver:
     def resolve(self, sample_list: List[Sample], global_settings: GlobalSettingsContainer):
 
         self.module_name = global_settings.module_path[-1].rstrip(".py")
-        module = ModuleLoader().load_module(self.module_name)
-        self.make_global_tab = isinstance(module, Calculator)
+        self.module_cls = self.module_loader.load_module_class(self.module_name)
+        self.make_global_tab = issubclass(self.module_cls, Calculator)
 
         # check for which categories (generic, evaluation set, layer) parameters are defined in the module
         parameter_categories = self.module_loader.get_parameter_categories(self.module_name)
@@ -62,8 +63,9 @@ class SampleListResolver:
 
         # -- evaluate samples --
         sample_variation_dict = dict()  # {sample.name: variation_container)
+        module = self.module_cls()      # the parameter containers of the samples store copies of the module
         for sample in sample_list:
-            sample.set_module(self.module_loader.load_module(self.module_name))
+            sample.set_module(module)
             variation_container = VariationContainer(sample, global_settings)
             sample_variation_dict.update({sample.name: variation_container})
 
@@ -1,20 +1,18 @@
 import multiprocessing as mp
+import os
 import numpy as np
 from typing import Optional, List
 import copy
-from scipy.optimize import minimize
-import matplotlib.pyplot as plt
 
 from simojio.lib.ModuleInputContainer import ModuleInputContainer
 from simojio.lib.VariationContainer import VariationContainer
 from simojio.lib.OptimizationResultsContainer import OptimizationResultsContainer
+from simojio.lib.OptimizationSettingsContainer import OptimizationSettingsContainer
 from simojio.lib.ModuleLoader import ModuleLoader
 from simojio.lib.module_executor.CurrentVariablesAndResultsContainer import CurrentVariablesAndResultsContainer
 from simojio.lib.module_executor.shared_functions import plot_optimization_steps
 from simojio.lib.abstract_modules import Calculator, Fitter
 
-plt.rcParams.update({'figure.max_open_warning': 0})  # mute warning "More than 20 figures have been opened"
-
 
 class SingleModuleProcess:
 
@@ -80,13 +78,79 @@ class SingleModuleProcess:
             maximize = False
             opt_value_name, opt_value = self.module.get_fit_name_and_value()
 
-        result = minimize(self._optimization_fct,
+        optimization_settings = OptimizationSettingsContainer(False)
+
+        if method in optimization_settings.least_squares_solvers:
+            result = self._run_least_squares(initial_variable_values, variable_bounds, variation_container,
+                                             evaluation_set_idx, opt_value_name,
+                                             optimization_settings.least_squares_solvers[method], max_iter)
+            self._put_optimization_results(result, variation_container, evaluation_set_idx, opt_value_name,
+                                           variable_bounds, method, maximize=False)
+            return
+
+        # use the gradients of the module if available (otherwise they are estimated by finite differences)
+        use_gradient = method in optimization_settings.solvers_using_gradients and self._get_optimization_gradient(
+            initial_variable_values, variation_container, evaluation_set_idx, opt_value_name) is not None
+
+        if not use_gradient and method in optimization_settings.solvers_requiring_gradients:
+            raise ValueError("Solver " + method + " requires gradients, which are not provided by the module for '"
+                             + opt_value_name + "' and all varied parameters")
+
+        if use_gradient:
+            optimization_fct = self._optimization_fct_and_gradient
+        else:
+            optimization_fct = self._optimization_fct
+
+        from scipy.optimize import minimize     # imported here to keep the startup of the GUI fast
+
+        result = minimize(optimization_fct,
                           x0=np.array(initial_variable_values),
                           method=method,
+                          jac=use_gradient,     # True: optimization_fct returns value and gradient
                           options={'maxiter': max_iter},
                           bounds=variable_bounds,
                           args=(variation_container, evaluation_set_idx, opt_value_name, maximize))
 
+        self._put_optimization_results(result, variation_container, evaluation_set_idx, opt_value_name,
+                                       variable_bounds, method, maximize)
+
+    def _run_least_squares(self, initial_variable_values: List[float], variable_bounds: List[tuple],
+                           variation_container: VariationContainer, evaluation_set_idx: int, opt_value_name: str,
+                           least_squares_method: str, max_iter: int):
+        """
+        Minimize the norm of the residuals of a fit module (see Fitter.get_fit_residuals()) with
+        scipy.optimize.least_squares. The maximum number of iterations limits the number of module runs.
+        :param least_squares_method: "trf" (trust region reflective) or "lm" (Levenberg-Marquardt, ignores bounds)
+        :return: OptimizeResult with the norm of the residuals as 'fun'
+        """
+
+        if not isinstance(self.module, Fitter) or self.module.get_fit_residuals() is None:
+            raise ValueError("Least-squares solvers require a fit module that provides residuals "
+                             "(see Fitter.get_fit_residuals())")
+
+        if least_squares_method == "lm":
+            bounds = (-np.inf, np.inf)
+        else:
+            bounds = (np.array([min(bound) for bound in variable_bounds]),
+                      np.array([max(bound) for bound in variable_bounds]))
+
+        from scipy.optimize import least_squares     # imported here to keep the startup of the GUI fast
+
+        result = least_squares(self._residuals_fct,
+                               x0=np.array(initial_variable_values),
+                               method=least_squares_method,
+                               bounds=bounds,
+                               max_nfev=max_iter,
+                               args=(variation_container, evaluation_set_idx, opt_value_name))
+
+        # the optimized value is the norm of the residuals (least_squares returns the residuals as 'fun')
+        result.fun = np.linalg.norm(result.fun)
+
+        return result
+
+    def _put_optimization_results(self, result, variation_container: VariationContainer, evaluation_set_idx: int,
+                                  opt_value_name: str, variable_bounds: List[tuple], method: str, maximize: bool):
+
         # show results
         results_container = OptimizationResultsContainer()
         results_container.set_results(optimized_value_name=opt_value_name,
@@ -118,6 +182,8 @@ class SingleModuleProcess:
 
     def initialize_module(self, module_name: str, result_queue: mp.Queue, save_path: str):
 
+        os.makedirs(save_path, exist_ok=True)   # not created by the plot window (only when saving)
+
         module_loader = ModuleLoader()
         self.module = copy.deepcopy(module_loader.load_module(module_name))
         self.module.queue = result_queue
@@ -149,6 +215,43 @@ class SingleModuleProcess:
         else:
             return optimization_value
 
+    def _residuals_fct(self, variable_values: List[float], variation_container: VariationContainer,
+                       evaluation_set_idx: int, optimization_value_name: str) -> np.array:
+
+        self._optimization_fct(variable_values, variation_container, evaluation_set_idx, optimization_value_name,
+                               maximize=False)
+        return self.module.get_fit_residuals()
+
+    def _optimization_fct_and_gradient(self, variable_values: List[float], variation_container: VariationContainer,
+                                       evaluation_set_idx: int, optimization_value_name: str, maximize: bool):
+
+        optimization_value = self._optimization_fct(variable_values, variation_container, evaluation_set_idx,
+                                                    optimization_value_name, maximize)
+
+        gradient = self._get_optimization_gradient(variable_values, variation_container, evaluation_set_idx,
+                                                   optimization_value_name)
+        if gradient is None:
+            raise ValueError("Module did not provide the gradient of '" + optimization_value_name + "'")
+
+        if maximize:
+            return optimization_value, -gradient
+        else:
+            return optimization_value, gradient
+
+    def _get_optimization_gradient(self, variable_values: List[float], variation_container: VariationContainer,
+                                   evaluation_set_idx: int, optimization_value_name: str) -> Optional[np.array]:
+        """Gradient of the optimization value with respect to the varied variables from the last module run"""
+
+        results_gradients_dict = None
+        if isinstance(self.module, Calculator) or isinstance(self.module, Fitter):
+            results_gradients_dict = self.module.get_results_gradients_dict()
+
+        if results_gradients_dict is None or optimization_value_name not in results_gradients_dict:
+            return None
+
+        return variation_container.get_variables_gradient(evaluation_set_idx, variable_values,
+                                                          results_gradients_dict[optimization_value_name])
+
     @staticmethod
     def _get_process_name() -> str:
         return mp.current_process().name
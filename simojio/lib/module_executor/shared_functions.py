@@ -52,6 +52,7 @@ def plot_optimization_steps(optimization_values: List[float], optimization_value
                                        is_variation_step_independent_plot=is_variation_step_independent_plot)
 
         queue.put(plot_container)
+        plt.close(fig)
 
     else:
         for idx, values in enumerate(np.array(variable_values_list).T):
@@ -71,6 +72,7 @@ def plot_optimization_steps(optimization_values: List[float], optimization_value
                                            save=save,
                                            is_variation_step_independent_plot=is_variation_step_independent_plot)
             queue.put(plot_container)
+            plt.close(fig)
 
 
 def get_optimization_settings(sample: Sample, global_settings: GlobalSettingsContainer):
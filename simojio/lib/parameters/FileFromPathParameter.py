@@ -1,22 +1,25 @@
 from simojio.lib.parameters.MultiStringParameter import MultiStringParameter
 
 import os
+from typing import Optional
 
 
 class FileFromPathParameter(MultiStringParameter):
     """ComboBox with all files in given path"""
 
-    def __init__(self, name: str, path: str, extension_list: list, description: str):
+    def __init__(self, name: str, path: str, extension_list: list, description: str, value: Optional[str] = None):
+        """:param value: default file (first file in path if None)"""
 
         self.name = name
         self.path = path
         self.extension_list = extension_list
+        self.default_file = value
 
         self.description = description
 
         files = self.get_files()
 
-        super().__init__(name, value=files[0], description=self.description, bounds=files)
+        super().__init__(name, value=self._get_default_file(files), description=self.description, bounds=files)
 
     def get_files(self):
         all_files = [f for f in os.listdir(self.path) if os.path.isfile(os.path.join(self.path, f))]
@@ -28,11 +31,16 @@ class FileFromPathParameter(MultiStringParameter):
                     right_extension_files.append(f)
                     break
 
-        super().__init__(self.name, value=right_extension_files[0], description=self.description,
+        super().__init__(self.name, value=self._get_default_file(right_extension_files), description=self.description,
                          bounds=right_extension_files)
 
         return right_extension_files
 
+    def _get_default_file(self, files: list) -> str:
+        if self.default_file is not None and self.default_file in files:
+            return self.default_file
+        return files[0]
+
     def _check_value(self, value: str) -> bool:
         """Check if path exists."""
 
@@ -0,0 +1,66 @@
+import PySide6.QtWidgets as QtWidgets
+import PySide6.QtCore as QtCore
+from PySide6.QtCore import Signal
+from typing import List
+
+
+class LeaveBrowserWidget(QtWidgets.QWidget):
+    """
+    Replaces a tab widget with a large number of leave tabs (e.g. one tab per variation step). The leave names are shown
+    in a searchable list and only the currently selected leave is displayed. The tab windows of the leaves are handed
+    over by the plot window when a leave is selected for the first time.
+    """
+
+    leave_selected_sig = Signal(int)   # tab window id of the selected leave
+
+    def __init__(self, leave_names: List[str], tab_window_ids: List[int]):
+        super().__init__()
+
+        self.tab_window_ids = tab_window_ids
+
+        self.search_line_edit = QtWidgets.QLineEdit()
+        self.search_line_edit.setPlaceholderText("search")
+        self.search_line_edit.setClearButtonEnabled(True)
+        self.search_line_edit.textChanged.connect(self._filter_leaves)
+
+        self.leave_list_widget = QtWidgets.QListWidget()
+        self.leave_list_widget.setUniformItemSizes(True)   # speeds up the layout of long lists
+        self.leave_list_widget.addItems(leave_names)
+        self.leave_list_widget.currentRowChanged.connect(self._leave_selected)
+
+        browser_layout = QtWidgets.QVBoxLayout()
+        browser_layout.setContentsMargins(0, 0, 0, 0)
+        browser_layout.addWidget(self.search_line_edit)
+        browser_layout.addWidget(self.leave_list_widget)
+        browser_widget = QtWidgets.QWidget()
+        browser_widget.setLayout(browser_layout)
+
+        self.stacked_widget = QtWidgets.QStackedWidget()
+
+        splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
+        splitter.addWidget(browser_widget)
+        splitter.addWidget(self.stacked_widget)
+        splitter.setStretchFactor(1, 1)
+
+        self.layout = QtWidgets.QHBoxLayout()
+        self.layout.addWidget(splitter)
+        self.setLayout(self.layout)
+
+    def select_first_leave(self):
+        if self.leave_list_widget.count() > 0:
+            self.leave_list_widget.setCurrentRow(0)
+
+    def show_tab_window(self, tab_window: QtWidgets.QWidget):
+        if self.stacked_widget.indexOf(tab_window) < 0:
+            self.stacked_widget.addWidget(tab_window)
+        self.stacked_widget.setCurrentWidget(tab_window)
+
+    def _filter_leaves(self, text: str):
+        text = text.lower()
+        for row in range(self.leave_list_widget.count()):
+            item = self.leave_list_widget.item(row)
+            item.setHidden(text not in item.text().lower())
+
+    def _leave_selected(self, row: int):
+        if row >= 0:
+            self.leave_selected_sig.emit(self.tab_window_ids[row])
@@ -4,8 +4,10 @@ import PySide6.QtGui as QtGui
 import PySide6.QtCore as QtCore
 from PySide6.QtCore import Signal
 import matplotlib
+from typing import Optional
 
 from .TabPlotWindow import TabPlotWindow
+from .LeaveBrowserWidget import LeaveBrowserWidget
 from simojio.lib.OptimizationResultsContainer import OptimizationResultsContainer
 from simojio.lib.VariationResultsContainer import VariationResultsContainer
 from simojio.lib.PlotContainer import PlotContainer
@@ -94,6 +96,13 @@ class MainPlotWindow(QtWidgets.QMainWindow):
         self.id_counter = 0
         self.tab_window_dict = dict()   # {id: tab_window}
 
+        # tab windows are created lazily when a leave is shown for the first time, results are buffered until then
+        self.tab_container_dict = dict()        # {id: placeholder widget in tab or LeaveBrowserWidget}
+        self.buffered_results_dict = dict()     # {id: [result]}
+
+        # leave groups with more leaves are shown in a searchable leave browser instead of tabs
+        self.max_nb_of_leave_tabs = 50
+
     def reset(self):
 
         self.major_tab_widget = QtWidgets.QTabWidget()
@@ -119,27 +128,95 @@ class MainPlotWindow(QtWidgets.QMainWindow):
         self.leave_nodes = []
 
         self.tab_window_dict = {}
+        self.tab_container_dict = {}
+        self.buffered_results_dict = {}
 
     def initialize_tabs(self, root: MyNode):
+        """
+        Create the tab structure for the given tree. The tab windows of the leaves are not created here but when the
+        leave is shown for the first time. Leave groups with more than 'max_nb_of_leave_tabs' leaves are put into a
+        LeaveBrowserWidget instead of a tab widget.
+        """
 
         def create_sub_tabs(node: MyNode, parent_tab_widget: QtWidgets.QTabWidget, save_path: str):
+            tab_leave_nodes = []    # leave node of each tab (None for nested tabs)
             for sub_node in node.children:
                 save_path_sub = os.path.join(save_path, sub_node.name)
-                os.makedirs(save_path_sub, exist_ok=True)
                 if sub_node.is_leaf:
-                    tab_window = TabPlotWindow()
-                    self.tab_window_dict.update({self.id_counter: tab_window})
-                    sub_node.tab_window_id = self.id_counter
-                    self.id_counter += 1
-                    sub_node.save_path = save_path_sub
-                    self.leave_nodes.append(sub_node)
-                    parent_tab_widget.addTab(tab_window, sub_node.name)
+                    self._register_leave_node(sub_node, save_path_sub)
+                    tab_container = QtWidgets.QWidget()
+                    tab_container.setLayout(QtWidgets.QVBoxLayout())
+                    tab_container.layout().setContentsMargins(0, 0, 0, 0)
+                    self.tab_container_dict.update({sub_node.tab_window_id: tab_container})
+                    parent_tab_widget.addTab(tab_container, sub_node.name)
+                    tab_leave_nodes.append(sub_node)
+                elif self._is_large_leave_group(sub_node):
+                    parent_tab_widget.addTab(create_leave_browser(sub_node, save_path_sub), sub_node.name)
+                    tab_leave_nodes.append(None)
                 else:
                     tab_widget = QtWidgets.QTabWidget()
                     parent_tab_widget.addTab(tab_widget, sub_node.name)
                     create_sub_tabs(sub_node, tab_widget, save_path_sub)
+                    tab_leave_nodes.append(None)
+
+            parent_tab_widget.currentChanged.connect(lambda idx: self._show_leave(tab_leave_nodes[idx])
+                                                     if idx >= 0 else None)
+            if parent_tab_widget.currentIndex() >= 0:
+                self._show_leave(tab_leave_nodes[parent_tab_widget.currentIndex()])
+
+        def create_leave_browser(node: MyNode, save_path: str) -> LeaveBrowserWidget:
+            for sub_node in node.children:
+                self._register_leave_node(sub_node, os.path.join(save_path, sub_node.name))
+
+            leave_browser = LeaveBrowserWidget(leave_names=[sub_node.name for sub_node in node.children],
+                                               tab_window_ids=[sub_node.tab_window_id for sub_node in node.children])
+            for sub_node in node.children:
+                self.tab_container_dict.update({sub_node.tab_window_id: leave_browser})
+            leave_browser.leave_selected_sig.connect(self._show_tab_window)
+            leave_browser.select_first_leave()
+            return leave_browser
+
+        if self._is_large_leave_group(root):
+            self.major_tab_widget.addTab(create_leave_browser(root, self.root_save_path), root.name)
+        else:
+            create_sub_tabs(root, self.major_tab_widget, self.root_save_path)
+
+    def _is_large_leave_group(self, node: MyNode) -> bool:
+        return (len(node.children) > self.max_nb_of_leave_tabs) and all([child.is_leaf for child in node.children])
+
+    def _register_leave_node(self, node: LeaveNode, save_path: str):
+        """Assign id and save path to the leave. The save directory is created by the module process/when saving."""
+        node.tab_window_id = self.id_counter
+        self.id_counter += 1
+        node.save_path = save_path
+        self.leave_nodes.append(node)
+
+    def _show_leave(self, node: Optional[LeaveNode]):
+        if node is not None:
+            self._show_tab_window(node.tab_window_id)
+
+    def _show_tab_window(self, tab_window_id: int):
+        """Create the tab window (if not yet done) and put it into its tab/leave browser."""
 
-        create_sub_tabs(root, self.major_tab_widget, self.root_save_path)
+        tab_container = self.tab_container_dict[tab_window_id]
+
+        if tab_window_id not in self.tab_window_dict:
+            tab_window = self._create_tab_window(tab_window_id)
+            self.tab_window_dict.update({tab_window_id: tab_window})
+            del self.buffered_results_dict[tab_window_id]
+            if not isinstance(tab_container, LeaveBrowserWidget):
+                tab_container.layout().addWidget(tab_window)
+
+        if isinstance(tab_container, LeaveBrowserWidget):
+            tab_container.show_tab_window(self.tab_window_dict[tab_window_id])
+
+    def _create_tab_window(self, tab_window_id: int) -> TabPlotWindow:
+        """Create a new tab window and fill it with the buffered results of the leave."""
+
+        tab_window = TabPlotWindow()
+        for result in self.buffered_results_dict.setdefault(tab_window_id, []):
+            self._pass_result_to_tab_window(result, tab_window)
+        return tab_window
 
     def get_save_path_list(self, parent_path: str, list_to_be_evaluated: list):
         total_save_path_list = []
@@ -160,7 +237,28 @@ class MainPlotWindow(QtWidgets.QMainWindow):
     def process_result(self, result: Union[PlotContainer, OptimizationResultsContainer, VariationResultsContainer],
                        node: LeaveNode):
 
-        tab_window = self.tab_window_dict[node.tab_window_id]
+        if node.tab_window_id in self.tab_window_dict:
+            self._pass_result_to_tab_window(result, self.tab_window_dict[node.tab_window_id])
+        else:
+            self._buffer_result(result, node.tab_window_id)
+
+    def _buffer_result(self, result: Union[PlotContainer, OptimizationResultsContainer, VariationResultsContainer],
+                       tab_window_id: int):
+        """Store result of a leave which is not yet shown. Plots with the same title replace the previous one."""
+
+        buffered_results = self.buffered_results_dict.setdefault(tab_window_id, [])
+
+        if isinstance(result, PlotContainer):
+            for idx, buffered_result in enumerate(buffered_results):
+                if isinstance(buffered_result, PlotContainer) and (buffered_result.title == result.title):
+                    buffered_results[idx] = result
+                    return
+
+        buffered_results.append(result)
+
+    @staticmethod
+    def _pass_result_to_tab_window(result: Union[PlotContainer, OptimizationResultsContainer,
+                                                 VariationResultsContainer], tab_window: TabPlotWindow):
 
         if isinstance(result, PlotContainer):
             tab_window.plot(result.fig, result.title, result.save)
@@ -174,7 +272,12 @@ class MainPlotWindow(QtWidgets.QMainWindow):
     def save_all(self, save_file_format: SaveDataFileFormats):
 
         for leave_node in self.leave_nodes:
-            tab_window = self.tab_window_dict[leave_node.tab_window_id]
+            os.makedirs(leave_node.save_path, exist_ok=True)
+            if leave_node.tab_window_id in self.tab_window_dict:
+                tab_window = self.tab_window_dict[leave_node.tab_window_id]
+            else:
+                # leave was never shown -> use a temporary tab window which is discarded after saving
+                tab_window = self._create_tab_window(leave_node.tab_window_id)
             tab_window.save(leave_node.save_path, save_file_format)
 
     def closeEvent(self, event):
@@ -1,5 +1,6 @@
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 from simojio.lib.plotter.PlotDataSaver import PlotDataSaver
 from simojio.lib.plotter.SaveDataFileFormats import SaveDataFileFormats
@@ -11,7 +12,7 @@ class PlotCanvas(FigureCanvas):
 
     def __init__(self, parent):
 
-        self.figure = plt.figure()
+        self.figure = Figure()     # placeholder (not managed by pyplot), replaced by the figure of the module
 
         super().__init__(self.figure)
         self.setParent(parent)
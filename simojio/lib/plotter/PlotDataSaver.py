@@ -19,6 +19,9 @@ class PlotDataSaver:
         self.data_set_labels_key = "data-set-labels"
         self.plot_data_key = "plot-data"
 
+        # number format of .csv and .txt files (16 significant digits ~ double precision)
+        self.number_format = "%.16g"
+
     def save_figure_data(self, figure: plt.Figure, figure_save_path: str):
 
         for idx, ax in enumerate(figure.get_axes()):
@@ -39,7 +42,7 @@ class PlotDataSaver:
             # 1D-plot
             if len(ax.lines) > 0:
                 nb_of_different_artists += 1
-                plot_data_lines = [np.array(line.get_xydata()).T.tolist() for line in ax.lines]
+                plot_data_lines = [list(np.asarray(line.get_xydata()).T) for line in ax.lines]
                 data_set_labels_lines = [line.get_label() for line in ax.lines]
 
             # 2D-imshow
@@ -47,9 +50,9 @@ class PlotDataSaver:
                 nb_of_different_artists += 1
 
                 for image in ax.images:
-                    data2d = np.array(image.get_array())[::-1]  # origin is on top left corner
+                    data2d = np.asarray(image.get_array())[::-1]  # origin is on top left corner
                     x_data, y_data = self._extent_to_xy(image.get_extent(), data2d.shape)
-                    plot_data_images.append([x_data, y_data, data2d.tolist()])
+                    plot_data_images.append([x_data, y_data, data2d])
                     data_set_labels_images.append(image.get_label())
 
             # 2D-scatter
@@ -57,14 +60,13 @@ class PlotDataSaver:
                 nb_of_different_artists += 1
 
                 for collection in ax.collections:
-                    if collection.get_offsets().T.tolist() == [[0.], [0.]]:
+                    offsets = np.asarray(collection.get_offsets())
+                    if offsets.shape == (1, 2) and not offsets.any():
                         # Note: Special case are colorbars
                         # They yield [[0.0], [0.0]] for get_offset() -> check for this result and ignore the data in case
                         pass
                     else:
-                        xy_data = np.array(collection.get_offsets()).T.tolist()
-                        z_data = np.array(collection.get_array()).tolist()
-                        xyz_data = xy_data + [z_data]
+                        xyz_data = list(offsets.T) + [np.asarray(collection.get_array())]
 
                         plot_data_collections.append(xyz_data)
                         data_set_labels_collections.append(collection.get_label())
@@ -143,15 +145,15 @@ class PlotDataSaver:
                                    suffix=suffix)
 
     @staticmethod
-    def _extent_to_xy(extent: list, shape_2d) -> (list, list):
+    def _extent_to_xy(extent: list, shape_2d) -> (np.ndarray, np.ndarray):
 
         left, right, bottom, top = extent
 
         horizontal_offset = (right - left) / (2. * shape_2d[1])   # half the length of a pixel
-        x_data = np.linspace(left + horizontal_offset, right - horizontal_offset, shape_2d[1]).tolist()
+        x_data = np.linspace(left + horizontal_offset, right - horizontal_offset, shape_2d[1])
 
         vertical_offset = (top - bottom) / (2. * shape_2d[0])  # half the length of a pixel
-        y_data = np.linspace(bottom + vertical_offset, top - vertical_offset, shape_2d[0]).tolist()
+        y_data = np.linspace(bottom + vertical_offset, top - vertical_offset, shape_2d[0])
 
         return x_data, y_data
 
@@ -166,6 +168,8 @@ class PlotDataSaver:
             self._save_as_csv(file_paths, save_dict)
         elif self.file_format is SaveDataFileFormats.TXT:
             self._save_as_txt(file_paths, save_dict)
+        elif self.file_format is SaveDataFileFormats.NPZ:
+            self._save_as_npz(file_paths[0], save_dict)
         else:
             raise NotImplementedError("File format '" + str(self.file_format) + "' not implemented.")
 
@@ -190,7 +194,7 @@ class PlotDataSaver:
             suffix = "_" + suffix
 
         file_name_list = []
-        if self.file_format is SaveDataFileFormats.JSON:
+        if self.file_format in [SaveDataFileFormats.JSON, SaveDataFileFormats.NPZ]:
             file_name_list = [filename + suffix]
         elif self.file_format in [SaveDataFileFormats.CSV, SaveDataFileFormats.TXT]:
             if len(data_set_labels) > 1:
@@ -207,9 +211,30 @@ class PlotDataSaver:
         """Save as .json file with multiple data sets in one file."""
 
         json_file = open(file_path, 'w', encoding='utf-8')
-        json.dump(save_dict, json_file, sort_keys=True, indent=4)
+        json.dump(save_dict, json_file, sort_keys=True, indent=4, default=self._to_json_serializable)
         json_file.close()
 
+    def _save_as_npz(self, file_path: str, save_dict: dict):
+        """
+        Save as binary .npz file with multiple data sets in one file.
+
+        The arrays are written directly from the plot data buffers. Data set <idx> is stored under the keys
+        'plot-data-<idx>-x', 'plot-data-<idx>-y' (and 'plot-data-<idx>-z' for 2D data), the labels under their save dict
+        keys.
+        """
+
+        arrays = {}
+        for key in [self.title_key, self.x_label_key, self.y_label_key, self.z_label_key]:
+            if key in save_dict:
+                arrays[key] = np.array(str(save_dict[key]) if save_dict[key] is not None else "")
+        arrays[self.data_set_labels_key] = np.array(save_dict[self.data_set_labels_key], dtype=str)
+
+        for data_idx, data in enumerate(save_dict[self.plot_data_key]):
+            for axis_name, axis_data in zip(["x", "y", "z"], data):
+                arrays[self.plot_data_key + "-" + str(data_idx) + "-" + axis_name] = np.asarray(axis_data)
+
+        np.savez(file_path, **arrays)
+
     def _save_as_csv(self, file_paths: List[str], save_dict: dict):
         """
         Save as (multiple) .csv file(s) with one data set per file.
@@ -217,12 +242,7 @@ class PlotDataSaver:
         Problem: 2D data -> convert to column style
         """
 
-        label_keys = [self.x_label_key, self.y_label_key, self.z_label_key]
-        labels = []
-
-        for label_key in label_keys:
-            if label_key in save_dict:
-                labels.append(save_dict[label_key])
+        labels = self._get_labels(save_dict)
 
         for idx, file_path in enumerate(file_paths):
             with open(file_path, 'w', newline='') as outcsv:
@@ -231,24 +251,19 @@ class PlotDataSaver:
 
                 # write header
                 writer.writerow(["plot-title", save_dict[self.title_key]])
-                writer.writerow([labels[idx] for idx in range(len(data[0]))])
+                writer.writerow([labels[idx] for idx in range(data.shape[1])])
 
                 # write data
-                writer.writerows(data)
+                np.savetxt(outcsv, data, fmt=self.number_format, delimiter=",")
 
     def _save_as_txt(self, file_paths: List[str], save_dict: dict):
         """
-        Save as (multiple) .csv file(s) with one data set per file.
+        Save as (multiple) .txt file(s) with one data set per file.
 
         Problem: 2D data -> convert to column style
         """
 
-        label_keys = [self.x_label_key, self.y_label_key, self.z_label_key]
-        labels = []
-
-        for label_key in label_keys:
-            if label_key in save_dict:
-                labels.append(save_dict[label_key])
+        labels = self._get_labels(save_dict)
 
         for idx, file_path in enumerate(file_paths):
             with open(file_path, 'w') as outtxt:
@@ -256,22 +271,35 @@ class PlotDataSaver:
 
                 # write header
                 outtxt.writelines(["# plot-title: " + save_dict[self.title_key] + "\n"])
-                outtxt.writelines("# " + ",".join([labels[idx] for idx in range(len(data[0]))]) + "\n")
+                outtxt.writelines("# " + ",".join([str(labels[idx]) for idx in range(data.shape[1])]) + "\n")
 
                 # write data
-                outtxt.writelines([",".join([str(val) for val in row]) + "\n" for row in data])
+                np.savetxt(outtxt, data, fmt=self.number_format, delimiter=",")
+
+    def _get_labels(self, save_dict: dict) -> List[str]:
+
+        label_keys = [self.x_label_key, self.y_label_key, self.z_label_key]
+        return [save_dict[label_key] for label_key in label_keys if label_key in save_dict]
 
     @staticmethod
-    def _convert_to_column_style(data: list) -> np.array:
+    def _to_json_serializable(obj):
+        """Convert numpy objects (which are not json serializable) to python types when writing .json files."""
+
+        if isinstance(obj, (np.ndarray, np.generic)):
+            return obj.tolist()
+        raise TypeError("Object of type '" + type(obj).__name__ + "' is not JSON serializable.")
+
+    @staticmethod
+    def _convert_to_column_style(data: list) -> np.ndarray:
         """
-        Data can be present as lists with same shape (as meshgrid style in numpy), e.g.
+        Data can be present as arrays with same shape (as meshgrid style in numpy), e.g.
 
         x = [[0.8, .0.7, 0.5], [1.1, 1.2, 1.3]]
         y = [[0.8, .0.7, 0.5], [1.1, 1.2, 1.3]]
         data = [[0.8, .0.7, 0.5], [1.1, 1.2, 1.3]]
 
-        or with 1D-ND-shape meaning that the axis values are given in 1D lists and the actual data are given as
-        multi-dimensional list, e.g.
+        or with 1D-ND-shape meaning that the axis values are given in 1D arrays and the actual data are given as
+        multi-dimensional array, e.g.
 
         x = [1,2,3]
         y = [1,2]
@@ -290,13 +318,12 @@ class PlotDataSaver:
         :return: column_data
         """
 
-        is_1d_list = [len(np.array(item).shape) == 1 for item in data]
+        is_1d_list = [np.ndim(item) == 1 for item in data]
 
         if all(is_1d_list[:-1]) and (not is_1d_list[-1]):
-            # extend axis lists to meshgrid shape of last item
+            # extend axis arrays to meshgrid shape of last item
             data = [item for item in np.meshgrid(*data[:-1])] + [data[-1]]
 
-        column_data = np.array(np.vstack(list((map(np.ravel, data))))).T
+        column_data = np.column_stack([np.ravel(item) for item in data])
 
         return column_data
-
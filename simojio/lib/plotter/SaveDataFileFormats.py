@@ -7,3 +7,4 @@ class SaveDataFileFormats(str, Enum):
     JSON = ".json"
     CSV = ".csv"
     TXT = ".txt"
+    NPZ = ".npz"
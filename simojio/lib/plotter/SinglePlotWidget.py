@@ -1,4 +1,8 @@
 import PySide6.QtWidgets as QtWidgets
+from PySide6.QtCore import Signal
+import matplotlib.pyplot as plt
+import pickle
+import os
 
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from simojio.lib.plotter.PlotCanvas import PlotCanvas
@@ -6,6 +10,12 @@ from simojio.lib.plotter.SaveDataFileFormats import SaveDataFileFormats
 
 
 class SinglePlotWidget(QtWidgets.QScrollArea):
+    """
+    Widget showing a single figure. In order to limit the memory usage, the figure can be moved to disk (spill) and is
+    rendered again on demand (restore).
+    """
+
+    restored_sig = Signal()     # emitted if the user restores a spilled figure
 
     def __init__(self, plot_every_steps: int):
         super().__init__()
@@ -23,31 +33,108 @@ class SinglePlotWidget(QtWidgets.QScrollArea):
 
         self.current_fig = None
 
+        self.is_pinned = False          # pinned figures are never spilled
+        self.spill_path = None          # path of the pickled figure if it is spilled (not rendered)
+        self.show_plot_button = None
+
     def update_plot(self, fig):
 
+        if (self.current_fig is not None) and (self.current_fig is not fig):
+            plt.close(self.current_fig)
+
         self.current_fig = fig
-        if (self.update_counter % self.plot_every_steps) == 0:
+        if (self.canvas is None) or (self.update_counter % self.plot_every_steps) == 0:
             self._renew_canvas()
             self.canvas.update_plot(fig)
         self.update_counter += 1
 
-    def _renew_canvas(self):
+    def is_spilled(self) -> bool:
+        return self.spill_path is not None
+
+    def spill(self, spill_path: str):
+        """Pickle the figure to the given path and release the canvas."""
+
+        # store figure with the initial size as defined in the module (not the size of the current window)
+        self.current_fig.set_size_inches(*self.canvas.fig_size)
+        with open(spill_path, 'wb') as spill_file:
+            pickle.dump(self.current_fig, spill_file)
+
+        plt.close(self.current_fig)
+        self.current_fig = None
+        self.spill_path = spill_path
+        self._remove_canvas()
+
+        self.show_plot_button = QtWidgets.QPushButton("Show plot")
+        self.show_plot_button.setToolTip("Plot was removed from memory to limit the number of shown plots")
+        self.show_plot_button.clicked.connect(self._show_plot_button_clicked)
+        self.layout.addWidget(self.show_plot_button)
+
+    def restore(self):
+        """Load spilled figure and render it again."""
+
+        with open(self.spill_path, 'rb') as spill_file:
+            fig = pickle.load(spill_file)
+        self.discard_spill()
+
+        self.current_fig = fig
+        self._renew_canvas()
+        self.canvas.update_plot(fig)
+
+    def discard_spill(self):
+        """Delete the spilled figure (e.g. if it is outdated), the widget is empty until the next update_plot()."""
+
+        os.remove(self.spill_path)
+        self.spill_path = None
+
+        self.layout.removeWidget(self.show_plot_button)
+        self.show_plot_button.deleteLater()
+        self.show_plot_button = None
+
+    def _show_plot_button_clicked(self):
+        self.restore()
+        self.restored_sig.emit()
+
+    def _pin_check_box_toggled(self, checked: bool):
+        self.is_pinned = checked
+
+    def _remove_canvas(self):
 
         if self.toolbar is not None:
             self.layout.removeWidget(self.toolbar)
             self.toolbar.deleteLater()
+            self.toolbar = None
         if self.canvas is not None:
             self.layout.removeWidget(self.canvas)
             self.canvas.deleteLater()
+            self.canvas = None
+
+    def _renew_canvas(self):
+
+        self._remove_canvas()
 
         self.canvas = PlotCanvas(self)
         self.toolbar = NavigationToolbar(self.canvas, self)
+
+        pin_check_box = QtWidgets.QCheckBox("pin")
+        pin_check_box.setToolTip("Keep plot rendered (it is not removed from memory if too many plots are shown)")
+        pin_check_box.setChecked(self.is_pinned)
+        pin_check_box.toggled.connect(self._pin_check_box_toggled)
+        self.toolbar.addWidget(pin_check_box)
+
         self.layout.addWidget(self.toolbar)
         self.layout.addWidget(self.canvas)
 
     def save_figure(self, figure_save_path: str, save_file_format: SaveDataFileFormats):
+
+        spill_path = self.spill_path
+        if spill_path is not None:
+            self.restore()
+
         self.canvas.save_figure(figure_save_path, save_file_format)
         self.canvas.update_plot(self.current_fig)
 
+        if spill_path is not None:
+            self.spill(spill_path)
+
     def get_url(self):
         return self.canvas.figure.get_url()
@@ -4,6 +4,7 @@ import PySide6.QtCore as QtCore
 import matplotlib
 import matplotlib.pyplot as plt
 import os
+import tempfile
 import numpy as np
 
 from simojio.lib.plotter.SinglePlotWidget import SinglePlotWidget
@@ -23,6 +24,9 @@ class TabPlotWindow(QtWidgets.QMainWindow):
 
     In case of the overview plots the plots are updated from step to step. In order to identify them, their titles are
     stored in a list.
+
+    Only the most recently updated plots (and the pinned ones) are rendered. Older plots are spilled to a temporary
+    directory and rendered again on demand.
     """
 
     def __init__(self, plot_every_steps=1):
@@ -34,6 +38,8 @@ class TabPlotWindow(QtWidgets.QMainWindow):
 
         self.plot_counter = 0
         self.maximum_number_of_shown_plots = 10
+        self.shown_plot_widgets = []    # rendered SinglePlotWidgets, least recently updated first
+        self.spill_dir = None           # temporary directory of the spilled figures (created when needed)
 
         self.variation_results_widget = None
         self.variation_results_plot = None
@@ -48,14 +54,37 @@ class TabPlotWindow(QtWidgets.QMainWindow):
 
         if title in all_titles:
             # figure already exists and is updated here
-            dock_widget = self.figure_list[all_titles.index(title)][0]
-            dock_widget.widget().update_plot(fig)
+            plot_widget = self.figure_list[all_titles.index(title)][0].widget()
+            if plot_widget.is_spilled():
+                plot_widget.discard_spill()     # spilled figure is outdated, the new one is rendered directly
+            plot_widget.update_plot(fig)
         else:
             # figure does not yet exist and needs to be created
             plot_widget = SinglePlotWidget(self.plot_every_steps)
+            plot_widget.restored_sig.connect(lambda: self._set_plot_shown(plot_widget))
             plot_widget.update_plot(fig)
             self.new_dock_widget(plot_widget, title, save)
 
+        self._set_plot_shown(plot_widget)
+
+    def _set_plot_shown(self, plot_widget: SinglePlotWidget):
+        """Mark plot as most recently shown and spill the oldest plots if there are too many (except pinned ones)."""
+
+        if plot_widget in self.shown_plot_widgets:
+            self.shown_plot_widgets.remove(plot_widget)
+        self.shown_plot_widgets.append(plot_widget)
+
+        unpinned_plot_widgets = [widget for widget in self.shown_plot_widgets if not widget.is_pinned]
+        while len(unpinned_plot_widgets) > self.maximum_number_of_shown_plots:
+            oldest_plot_widget = unpinned_plot_widgets.pop(0)
+            self.shown_plot_widgets.remove(oldest_plot_widget)
+            oldest_plot_widget.spill(self._get_spill_path(oldest_plot_widget))
+
+    def _get_spill_path(self, plot_widget: SinglePlotWidget) -> str:
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.TemporaryDirectory(prefix="simojio_plots_")
+        return os.path.join(self.spill_dir.name, "plot_" + str(id(plot_widget)) + ".pickle")
+
     def add_optimization_results(self,
                                  opt_results: simojio.lib.OptimizationResultsContainer.OptimizationResultsContainer):
         widget = OptimizationResultsWidget(opt_results)
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class DipoleDistribution(str, Enum):
+    EQUIDISTANT = "equidistant"
+    GAUSS_LEGENDRE = "Gauss-Legendre"
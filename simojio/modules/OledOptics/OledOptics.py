@@ -1,4 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
 import scipy.integrate as integrate
+from scipy.interpolate import InterpolatedUnivariateSpline
 
 import matplotlib
 import matplotlib.pyplot as plt
@@ -11,7 +15,13 @@ from simojio.lib.BasicFunctions import *
 from simojio.modules.RTA.MaterialFileReader import MaterialFileReader
 from simojio.modules.RTA.TransferMatrix import TransferMatrix
 from simojio.modules.RTA.Polarization import Polarization
+from simojio.modules.RTA.Precision import Precision
 from simojio.modules.OledOptics.PlotMode import PlotMode
+from simojio.modules.OledOptics.UGridMode import UGridMode
+from simojio.modules.OledOptics.SriMode import SriMode
+from simojio.modules.OledOptics.DipoleDistribution import DipoleDistribution
+
+_worker_thread_state = threading.local()    # marks the threads of the pools of OledOptics.map_in_threads()
 
 
 class OledOptics(Calculator):
@@ -31,6 +41,19 @@ class OledOptics(Calculator):
     # emission layers
     nb_dipoles_par = FixFloatParameter(name="number of dipoles", value=1, bounds=(0, 100),
                                        description="Number of active layers that represent the emission profile")
+    dipole_distribution_par = MultiStringParameter(name="dipole distribution",
+                                                   value=DipoleDistribution.EQUIDISTANT.value,
+                                                   description="Positions and weights of the dipoles: equidistant "
+                                                               "(incl. interfaces) or Gauss-Legendre quadrature "
+                                                               "(converges with fewer dipoles)",
+                                                   bounds=[DipoleDistribution.EQUIDISTANT.value,
+                                                           DipoleDistribution.GAUSS_LEGENDRE.value])
+    emission_profile_par = FileFromPathParameter(name="emission profile",
+                                                 path=os.path.join("modules", "shared_resources", "EmissionProfiles"),
+                                                 extension_list=[".txt"],
+                                                 description="Emission profile (relative position in the layer from "
+                                                             "top (0) to bottom (1), relative emission)",
+                                                 value="uniform.txt")
     aniso_par = FloatParameter(name="anisotropy coefficient", value=1. / 3., bounds=(0., 1.),
                                description="anisotropy coefficient")
     gamma_par = FloatParameter(name="gamma", value=1., bounds=(0., 1.),
@@ -46,8 +69,8 @@ class OledOptics(Calculator):
         Layer(layer_type=LayerType.SEMI, parameters=[material_par]),
         Layer(layer_type=LayerType.SUBSTRATE, parameters=[material_par, thickness_par]),
         Layer(layer_type=LayerType.COHERENT, parameters=[material_par, thickness_par]),
-        Layer(layer_type=LayerType.EMISSION, parameters=[material_par, thickness_par, nb_dipoles_par, aniso_par,
-              gamma_par, eta_rad_par, pl_spectrum_par])
+        Layer(layer_type=LayerType.EMISSION, parameters=[material_par, thickness_par, nb_dipoles_par,
+              dipole_distribution_par, emission_profile_par, aniso_par, gamma_par, eta_rad_par, pl_spectrum_par])
     ]
 
     # -- define generic parameters --
@@ -69,14 +92,37 @@ class OledOptics(Calculator):
                                           description="Define whether to plot the power dissipation spectrum")
     calc_sri_flag_par = BoolParameter(name="calculate SRI", value=False,
                                       description="Define whether to calculate the spectral radiant intensity (SRI)")
+    sri_mode_par = MultiStringParameter(name="SRI calculation", value=SriMode.ANGLES.value,
+                                        description="emission angles: separate transfer matrix calculation for the "
+                                                    "emission angles, interpolated: K_out of the wave-vector grid is "
+                                                    "interpolated at the emission angles (faster)",
+                                        bounds=[SriMode.ANGLES.value, SriMode.U_GRID.value])
+    nb_threads_par = FixFloatParameter(name="number of threads", value=1, bounds=(1, 256),
+                                       description="Number of threads for the emission layers and polarizations "
+                                                   "(useful for single runs, e.g. not for variations)")
     calc_eqe_flag_par = BoolParameter(name="calculate EQE", value=False,
                                       description="Calculate the external quantum efficiency")
     calc_loss_channels_flag_par = BoolParameter(name="calculate optical loss channels", value=False,
                                                 description="Calculate the optical loss channels")
+    precision_par = MultiStringParameter(name="precision", value=Precision.DOUBLE.value,
+                                         description="Floating point precision of the transfer matrix calculation "
+                                                     "(single precision is faster, e.g. for coarse parameter sweeps)",
+                                         bounds=[Precision.DOUBLE.value, Precision.SINGLE.value])
+    u_grid_mode_par = MultiStringParameter(name="wave-vector grid", value=UGridMode.UNIFORM.value,
+                                           description="uniform: all wave-vectors, adaptive: wave-vectors are only "
+                                                       "used where needed (the step is the finest resolution)",
+                                           bounds=[UGridMode.UNIFORM.value, UGridMode.ADAPTIVE.value])
+    u_grid_tolerance_par = FixFloatParameter(name="wave-vector grid tolerance", value=1.e-4, bounds=(0., 1.),
+                                             description="adaptive grid: maximum integration error relative to the "
+                                                         "total dissipated power F")
 
     generic_parameters = [polarization_par, wavelengths_par, wavevectors_par, angles_par,
                           plot_mode_par, calc_powdiss_flag_par, calc_sri_flag_par, calc_eqe_flag_par,
-                          calc_loss_channels_flag_par]
+                          calc_loss_channels_flag_par, precision_par, u_grid_mode_par, u_grid_tolerance_par,
+                          sri_mode_par, nb_threads_par]
+
+    # adaptive wave-vector grid: the initial grid contains every 2**levels-th point of the uniform grid
+    adaptive_u_grid_levels = 5
 
     def __init__(self):
         super().__init__()
@@ -99,6 +145,11 @@ class OledOptics(Calculator):
         self.angles = np.array([])  # emission angles for SRI calculation (rad)
         self.angles_deg = np.array([])  # given emission angles (deg)
         self.pl_spectra_dict = dict()
+        self.precision = Precision.DOUBLE  # precision of the transfer matrix calculation (sets dtype of r, t, R, T)
+        self.u_grid_mode = UGridMode.UNIFORM  # uniform or adaptive wave-vector grid
+        self.u_grid_tolerance = 1.e-4  # relative integration error of the adaptive wave-vector grid
+        self.sri_mode = SriMode.ANGLES  # SRI from separate angle calculation or interpolated from the u grid
+        self.nb_threads = 1  # emission layers (or polarizations for a single one) are calculated in parallel if > 1
 
         # results
         self.K_eml = None  # power dissipation spectrum in EML
@@ -142,6 +193,11 @@ class OledOptics(Calculator):
 
         self.calc_u_mode = any((self.calc_powdiss_flag, self.calc_eqe_flag, self.calc_loss_channels_flag))
         self.plot_mode_powdiss = PlotMode(self.get_generic_parameter_value(self.plot_mode_par))
+        self.precision = Precision(self.get_generic_parameter_value(self.precision_par))
+        self.u_grid_mode = UGridMode(self.get_generic_parameter_value(self.u_grid_mode_par))
+        self.u_grid_tolerance = float(self.get_generic_parameter_value(self.u_grid_tolerance_par))
+        self.sri_mode = SriMode(self.get_generic_parameter_value(self.sri_mode_par))
+        self.nb_threads = int(self.get_generic_parameter_value(self.nb_threads_par))
 
         # get list of polarization values which need to be calculated (convert 'total' to ['s', 'p'])
         polarization_str = self.get_generic_parameter_value(self.polarization_par)
@@ -211,14 +267,17 @@ class OledOptics(Calculator):
         self.eqe = None  # external quantum efficiency
         self.sri = None  # normalized spectral radiant intensity (SRI)
 
+        # reduce the wave-vector grid to the points that are needed for the integration
+        if self.u_grid_mode == UGridMode.ADAPTIVE:
+            self.u_arr = self.get_adaptive_u_arr()
+
         # extend u_list to kz-shape to allow multidimensional multiplication in calculation of K
         self.u_2d_arr = np.tensordot(np.ones(len(self.wavelength_arr)), self.u_arr, axes=0)
 
         # -- calculate power dissipation for each sub-device (single emission layer) --
-        for emission_layer_idx in self.emission_layer_index_list:
+        sub_device_results = self.map_in_threads(self.calc_Ks_and_efficiencies, self.emission_layer_index_list)
 
-            # -- get normalized PL spectrum --
-            K_eml, sri, eqe, loss_channels_list = self.calc_Ks_and_efficiencies(emission_layer_idx)
+        for K_eml, sri, eqe, loss_channels_list in sub_device_results:
 
             if self.calc_powdiss_flag:
                 if self.K_eml is None:
@@ -316,7 +375,7 @@ class OledOptics(Calculator):
                 if len(self.wavelength_arr) == 1:
                     integration_value += self.pl_spectra_dict[key][0]
                 else:
-                    integration_value += integrate.trapz(y=self.pl_spectra_dict[key], x=self.wavelength_arr)
+                    integration_value += integrate.trapezoid(y=self.pl_spectra_dict[key], x=self.wavelength_arr)
 
             for key in self.pl_spectra_dict:
                 self.pl_spectra_dict[key] /= integration_value
@@ -405,38 +464,21 @@ class OledOptics(Calculator):
                                                                                                    use_angles=False)
 
         # sri grid
-        if self.calc_sri_flag:
+        if self.calc_sri_flag and self.sri_mode == SriMode.ANGLES:
             up_dict_sri, down_dict_sri, all_coherent_dict_sri, sub_out_dict_sri \
                 = self._get_effective_reflection_dicts(emission_layer_idx, dipole_positions, use_angles=True)
             u_2d_arr_sri = np.tensordot(nk_arr[0] / nk_arr[emission_layer_idx], np.sin(self.angles), axes=0)
+        elif self.calc_sri_flag:
+            # u of the emission angles as used by the transfer matrix (without absorption in the emission layer)
+            nk_wo_eml_absorption = self._get_nk_without_eml_absorption(emission_layer_idx)
+            u_crit_out_sri = (nk_wo_eml_absorption[0] / nk_wo_eml_absorption[emission_layer_idx]).real
+            u_2d_arr_sri = np.tensordot(u_crit_out_sri, np.sin(self.angles), axes=0)
 
         # -- extend PL-spectrum to shape of K (enable multiplication) --
         pl_spectrum_2d = np.array([pl_spectrum for i in range(len(self.u_arr))]).T
 
         # -- calculate upper integration limit for U calculation --
-        u_crit_out = nk_arr[0] / nk_arr[emission_layer_idx]
-
-        # get u_crit_out 2d
-        u_crit_out_2d = np.zeros(self.u_2d_arr.shape)
-        for i in range(len(self.wavelength_arr)):
-            for j in range(len(self.u_2d_arr[0])):
-                if self.u_2d_arr[i][j] <= u_crit_out[i]:
-                    u_crit_out_2d[i][j] = 1.
-
-        u_crit_sub = None
-        if self.is_substrate_in_stack:
-            u_crit_sub = nk_arr[1] / nk_arr[emission_layer_idx]
-
-        # take smallest n value of organic layers
-        u_crit_wg = []
-        if self.is_substrate_in_stack:
-            nk_org = nk_arr[2:-1].T
-        else:
-            nk_org = nk_arr[1:-1].T
-        for i in range(len(self.wavelength_arr)):
-            idx_min = np.argmin([nk.real for nk in nk_org[i]])
-            u_crit_wg.append(nk_arr[idx_min][i] / nk_arr[emission_layer_idx][i])
-        u_crit_wg = np.array(u_crit_wg)
+        u_crit_out, u_crit_sub, u_crit_wg = self.get_critical_u_arrays(emission_layer_idx)
 
         # --  calculate power dissipation spectrum in EML --
         K_eml_list = []
@@ -456,7 +498,8 @@ class OledOptics(Calculator):
             # Note: this is important for adding them correctly (F different for different dipole positions)
 
             # calculate total dissipated power F (integrate over u from 0 to u_max)
-            F = self.calc_F(K_eml_i)
+            cumulative_U_eml = self.calc_cumulative_U(K_eml_i)
+            F = self.calc_F(K_eml_i, cumulative_U=cumulative_U_eml)
 
             # calculate effective radiative efficiency (eta_rad_eff) for each wavelength
             eta_rad_eff = self._eta_rad_effective_formula(F, eta_rad)   # np.array
@@ -471,13 +514,17 @@ class OledOptics(Calculator):
             K_eml_list.append(K_eml_weighted_i)
 
             # -- calculate sri --
-            if self.calc_sri_flag:
+            if self.calc_sri_flag and self.sri_mode == SriMode.ANGLES:
                 K_eml_sri_i, K_sub_sri_i, K_out_sri_i = self._calc_Ks_for_single_dipole(u_2d_arr_sri,
                                                                                         up_dict_sri,
                                                                                         down_dict_sri,
                                                                                         all_coherent_dict_sri,
                                                                                         sub_out_dict_sri,
                                                                                         anisotropy_coefficient, i)
+            elif self.calc_sri_flag:
+                K_out_sri_i = self.interpolate_on_u_grid(K_out_i, u_2d_arr_sri, u_crit=u_crit_out_sri)
+
+            if self.calc_sri_flag:
 
                 sri_i = self.sri_formula(K_out=K_out_sri_i, nk_out=nk_arr[0], nk_eml=nk_arr[emission_layer_idx],
                                          pl_spectrum=pl_spectrum, angles=self.angles)
@@ -503,7 +550,8 @@ class OledOptics(Calculator):
                                                            eta_rad_eff=eta_rad_eff,
                                                            dipole_weight=dipole_weight_arr[i],
                                                            gamma=gamma,
-                                                           pl_spectrum=pl_spectrum)
+                                                           pl_spectrum=pl_spectrum,
+                                                           cumulative_U_eml=cumulative_U_eml)
 
                 loss_channel_list.append(loss_channels_i)
 
@@ -526,13 +574,135 @@ class OledOptics(Calculator):
 
         return K_eml, sri, eqe, loss_channels
 
-    def _get_effective_reflection_dicts(self, emission_layer_idx: int, dipole_positions: np.array, use_angles=False):
+    def get_critical_u_arrays(self, emission_layer_idx: int) -> (np.array, np.array, np.array):
+        """
+        Critical in-plane wave-vectors (integration limits) of the outcoupled, substrate and waveguided modes for each
+        wavelength.
+        :return: u_crit_out, u_crit_sub (None without substrate), u_crit_wg
+        """
+
+        nk_arr = np.array([np.array(nk_layer) for nk_layer in self.optical_constants_arr])
+
+        u_crit_out = nk_arr[0] / nk_arr[emission_layer_idx]
+
+        u_crit_sub = None
+        if self.is_substrate_in_stack:
+            u_crit_sub = nk_arr[1] / nk_arr[emission_layer_idx]
+
+        # take smallest n value of organic layers
+        if self.is_substrate_in_stack:
+            nk_org = nk_arr[2:-1]
+        else:
+            nk_org = nk_arr[1:-1]
+        idx_min = np.argmin(nk_org.real, axis=0)     # for each wavelength
+        u_crit_wg = nk_arr[idx_min, np.arange(len(self.wavelength_arr))] / nk_arr[emission_layer_idx]
+
+        return u_crit_out, u_crit_sub, u_crit_wg
+
+    def get_adaptive_u_arr(self) -> np.array:
+        """
+        Adaptive in-plane wave-vector grid, a subset of the uniform grid given by the wave-vectors parameter.
+
+        The grid starts with every 2**adaptive_u_grid_levels-th point of the uniform grid. An interval is bisected (at
+        the uniform grid point in its middle) if the integrand 2*K*u of K_eml, K_sub or K_out in its middle deviates
+        from the linear interpolation by more than the tolerance relative to F (the trapezoid errors of all intervals
+        then add up to less than tolerance * F) or if it contains a critical u (outcoupled, substrate, waveguided modes,
+        u=1) of any wavelength. Intervals around the critical u's are therefore resolved with the uniform step, as
+        needed for the integration limits of calc_U().
+        """
+
+        u_uniform = self.u_arr.real
+        coarse_step = 2 ** self.adaptive_u_grid_levels
+        if len(u_uniform) <= coarse_step + 1:
+            return self.u_arr
+
+        # range of the critical u's over all wavelengths
+        critical_ranges = [(1., 1.)]
+        for emission_layer_idx in self.emission_layer_index_list:
+            for u_crit in self.get_critical_u_arrays(emission_layer_idx):
+                if u_crit is not None:
+                    critical_ranges.append((np.min(u_crit.real), np.max(u_crit.real)))
+
+        # grid given as indices of the uniform grid
+        grid_indices = np.unique(np.append(np.arange(0, len(u_uniform), coarse_step), len(u_uniform) - 1))
+        integrands = self._calc_u_grid_integrands(u_uniform[grid_indices])
+        is_active = np.ones(len(grid_indices) - 1, dtype=bool)     # intervals that might need a bisection
+        u_range = u_uniform[-1] - u_uniform[0]
+
+        while True:
+            lower_indices = grid_indices[:-1]
+            upper_indices = grid_indices[1:]
+            candidates = np.flatnonzero(is_active & (upper_indices - lower_indices >= 2))
+            if len(candidates) == 0:
+                break
+
+            mid_indices = (lower_indices[candidates] + upper_indices[candidates]) // 2
+            mid_integrands = self._calc_u_grid_integrands(u_uniform[mid_indices])
+
+            # -- trapezoid error (difference to the bisected interval) compared to the total dissipated power F --
+            F = integrate.trapezoid(y=integrands[:, 0], x=u_uniform[grid_indices], axis=-1)
+            deviation = abs(mid_integrands - (integrands[..., candidates] + integrands[..., candidates + 1]) / 2.)
+            max_deviation = 2. * self.u_grid_tolerance * F / u_range
+            is_inaccurate = np.any(deviation > max_deviation[:, None, :, None], axis=(0, 1, 2))
+
+            u_lower = u_uniform[lower_indices[candidates]]
+            u_upper = u_uniform[upper_indices[candidates]]
+            contains_critical_u = np.any([(u_lower <= u_max) & (u_upper >= u_min) for u_min, u_max in critical_ranges],
+                                         axis=0)
+
+            is_bisected = is_inaccurate | contains_critical_u
+
+            # -- insert midpoints of the bisected intervals, only their two halves are checked again --
+            active_lower_indices = np.append(lower_indices[candidates][is_bisected], mid_indices[is_bisected])
+
+            grid_indices = np.append(grid_indices, mid_indices[is_bisected])
+            integrands = np.append(integrands, mid_integrands[..., is_bisected], axis=-1)
+            sort_indices = np.argsort(grid_indices)
+            grid_indices = grid_indices[sort_indices]
+            integrands = integrands[..., sort_indices]
+
+            is_active = np.isin(grid_indices[:-1], active_lower_indices)
+
+        return self.u_arr[grid_indices]
+
+    def _calc_u_grid_integrands(self, u_real: np.array) -> np.array:
+        """
+        Integrands 2*K*u of K_eml, K_sub and K_out (single dipoles, not weighted) of all emission layers and dipoles.
+        :return: array (emission layer and dipole, K, wavelength, u)
+        """
+
+        u_arr = u_real * (1. + 0.j)
+        u_2d_arr = np.tensordot(np.ones(len(self.wavelength_arr)), u_arr, axes=0)
+
+        integrands = []
+        for emission_layer_idx in self.emission_layer_index_list:
+            emission_layer = self.layer_list[emission_layer_idx]
+            anisotropy_coefficient = self.get_layer_parameter_value(self.aniso_par, emission_layer)
+            dipole_positions, dipole_weight_arr = self.get_dipole_distribution(emission_layer_idx)
+
+            up_dict, down_dict, all_coherent_dict, sub_out_dict = \
+                self._get_effective_reflection_dicts(emission_layer_idx, dipole_positions, u_arr=u_arr)
+
+            for i in range(len(dipole_positions)):
+                Ks = self._calc_Ks_for_single_dipole(u_2d_arr, up_dict, down_dict, all_coherent_dict, sub_out_dict,
+                                                     anisotropy_coefficient, i)
+                integrands.append([(2. * u_2d_arr * K).real for K in Ks])
+
+        return np.array(integrands)
+
+    def _get_effective_reflection_dicts(self, emission_layer_idx: int, dipole_positions: np.array, use_angles=False,
+                                        u_arr=None):
         """
         Calculate reflection and transmission arrays for all polarizations. Initialize TransferMatrix instance with all
         layers of the stack and use the 'run_tm_sub_stack()' method to get the effective reflection/transmission of the
         sub-stacks (e.g. layers above and below the emitting dipole).
+
+        :param u_arr: in-plane wave-vectors (default: self.u_arr), not used for use_angles=True
         """
 
+        if u_arr is None:
+            u_arr = self.u_arr
+
         up_dict = {}            # {'polarization': [a_up, r_up, R_up, T_up]}
         down_dict = {}          # {'polarization': [a_down, r_down, R_down, T_down]}
         all_coherent_dict = {}  # {'polarization': [rc, Rc, Tc]}
@@ -540,9 +710,23 @@ class OledOptics(Calculator):
 
         nk_list = self._get_nk_without_eml_absorption(emission_layer_idx)
 
-        tm_obj = TransferMatrix(nk_list=list(nk_list), thickness_list=self.layer_thickness_list,
+        def get_transfer_matrix() -> TransferMatrix:
+            tm = TransferMatrix(nk_list=list(nk_list), thickness_list=self.layer_thickness_list,
                                 vacuum_wavelengths_list=list(self.wavelength_arr),
-                                is_coherent_list=self.is_coherent_list)
+                                is_coherent_list=self.is_coherent_list, precision=self.precision)
+
+            # set propagation directions (angles or in-plane wave-vectors)
+            if use_angles:
+                tm.set_angles(list(self.angles_deg), layer_idx=0)  # emission angles in top-semi layer
+            else:
+                tm.set_normalized_in_plane_wave_vectors(list(u_arr), layer_idx=emission_layer_idx)
+            return tm
+
+        # a TransferMatrix instance is not thread-safe -> one instance per polarization for parallel calculation
+        if self.nb_threads > 1 and not self.is_worker_thread():
+            tm_obj_list = [get_transfer_matrix() for polarization in self.polarization_list]
+        else:
+            tm_obj_list = [get_transfer_matrix()] * len(self.polarization_list)
 
         # -- get sub-stack index lists --
         all_indices = np.arange(len(nk_list))
@@ -556,13 +740,8 @@ class OledOptics(Calculator):
         # all layers below the emission layer
         down_indices = all_indices[emission_layer_idx:]
 
-        # set propagation directions (angles or in-plane wave-vectors)
-        if use_angles:
-            tm_obj.set_angles(list(self.angles_deg), layer_idx=0)  # emission angles in top-semi layer
-        else:
-            tm_obj.set_normalized_in_plane_wave_vectors(list(self.u_arr), layer_idx=emission_layer_idx)
-
-        for polarization in self.polarization_list:
+        def calc_single_polarization(tm_obj_and_polarization: tuple) -> tuple:
+            tm_obj, polarization = tm_obj_and_polarization
             tm_obj.set_polarization(polarization)
 
             a_up_list = []
@@ -585,23 +764,58 @@ class OledOptics(Calculator):
                 a_down_list.append(tm_obj.r)
                 T_down_list.append(tm_obj.T)
 
-            # store calculated arrays in dictionaries
-            up_dict.update({polarization: [a_up_list, T_up_list]})
-            down_dict.update({polarization: [a_down_list, T_down_list]})
-
             # include additional reflections in incoherent substrate if present
+            all_coherent = None
+            sub_out = None
             if self.is_substrate_in_stack:
 
                 # all coherent layers below the glass substrate
                 tm_obj.run_tm_sub_stack(layer_indices=all_indices[1:], distance_to_first_interface=0.)
-                all_coherent_dict.update({polarization: [tm_obj.R, tm_obj.T]})
+                all_coherent = [tm_obj.R, tm_obj.T]
 
                 # substrate - out interface (out = top semi)
                 tm_obj.run_tm_sub_stack(layer_indices=[1, 0], distance_to_first_interface=0.)
-                sub_out_dict.update({polarization: [tm_obj.R, tm_obj.T]})
+                sub_out = [tm_obj.R, tm_obj.T]
+
+            return [a_up_list, T_up_list], [a_down_list, T_down_list], all_coherent, sub_out
+
+        results = self.map_in_threads(calc_single_polarization, list(zip(tm_obj_list, self.polarization_list)))
+
+        # store calculated arrays in dictionaries
+        for polarization, (up, down, all_coherent, sub_out) in zip(self.polarization_list, results):
+            up_dict.update({polarization: up})
+            down_dict.update({polarization: down})
+            if self.is_substrate_in_stack:
+                all_coherent_dict.update({polarization: all_coherent})
+                sub_out_dict.update({polarization: sub_out})
 
         return up_dict, down_dict, all_coherent_dict, sub_out_dict
 
+    def map_in_threads(self, func, items: list) -> list:
+        """
+        Return [func(item) for item in items], calculated in a thread pool if nb_threads > 1. The results are in the
+        order of the items in any case. NumPy (and the compiled TransferMatrix kernels) release the GIL for large
+        arrays, i.e. independent calculations run in parallel.
+        Only one level is parallelized: nested calls from a worker thread (e.g. polarizations within an emission layer)
+        are calculated serially, i.e. at most nb_threads threads are running.
+        """
+
+        if self.nb_threads <= 1 or len(items) <= 1 or self.is_worker_thread():
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.nb_threads, len(items)),
+                                initializer=self._mark_worker_thread) as executor:
+            return list(executor.map(func, items))
+
+    @staticmethod
+    def is_worker_thread() -> bool:
+        """True if called from a worker thread of map_in_threads()"""
+        return getattr(_worker_thread_state, "is_worker", False)
+
+    @staticmethod
+    def _mark_worker_thread():
+        _worker_thread_state.is_worker = True
+
     def _calc_Ks_for_single_dipole(self, u_2d_arr: np.array, up_dict: dict, down_dict: dict,
                                    all_coherent_dict: dict, sub_out_dict: dict, anisotropy_coefficient: float,
                                    dipole_index: int) -> (np.array, np.array, np.array):
@@ -667,24 +881,28 @@ class OledOptics(Calculator):
 
         U_out = self.calc_U(K_out, u_crit_out)
         integrand_out = dipole_weight * gamma * eta_rad_eff * pl_spectrum * U_out / F
-        eqe = integrate.trapz(y=integrand_out, x=self.wavelength_arr)
+        eqe = integrate.trapezoid(y=integrand_out, x=self.wavelength_arr)
 
         return eqe
 
     def _calc_loss_channels(self, K_eml: np.array, K_sub: np.array, K_out: np.array, F: np.array, u_crit_out: np.array,
                             u_crit_sub: np.array, u_crit_wg: np.array, eta_rad_eff: np.array, dipole_weight: float,
-                            gamma: float, pl_spectrum: np.array) -> list:
+                            gamma: float, pl_spectrum: np.array, cumulative_U_eml=None) -> list:
+
+        # the cumulative integral of K_eml is shared by all U's of the emission layer
+        if cumulative_U_eml is None:
+            cumulative_U_eml = self.calc_cumulative_U(K_eml)
 
         # -- calculate Us (angle integrated power dissipation spectra) --
         U_out = self.calc_U(K_out, u_crit_out)
         U_sub = None
         if self.is_substrate_in_stack:
             U_sub = self.calc_U(K_sub, u_crit_sub)
-        U_wg = self.calc_U(K_eml, u_crit_wg)
+        U_wg = self.calc_U(K_eml, u_crit_wg, cumulative_U=cumulative_U_eml)
 
         if self.is_substrate_in_stack:
-            U_sub_wo_absorption = self.calc_U(K_eml, u_crit_sub)
-        U_out_wo_absorption = self.calc_U(K_eml, u_crit_out)
+            U_sub_wo_absorption = self.calc_U(K_eml, u_crit_sub, cumulative_U=cumulative_U_eml)
+        U_out_wo_absorption = self.calc_U(K_eml, u_crit_out, cumulative_U=cumulative_U_eml)
 
         # -- calculate loss channel efficiencies --
 
@@ -731,7 +949,7 @@ class OledOptics(Calculator):
 
         loss_channel_list = []
         for integrand in integrand_list:
-            loss_channel_list.append(integrate.trapz(y=integrand * 100., x=self.wavelength_arr))
+            loss_channel_list.append(integrate.trapezoid(y=integrand * 100., x=self.wavelength_arr))
 
         return loss_channel_list
 
@@ -744,24 +962,82 @@ class OledOptics(Calculator):
 
         return a_up_arr, a_down_arr
 
-    def calc_U(self, K: np.array, u_crit: np.array) -> np.array:
-        """calculate U(lambda): 2*integrate(K*u)du up to critical u_crit"""
-
-        U = []
-        integrand = np.array((2. * self.u_2d_arr * K).real)
-        for idx in range(len(self.wavelength_arr)):
-            idx_integration_limit, val = find_nearest(self.u_arr.real, u_crit[idx].real)
-            U.append(integrate.trapz(y=integrand[idx][:(idx_integration_limit + 1)],
-                                     x=self.u_arr.real[:(idx_integration_limit + 1)]))
-        return np.array(U)
-
-    def calc_F(self, K_eml: np.array) -> np.array:
-        """calculate F(lambda): 2*integrate(K*u)du over whole given u_arr"""
-        F = []
-        integrand = np.array((2. * self.u_2d_arr * K_eml).real)
-        for idx in range(len(self.wavelength_arr)):
-            F.append(integrate.trapz(y=integrand[idx], x=self.u_arr.real))
-        return np.array(F)
+    def calc_cumulative_U(self, K: np.array) -> np.array:
+        """
+        calculate 2*integrate(K*u)du from 0 up to each u of u_arr (cumulative trapezoid along u)
+        :return: array of shape (wavelength, u), the first column is 0
+        """
+
+        integrand = (2. * self.u_2d_arr * K).real
+        return integrate.cumulative_trapezoid(y=integrand, x=self.u_arr.real, axis=1, initial=0.)
+
+    def interpolate_on_u_grid(self, values: np.array, u_2d_arr: np.array, u_crit=None) -> np.array:
+        """
+        Linear interpolation of values (wavelength, u) given on u_arr at the in-plane wave-vectors u_2d_arr
+        (wavelength, any number of u's), e.g. K_out at the u's of the emission angles.
+
+        :param u_crit: critical u (for each wavelength) of the medium the light is emitted to. If given, the values are
+            interpolated linearly in cos(theta) = sqrt(1 - (u/u_crit)**2) of this medium instead of u. This follows the
+            square root behaviour of the transmission close to u_crit (grazing emission).
+        """
+
+        u_arr = self.u_arr.real
+        if np.min(u_2d_arr) < u_arr[0] or np.max(u_2d_arr) > u_arr[-1]:
+            raise ValueError("Wave-vectors " + str([np.min(u_2d_arr), np.max(u_2d_arr)])
+                             + " not within the range of the wave-vector grid " + str([u_arr[0], u_arr[-1]]))
+
+        idx_upper = np.clip(np.searchsorted(u_arr, u_2d_arr), 1, len(u_arr) - 1)
+        idx_lower = idx_upper - 1
+
+        x = u_2d_arr
+        x_lower = u_arr[idx_lower]
+        x_upper = u_arr[idx_upper]
+        if u_crit is not None:
+            def cos_theta(u):
+                return np.sqrt(np.clip(1. - (u / u_crit[:, None]) ** 2, 0., None))
+            x, x_lower, x_upper = cos_theta(x), cos_theta(x_lower), cos_theta(x_upper)
+
+        # weight 0 if both grid points are at u_crit or beyond
+        interval_width = x_upper - x_lower
+        weight_upper = np.divide(x - x_lower, interval_width, out=np.zeros(x.shape), where=(interval_width != 0.))
+
+        return (np.take_along_axis(values, idx_lower, axis=1) * (1. - weight_upper)
+                + np.take_along_axis(values, idx_upper, axis=1) * weight_upper)
+
+    def get_integration_limit_indices(self, u_crit: np.array) -> np.array:
+        """index of the u value (of the ascending u_arr) that is closest to u_crit for each wavelength"""
+
+        u_arr = self.u_arr.real
+        u_crit = np.asarray(u_crit).real
+        if len(u_arr) == 1:
+            return np.zeros(u_crit.shape, dtype=int)
+
+        idx_upper = np.clip(np.searchsorted(u_arr, u_crit), 1, len(u_arr) - 1)
+        idx_lower = idx_upper - 1
+        is_lower_closer = np.abs(u_crit - u_arr[idx_lower]) <= np.abs(u_arr[idx_upper] - u_crit)
+
+        return np.where(is_lower_closer, idx_lower, idx_upper)
+
+    def calc_U(self, K: np.array, u_crit: np.array, cumulative_U=None) -> np.array:
+        """
+        calculate U(lambda): 2*integrate(K*u)du up to critical u_crit
+        :param cumulative_U: result of calc_cumulative_U(K) (calculated if not given)
+        """
+
+        if cumulative_U is None:
+            cumulative_U = self.calc_cumulative_U(K)
+        idx_integration_limit = self.get_integration_limit_indices(u_crit)
+        return np.take_along_axis(cumulative_U, idx_integration_limit[:, None], axis=1)[:, 0]
+
+    def calc_F(self, K_eml: np.array, cumulative_U=None) -> np.array:
+        """
+        calculate F(lambda): 2*integrate(K*u)du over whole given u_arr
+        :param cumulative_U: result of calc_cumulative_U(K_eml) (calculated if not given)
+        """
+
+        if cumulative_U is None:
+            cumulative_U = self.calc_cumulative_U(K_eml)
+        return cumulative_U[:, -1]
 
     def get_up_down_subdevice_indices(self, emission_layer_idx: int) -> (np.array, np.array):
 
@@ -799,6 +1075,8 @@ class OledOptics(Calculator):
     def get_dipole_distribution(self, emission_layer_idx) -> (np.array, np.array):
         """
         Get distance of each dipole with respect to the top interface of the layer and the weight of each dipole.
+        The weights include the emission profile and add up to the number of dipoles (the results of the dipoles are
+        summed up and divided by the number of dipoles).
         :return dipole_positions, dipole_weights
         """
 
@@ -806,17 +1084,41 @@ class OledOptics(Calculator):
         emission_layer = self.layer_list[emission_layer_idx]
 
         nb_dipoles = int(self.get_layer_parameter_value(self.nb_dipoles_par, emission_layer))
+        dipole_distribution = DipoleDistribution(self.get_layer_parameter_value(self.dipole_distribution_par,
+                                                                                emission_layer))
 
         if nb_dipoles == 1:
-            dipole_position_arr = np.array([layer_thickness / 2.])
+            relative_positions = np.array([0.5])
+            quadrature_weights = np.array([1.])
+        elif dipole_distribution == DipoleDistribution.GAUSS_LEGENDRE:
+            # nodes and weights on [-1, 1] -> [0, 1]
+            nodes, quadrature_weights = np.polynomial.legendre.leggauss(nb_dipoles)
+            relative_positions = (nodes + 1.) / 2.
         else:
-            dipole_position_arr = np.arange(nb_dipoles) * layer_thickness / (nb_dipoles - 1)
+            relative_positions = np.arange(nb_dipoles) / (nb_dipoles - 1)
+            quadrature_weights = np.ones(nb_dipoles)
 
-        # dipole weigths Todo: include emission profiles
-        dipole_weights = np.array([1.] * nb_dipoles)
+        dipole_position_arr = relative_positions * layer_thickness
+
+        # weight quadrature with emission profile
+        emission_profile_file = self.get_layer_parameter_value(self.emission_profile_par, emission_layer)
+        emission_profile = self._get_emission_profile_from_file(emission_profile_file, relative_positions)
+
+        dipole_weights = quadrature_weights * emission_profile
+        if np.sum(dipole_weights) <= 0.:
+            raise ValueError("Emission profile " + emission_profile_file + " is zero at all dipole positions")
+        dipole_weights *= nb_dipoles / np.sum(dipole_weights)
 
         return dipole_position_arr, dipole_weights
 
+    def _get_emission_profile_from_file(self, emission_profile_file: str, relative_positions: np.array) -> np.array:
+        """Read emission profile (.txt) and interpolate to the relative positions (0: top, 1: bottom interface)"""
+        profile_data = np.atleast_2d(np.loadtxt(os.path.join(self.emission_profile_par.path, emission_profile_file)))
+        if len(profile_data) == 1:
+            return np.full(len(relative_positions), profile_data[0][1])
+        profile_fct = InterpolatedUnivariateSpline(profile_data.T[0], profile_data.T[1], k=1, ext=3)
+        return profile_fct(relative_positions)
+
     def _get_single_pl_spectrum_from_file(self, pl_spectrum_file: str) -> np.array:
         """Read PL spectrum (.txt), normalize to maximum value, and interpolate to given wavelength grid"""
         pl_spectrum_data = np.loadtxt(os.path.join(self.pl_spectrum_par.path, pl_spectrum_file))
@@ -1014,7 +1316,7 @@ class OledOptics(Calculator):
 
     def get_forward_spectrum_and_index(self) -> (np.array, int):
         """Get emission spectrum at angle closest to zero degree."""
-        idx, value = find_nearest(list(self.angles), 0.)
+        idx, value = find_nearest(self.angles, 0.)
         return self.sri.T[idx], idx
 
     def plot_sri(self):
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class SriMode(str, Enum):
+    ANGLES = "emission angles"
+    U_GRID = "interpolated from wave-vectors"
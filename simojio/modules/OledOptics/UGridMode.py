@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class UGridMode(str, Enum):
+    UNIFORM = "uniform"
+    ADAPTIVE = "adaptive"
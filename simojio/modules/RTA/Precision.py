@@ -0,0 +1,16 @@
+from enum import Enum
+
+import numpy as np
+
+
+class Precision(str, Enum):
+    """Floating point precision of the transfer matrix calculation."""
+
+    DOUBLE = "double (complex128)"
+    SINGLE = "single (complex64)"
+
+    def get_complex_dtype(self):
+        return np.complex128 if self is Precision.DOUBLE else np.complex64
+
+    def get_real_dtype(self):
+        return np.float64 if self is Precision.DOUBLE else np.float32
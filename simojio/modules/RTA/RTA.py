@@ -2,6 +2,7 @@ from simojio.lib.abstract_modules import Calculator
 from simojio.lib.parameters import *
 from simojio.lib.BasicFunctions import *
 from simojio.lib.enums.LayerType import LayerType
+from simojio.lib.enums.ParameterCategory import ParameterCategory
 from simojio.lib.Layer import Layer
 from simojio.modules.RTA.TransferMatrix import TransferMatrix
 from simojio.modules.RTA.Polarization import Polarization
@@ -9,7 +10,7 @@ from simojio.modules.RTA.MaterialFileReader import MaterialFileReader
 
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import List
+from typing import List, Optional
 
 
 class RTA(Calculator):
@@ -75,6 +76,9 @@ class RTA(Calculator):
         self.T_design = None
         self.A_design = None
 
+        self.transfer_matrix = None         # TransferMatrix of the last run (kept for the gradient calculation)
+        self.RTA_design_gradients = None    # {"R design": {parameter key: derivative}, ...}, calculated on request
+
         self.R_2d = np.array([])
         self.T_2d = np.array([])
         self.A_2d = np.array([])
@@ -110,18 +114,28 @@ class RTA(Calculator):
                             vacuum_wavelengths_list=self.wavelengths,
                             is_coherent_list=is_coherent_list)
 
-        # RTA at 0deg
-        R, T, A = self._get_RTA(tm=tm, angles=[0.], polarization=self.polarization)
-        self.R_0deg, self.T_0deg, self.A_0deg = R.T[0], T.T[0], A.T[0]
+        self.transfer_matrix = tm
+        self.RTA_design_gradients = None
+
+        # RTA 2d
+        if self.enable_2D:
+            self.R_2d, self.T_2d, self.A_2d = self._get_RTA(tm=tm, angles=self.angles, polarization=self.polarization)
+
+        # RTA at 0deg (taken from the 2d calculation if 0deg is part of the angles)
+        zero_angle_indices = np.flatnonzero(np.array(self.angles) == 0.)
+        if self.enable_2D and len(zero_angle_indices) > 0:
+            self.R_0deg, self.T_0deg, self.A_0deg = [data[:, zero_angle_indices[0]] for data in [self.R_2d, self.T_2d,
+                                                                                                  self.A_2d]]
+        else:
+            R, T, A = self._get_RTA(tm=tm, angles=[0.], polarization=self.polarization)
+            self.R_0deg, self.T_0deg, self.A_0deg = R.T[0], T.T[0], A.T[0]
         self.plot_1d(self.wavelengths, [self.R_0deg, self.T_0deg, self.A_0deg], title_list)
 
         # RTA at design wavelength and 0deg
         self.R_design, self.T_design, self.A_design = [np.interp(self.design_wavelength, self.wavelengths, data) for
                                                        data in [self.R_0deg, self.T_0deg, self.A_0deg]]
 
-        # RTA 2d
         if self.enable_2D:
-            self.R_2d, self.T_2d, self.A_2d = self._get_RTA(tm=tm, angles=self.angles, polarization=self.polarization)
             self.plot_2d(self.angles, list(self.wavelengths), [self.R_2d, self.T_2d, self.A_2d], title_list)
 
     def get_results_dict(self) -> dict:
@@ -131,6 +145,45 @@ class RTA(Calculator):
             "A design": self.A_design,
         }
 
+    def get_results_gradients_dict(self) -> Optional[dict]:
+        """Analytic derivatives with respect to the layer thicknesses (only for coherent stacks)"""
+
+        if self.transfer_matrix is None or not all(self.transfer_matrix.is_coherent_list[1:-1]):
+            return None
+
+        if self.RTA_design_gradients is None:
+            self.RTA_design_gradients = self._get_RTA_design_thickness_gradients(tm=self.transfer_matrix,
+                                                                                 polarization=self.polarization)
+        return self.RTA_design_gradients
+
+    def _get_RTA_design_thickness_gradients(self, tm: TransferMatrix, polarization: Polarization) -> dict:
+        """Derivatives of RTA at 0deg and design wavelength with respect to the thickness of each inner layer"""
+
+        tm.set_angles(angles=[0.], layer_idx=0)
+
+        if polarization is Polarization.TOTAL:
+            polarizations = [Polarization.S, Polarization.P]
+        else:
+            polarizations = [polarization]
+
+        gradients = {"R design": {}, "T design": {}, "A design": {}}
+        for pol in polarizations:
+            tm.set_polarization(pol)
+            for layer_idx, (dr, dt, dR, dT) in tm.calc_thickness_derivatives().items():
+                dR_design = np.interp(self.design_wavelength, self.wavelengths, dR[:, 0]) / len(polarizations)
+                dT_design = np.interp(self.design_wavelength, self.wavelengths, dT[:, 0]) / len(polarizations)
+
+                # index of the layer in the layer list of the sample (the list is reversed for bottom illumination)
+                if self.illumination_direction == self.bottom_illumination:
+                    layer_idx = len(self.layer_list) - 1 - layer_idx
+                parameter_key = (ParameterCategory.LAYER, layer_idx, self.thickness_par.name)
+
+                for name, derivative in [("R design", dR_design), ("T design", dT_design),
+                                         ("A design", - dR_design - dT_design)]:
+                    gradients[name][parameter_key] = gradients[name].get(parameter_key, 0.) + derivative
+
+        return gradients
+
     def _get_RTA_at_design_wavelength(self) -> (float, float, float):
         """Extract RTA at 0deg and design wavelength. Interpolate RTA values."""
         return [np.interp(self.design_wavelength, self.wavelengths, data) for data in [self.R_0deg, self.T_0deg,
@@ -184,11 +237,13 @@ class RTA(Calculator):
         tm.set_angles(angles=angles, layer_idx=0)  # top to bottom
 
         if polarization is Polarization.TOTAL:
-            Rs, Ts, As = RTA_single(tm, Polarization.S)
-            Rp, Tp, Ap = RTA_single(tm, Polarization.P)
+            # both polarizations in one pass (shared propagation phases and kz-values)
+            results = tm.run_tm_both_polarizations()
+            Rs, Ts = np.array(results[Polarization.S][2]), np.array(results[Polarization.S][3])
+            Rp, Tp = np.array(results[Polarization.P][2]), np.array(results[Polarization.P][3])
             R = (Rs + Rp) / 2.
             T = (Ts + Tp) / 2.
-            A = (As + Ap) / 2.
+            A = np.ones(R.shape) - R - T
         else:
             R, T, A = RTA_single(tm, polarization)
 
@@ -2,6 +2,8 @@ import numpy as np
 from typing import List, Optional, Union
 
 from simojio.modules.RTA.Polarization import Polarization
+from simojio.modules.RTA.Precision import Precision
+from simojio.modules.RTA import compiled_kernels
 
 
 class TransferMatrix:
@@ -12,10 +14,19 @@ class TransferMatrix:
     The propagation directions can be defined in two different ways:
     (1) propagation angles in one layer
     (2) normalized in-plane wave-vector in one layer
+
+    With Precision.SINGLE, the kz-values (calculated in double precision) and all matrices are stored as complex64. This
+    halves the memory traffic of the layer recursion at the cost of ~1e-6 relative accuracy.
+
+    If numba is installed, the layer recursion of coherent sub-stacks is evaluated by a compiled kernel (see
+    compiled_kernels.py). Position-resolved calculations always use the numpy implementation.
     """
 
+    use_compiled_kernels = compiled_kernels.is_available    # set to False to force the numpy implementation
+
     def __init__(self, nk_list: List[List[Union[float, complex]]], thickness_list: List[float],
-                 vacuum_wavelengths_list: List[float], is_coherent_list: Optional[List[bool]]=None):
+                 vacuum_wavelengths_list: List[float], is_coherent_list: Optional[List[bool]]=None,
+                 precision: Precision = Precision.DOUBLE):
         """
         Initialize simulation input.
         Note: units of d_list and wavelengths must be the same.
@@ -24,10 +35,15 @@ class TransferMatrix:
         :param thickness_list: thickness of each layer, first and last layer thickness is ignored
         :param vacuum_wavelengths_list: needs to fit to nk-list for each layer
         :param is_coherent_list: [bool] -> True for coherent layers, False for incoherent layers
+        :param precision: Precision.DOUBLE (complex128) or Precision.SINGLE (complex64)
         """
 
         self.polarization = None
 
+        self.precision = precision
+        self.complex_dtype = precision.get_complex_dtype()
+        self.real_dtype = precision.get_real_dtype()
+
         self.nk_list = nk_list
         self.thickness_list = thickness_list                    # layer thickness list (layer)
         self.vacuum_wavelengths_list = vacuum_wavelengths_list  # vacuum wavelengths (layer)
@@ -40,6 +56,10 @@ class TransferMatrix:
 
         self.kzs_3d = None                  # out-of-plane wave-vector kz (layer, wavelength, angle)
         self.nks_3d = None                  # complex refractive index (layer, wavelength, angle)
+        self.kz_state_version = 0           # incremented whenever the propagation directions (kz-values) change
+
+        # sub-stack results {(layer indices, distance to first interface, polarization, kz version): (r, t, R, T)}
+        self.sub_stack_cache = {}
 
         self.positions = None
 
@@ -89,14 +109,15 @@ class TransferMatrix:
         """
 
         # reshape nk-array to given angle dimension
-        self.nks_3d = np.tensordot(np.array(self.nk_list), np.ones(len(angles)), axes=0)
+        self.nks_3d = np.tensordot(np.array(self.nk_list), np.ones(len(angles)), axes=0).astype(self.complex_dtype)
 
         angles_rad = np.array(angles) * np.pi / 180.
         kappa = np.tensordot(self.k_length_arr[layer_idx], np.sin(angles_rad), axes=0)
         k_length_arr_3d = np.tensordot(self.k_length_arr, np.ones(len(angles)), axes=0)
 
         self.kzs_3d = np.array([np.sqrt(k_length_arr_3d[idx] ** 2 - kappa **2)
-                                for idx in range(len(self.k_length_arr))])
+                                for idx in range(len(self.k_length_arr))]).astype(self.complex_dtype)
+        self._reset_sub_stack_cache()
 
     def set_normalized_in_plane_wave_vectors(self, normalized_in_plane_wave_vectors: List[float], layer_idx: int):
         """
@@ -122,13 +143,14 @@ class TransferMatrix:
         u = np.array(normalized_in_plane_wave_vectors)
 
         # reshape nk-array to given in-plane wave-vactor dimension
-        self.nks_3d = np.tensordot(np.array(self.nk_list), np.ones(len(u)), axes=0)
+        self.nks_3d = np.tensordot(np.array(self.nk_list), np.ones(len(u)), axes=0).astype(self.complex_dtype)
 
         kappa = np.tensordot(self.k_length_arr[layer_idx], u, axes=0)
         k_length_arr_3d = np.tensordot(self.k_length_arr, np.ones(len(u)), axes=0)
 
         self.kzs_3d = np.array([np.sqrt(k_length_arr_3d[idx] ** 2 - kappa ** 2)
-                                for idx in range(len(self.k_length_arr))])
+                                for idx in range(len(self.k_length_arr))]).astype(self.complex_dtype)
+        self._reset_sub_stack_cache()
 
     def run_tm(self, do_position_resolved=False):
         """
@@ -143,6 +165,41 @@ class TransferMatrix:
                               distance_to_first_interface=0.,
                               do_position_resolved=do_position_resolved)
 
+    def run_tm_both_polarizations(self) -> dict:
+        """
+        Evaluate the complete stack (see run_tm()) for s- and p-polarized light.
+
+        The polarization-independent work (propagation phases and kz-values at the interfaces) is shared: the transfer
+        matrices of all coherent sub-stacks are calculated for both polarizations in a single pass and stored in the
+        sub-stack cache. The two evaluations of the stack then only combine the cached sub-stacks.
+        The polarization set before is kept (the results r, t, R, T belong to it).
+        :return: {Polarization.S: (r, t, R, T), Polarization.P: (r, t, R, T)}, r and t are None for incoherent stacks
+        """
+
+        if self.kzs_3d is None:
+            raise ValueError("Need to set angles or in-plane wavevectors first")
+
+        layer_indices = list(np.arange(len(self.thickness_list)))
+        is_coherent_stack = all(self.is_coherent_list[1:-1])
+        for idx_list in self._get_coherent_sub_stacks(layer_indices):
+            self._fill_sub_stack_cache_both_polarizations(idx_list, both_directions=not is_coherent_stack)
+
+        polarization = self.polarization
+        results = {}
+        for current_polarization in [Polarization.S, Polarization.P]:
+            self.polarization = current_polarization
+            self.run_tm()
+            if is_coherent_stack:
+                results[current_polarization] = (self.r, self.t, self.R, self.T)
+            else:
+                results[current_polarization] = (None, None, self.R, self.T)
+
+        self.polarization = polarization
+        if polarization is not None:
+            self.run_tm()   # results of the previous polarization (from the cache)
+
+        return results
+
     def run_tm_sub_stack(self, layer_indices: List[int], distance_to_first_interface=0., do_position_resolved=False):
         """
         Execute transfer matrix calculation.
@@ -190,10 +247,16 @@ class TransferMatrix:
             self.r, self.t, self.R, self.T = self._calc_coherent_sub_stack(idx_list=layer_indices,
                                                                            distance_to_first_interface=distance_to_first_interface,
                                                                            do_position_resolved=do_position_resolved)
+            return
+
+        # incoherent stacks only provide R and T (r and t are not defined)
+        key = self._get_sub_stack_key(layer_indices, distance_to_first_interface)
+        if key in self.sub_stack_cache:
+            _, _, self.R, self.T = self.sub_stack_cache[key]
         else:
             # initialize transfer matrix as identity matrix
             L = np.array([[np.ones(self.kzs_3d[0].shape), np.zeros(self.kzs_3d[0].shape)],
-                          [np.zeros(self.kzs_3d[0].shape), np.ones(self.kzs_3d[0].shape)]])
+                          [np.zeros(self.kzs_3d[0].shape), np.ones(self.kzs_3d[0].shape)]], dtype=self.complex_dtype)
             L = np.transpose(L, (2, 3, 0, 1))
 
             # passing sub-units (propagation in incoherent layer + (effective) interface (can be coherent sub-stack))
@@ -215,11 +278,86 @@ class TransferMatrix:
 
             self.R = (L[1, 0] / L[0, 0]).real
             self.T = (1. / L[0, 0]).real
+            self.sub_stack_cache[key] = (None, None, self.R, self.T)
+
+    def calc_thickness_derivatives(self) -> dict:
+        """
+        Analytic derivatives of r, t, R, T of the complete stack (see run_tm()) with respect to the thickness of each
+        inner layer. Only available for coherent stacks.
+
+        The thickness d_k only enters the propagation matrix P_k = diag(exp(-i*kz_k*d_k), exp(i*kz_k*d_k)) of the
+        layer recursion M = J[0, 1] * P[1] * J[1, 2] * ... * P[N-2] * J[N-2, N-1]. With the products M_left[k] of all
+        matrices before P_k and M_right[k] of all matrices after P_k, the derivative of the transfer matrix is
+
+        dM/dd_k = M_left[k] * P_k * diag(-i*kz_k, i*kz_k) * M_right[k]
+
+        The products are calculated once in forward and backward direction (2N matrix products in total).
+        :return: {layer index: (dr, dt, dR, dT)} for all inner layers
+        """
+
+        if self.polarization is None:
+            raise ValueError("No polarization defined. Set via set_polarization() method.")
+
+        if self.kzs_3d is None:
+            raise ValueError("Need to set angles or in-plane wavevectors first")
+
+        if not all(self.is_coherent_list[1:-1]):
+            raise ValueError("Thickness derivatives are only available for coherent stacks")
+
+        nb_layers = len(self.thickness_list)
+        if nb_layers < 3:
+            return {}
+
+        # interface and propagation matrices (wavelength, angle, 2, 2)
+        J_mats = [np.transpose(self._J_matrix(self.kzs_3d[i], self.kzs_3d[i + 1], self.nks_3d[i], self.nks_3d[i + 1]),
+                               (2, 3, 0, 1)) for i in range(nb_layers - 1)]
+        P_mats = [None]
+        for i in range(1, nb_layers - 1):
+            a, d = self._P_matrix_diagonal(self.kzs_3d[i], self.thickness_list[i])
+            P_mat = np.zeros(a.shape + (2, 2), dtype=self.complex_dtype)
+            P_mat[..., 0, 0] = a
+            P_mat[..., 1, 1] = d
+            P_mats.append(P_mat)
+
+        # products before (left) and after (right) the propagation matrix of each inner layer
+        M_left = {1: J_mats[0]}
+        for k in range(2, nb_layers - 1):
+            M_left[k] = np.matmul(np.matmul(M_left[k - 1], P_mats[k - 1]), J_mats[k - 1])
+
+        M_right = {nb_layers - 2: J_mats[nb_layers - 2]}
+        for k in range(nb_layers - 3, 0, -1):
+            M_right[k] = np.matmul(J_mats[k], np.matmul(P_mats[k + 1], M_right[k + 1]))
+
+        M = np.matmul(np.matmul(M_left[1], P_mats[1]), M_right[1])
+        M_00 = np.ma.masked_where(M[..., 0, 0] == 0, M[..., 0, 0])  # avoid divide by zero error
+        r = M[..., 1, 0] / M_00
+        t = 1. / M_00
+
+        # T = |t|^2 * factor (ratio of the kz's of the first and last layer)
+        T_factor = self._T_from_t(np.ones(t.shape, dtype=self.complex_dtype), self.kzs_3d[0], self.kzs_3d[-1])
+
+        derivatives = {}
+        for k in range(1, nb_layers - 1):
+            D_mat = np.zeros(P_mats[k].shape, dtype=self.complex_dtype)
+            D_mat[..., 0, 0] = -1.j * self.kzs_3d[k]
+            D_mat[..., 1, 1] = 1.j * self.kzs_3d[k]
+
+            dM = np.matmul(np.matmul(M_left[k], P_mats[k] * D_mat), M_right[k])
+
+            dr = (dM[..., 1, 0] - r * dM[..., 0, 0]) / M_00
+            dt = - t * dM[..., 0, 0] / M_00
+            dR = 2. * (np.conj(r) * dr).real
+            dT = 2. * (np.conj(t) * dt).real * T_factor
+
+            derivatives[k] = (dr, dt, dR, dT)
+
+        return derivatives
 
     def get_kz_arr(self, layer_idx: int):
         return self.kzs_3d[layer_idx]
 
-    def calc_position_resolved_field_poynting_absorption(self, thetas_0, stepwidth=1.):
+    def calc_position_resolved_field_poynting_absorption(self, thetas_0, stepwidth=1.,
+                                                         max_memory=2 ** 28) -> (np.array, np.array, np.array):
         """
         Calculate field amplitude, Poynting vector amplitude, and absorption for given layer stack position resolved.
         Given: transfer matrix T of complete stack (N-1 layers) and amplitude transmission coefficient t
@@ -230,87 +368,101 @@ class TransferMatrix:
         2) transfer matrix T relates amplitude vectors (E_N = T*E_0, E_0 = T^{-1}*E_N)
         -> Calculation of incident amplitude vector: E_0 = T^{-1}*(t, 0)
 
+        All positions are kept in memory (positions, wavelengths, angles). For fine position grids use the generator
+        iter_position_resolved_field_poynting_absorption(), the memory-mapped variant
+        calc_position_resolved_field_poynting_absorption_to_file(), or calc_layer_integrated_absorption().
+
         :param thetas_0: (rad)
         :param stepwidth: spacial increment between calculated positions along the stack normal
-        :return:
+        :param max_memory: memory ceiling (bytes) for the temporary arrays of a single position block
+        :return: E_intens, Poynting_outofplane, Absorption with shape (position, wavelength, angle)
         """
 
-        # define position grid, where to calculate the amplitudes + initialize amplitude scalars/vectors
-        self.positions = np.arange(0., np.sum(self.thickness_list[1:-1]), stepwidth)
-        splitted_positions = self._split_positions_in_layers(self.positions)
+        blocks = [block[2:] for block in self.iter_position_resolved_field_poynting_absorption(thetas_0, stepwidth,
+                                                                                                max_memory)]
 
-        # initialize lists with shape given by angles and wavelengths grid
-        E_of_z = [np.zeros((2, len(sp)) + self.kzs_3d[0].shape, dtype=complex) for sp in splitted_positions]
-        Poynting_outofplane_of_z = [np.zeros((len(sp),) + self.kzs_3d[0].shape, dtype=complex) for sp in
-                                    splitted_positions]
-        Absorption_of_z = [np.zeros((len(sp),) + self.kzs_3d[0].shape, dtype=complex) for sp in splitted_positions]
-        thetas_of_z = [np.zeros((len(sp),) + self.kzs_3d[0].shape, dtype=complex) for sp in splitted_positions]
-
-        # start with known field amplitudes at bottom semi layer E_N = (t, 0)
-        # Note: If you do the calculation top->bottom you have to invert all matrices which is probably slower
-        E_N = np.array([np.ones(self.kzs_3d[0].shape, dtype=complex) * self.t,
-                        np.zeros(self.kzs_3d[0].shape, dtype=complex)])
-        current_E_after_interface = E_N
-
-        for idx_coherent in range(len(splitted_positions))[::-1]:
-            # go reversely through the coherent layers (neglect semi layers)
-            idx_all = idx_coherent + 1
+        E_intens, Poynting_outofplane, Absorption = [np.concatenate([block[i] for block in blocks], axis=0)
+                                                     for i in range(3)]
 
-            # cross interface from previous layer (i+1 -> i)
-            self._matrices_dot_vectors(self.J_mat_save[idx_all], current_E_after_interface,
-                                       current_E_after_interface)
+        return E_intens, Poynting_outofplane, Absorption
 
-            # propagate (backwards) through current layer i
-            self._matrices_dot_vectors(self.P_mat_save[idx_all], current_E_after_interface,
-                                       current_E_after_interface)
+    def iter_position_resolved_field_poynting_absorption(self, thetas_0, stepwidth=1., max_memory=2 ** 28):
+        """
+        Generator version of calc_position_resolved_field_poynting_absorption(). The positions are evaluated in blocks
+        (top to bottom) such that the temporary arrays of a block do not exceed max_memory (bytes).
 
-            # calculate positions in current layer
-            positions_current_layer = splitted_positions[idx_coherent] - splitted_positions[idx_coherent][0]
+        :param thetas_0: (rad)
+        :param stepwidth: spacial increment between calculated positions along the stack normal
+        :param max_memory: memory ceiling (bytes) for the temporary arrays of a single position block
+        :return: yields (layer_idx, position_slice, E_intens, Poynting_outofplane, Absorption) where position_slice
+                 refers to the position grid self.positions
+        """
 
-            # reshape (extend) positions array to wavelength-kz-grid
-            pos_reshaped = np.transpose(
-                positions_current_layer * np.ones(self.kzs_3d[0].shape + (len(positions_current_layer),)),
-                (2, 0, 1))
+        # define position grid, where to calculate the amplitudes
+        self.positions = self._get_position_grid(stepwidth)
+        splitted_positions = self._split_positions_in_layers(self.positions)
 
-            # calculate position resolved E-field amplitudes by propagating the field directly after the interface
-            a, d = self._P_matrix_diagonal(self.kzs_3d[idx_all], pos_reshaped)
+        E_after_interface_list = self._get_field_amplitudes_after_interfaces(len(splitted_positions))
+        nb_positions_per_block = self._get_nb_positions_per_block(max_memory)
 
-            E_of_z[idx_coherent][0] = current_E_after_interface[0] * d  # NOTE: switched a,d to get forward propagation
-            E_of_z[idx_coherent][1] = current_E_after_interface[1] * a
+        first_index = 0
+        for idx_coherent, layer_positions in enumerate(splitted_positions):
+            idx_all = idx_coherent + 1  # neglect semi layers
 
-            # -- calculate Poyting vector and absorption from the E-field amplitudes (polarization dependent) --
+            # propagation angles in current layer
             thetas = np.arcsin(self.nks_3d[0] * np.sin(thetas_0) / self.nks_3d[idx_all])
 
-            # expand thetas array to splitted positions:
-            thetas_of_z[idx_coherent] = np.transpose(np.tensordot(thetas, np.ones(len(positions_current_layer)), axes=0),
-                                            (2, 0, 1))
-            Poynting_outofplane_of_z[idx_coherent] = self._poynting_from_Efield(E_of_z[idx_coherent],
-                                                                                self.nks_3d[idx_all], thetas)
-            Absorption_of_z[idx_coherent] = self._absorption_from_Efield(E_of_z[idx_coherent], self.nks_3d[idx_all],
-                                                                         thetas, self.kzs_3d[idx_all])
+            # positions in current layer
+            positions_current_layer = layer_positions - layer_positions[0]
 
-        # -- concatenate the individual layers into one array which contains all positions --
-        E = np.concatenate(E_of_z, axis=1)
-        Poynting_outofplane = np.concatenate(Poynting_outofplane_of_z, axis=0)
-        Absorption = np.concatenate(Absorption_of_z, axis=0)
-        thetas_total = np.concatenate(thetas_of_z, axis=0)
+            for start in range(0, len(positions_current_layer), nb_positions_per_block):
+                block_positions = positions_current_layer[start:start + nb_positions_per_block]
+                E_intens, Poynting_outofplane, Absorption = self._calc_field_poynting_absorption_block(
+                    E_after_interface_list[idx_coherent], block_positions, idx_all, thetas)
 
-        # -- add the up and down contribution of the E-field (total field) and square (intensity)
-        if self.polarization == Polarization.S:
-            Ex = 0
-            Ey = E[0] + E[1]
-            Ez = 0
-        elif self.polarization == Polarization.P:
-            Ex = (E[0] - E[1]) * np.cos(thetas_total)
-            Ey = 0
-            Ez = (-E[0] - E[1]) * np.sin(thetas_total)
-        else:
-            raise ValueError("Polarization must be 'Polarization.S' or 'Polarization.P'")
+                position_slice = slice(first_index + start, first_index + start + len(block_positions))
+                yield idx_all, position_slice, E_intens, Poynting_outofplane, Absorption
 
-        E_total = np.sqrt(np.array(Ex) ** 2 + np.array(Ey) ** 2 + np.array(Ez) ** 2)
-        E_intens = np.abs(E_total)
+            first_index += len(layer_positions)
 
-        return E_intens, Poynting_outofplane, Absorption
+    def calc_position_resolved_field_poynting_absorption_to_file(self, file_path: str, thetas_0, stepwidth=1.,
+                                                                 max_memory=2 ** 28) -> np.memmap:
+        """
+        Memory-mapped version of calc_position_resolved_field_poynting_absorption(). The results are written block-wise
+        into a .npy file which is returned as memory map.
+
+        :param file_path: path of the .npy file
+        :return: memory map with shape (3, position, wavelength, angle) -> [E_intens, Poynting_outofplane, Absorption]
+        """
+
+        nb_positions = len(self._get_position_grid(stepwidth))
+        results = np.lib.format.open_memmap(file_path, mode='w+', dtype=self.real_dtype,
+                                            shape=(3, nb_positions) + self.kzs_3d[0].shape)
+
+        for layer_idx, position_slice, E_intens, Poynting_outofplane, Absorption \
+                in self.iter_position_resolved_field_poynting_absorption(thetas_0, stepwidth, max_memory):
+            results[0, position_slice] = E_intens
+            results[1, position_slice] = Poynting_outofplane
+            results[2, position_slice] = Absorption
+
+        results.flush()
+        return results
+
+    def calc_layer_integrated_absorption(self, thetas_0, stepwidth=1., max_memory=2 ** 28) -> np.array:
+        """
+        Absorption of each coherent layer (integrated over the position grid) without materializing the position
+        resolved fields.
+
+        :return: absorption with shape (layer, wavelength, angle), semi layers (first and last) are zero
+        """
+
+        absorption = np.zeros((len(self.thickness_list),) + self.kzs_3d[0].shape, dtype=self.real_dtype)
+
+        for layer_idx, position_slice, E_intens, Poynting_outofplane, Absorption \
+                in self.iter_position_resolved_field_poynting_absorption(thetas_0, stepwidth, max_memory):
+            absorption[layer_idx] += np.sum(Absorption, axis=0) * stepwidth
+
+        return absorption
 
     # def calc_position_resolved_field_poynting_absorption(self, thetas_0, stepwidth=1.):
     #     """
@@ -440,19 +592,120 @@ class TransferMatrix:
                                  do_position_resolved=False) -> (np.array, np.array, np.array, np.array):
         """
         Calculate the transfer matrix of a coherent sub-stack of the total stack which is defined by the layer indices.
+
+        Results are cached for a propagation distance of zero in the first layer. A given distance only adds a phase
+        to the cached amplitudes (r = r_0 * exp(2i*kz*d), t = t_0 * exp(i*kz*d)), so dipole positions within the same
+        layer share one transfer matrix calculation.
         :param idx_list:
         :return: (r, t, R, T)
         """
 
+        if do_position_resolved:
+            T_mat = self._coherent_sub_stack_matrix(idx_list, distance_to_first_interface, do_position_resolved=True)
+            return self._get_r_t_R_T_from_matrix(T_mat, idx_list)
+
+        key = self._get_sub_stack_key(idx_list, 0.)
+        if key not in self.sub_stack_cache:
+            T_mat = self._coherent_sub_stack_matrix(idx_list)
+            self.sub_stack_cache[key] = self._get_r_t_R_T_from_matrix(T_mat, idx_list)
+
+        r, t, R, T = self.sub_stack_cache[key]
+
+        if distance_to_first_interface == 0.:
+            return r, t, R, T
+
+        a, d = self._P_matrix_diagonal(self.kzs_3d[idx_list[0]], distance_to_first_interface)
+        r = r * d ** 2
+        t = t * d
+        R = self._R_from_r(r)
+        T = self._T_from_t(t, self.kzs_3d[idx_list[0]], self.kzs_3d[idx_list[-1]])
+
+        return r, t, R, T
+
+    def _calc_coherent_sub_stack_both_directions(self, idx_list: List[int]) -> ((np.array, np.array, np.array,
+                                                                                 np.array),
+                                                                                (np.array, np.array, np.array,
+                                                                                 np.array)):
+        """
+        Calculate (r, t, R, T) of a coherent sub-stack for both propagation directions from a single transfer matrix.
+
+        For the transfer matrix M of the forward direction, the reverse direction (incidence from the last layer) is
+        given by r_rev = -M[0, 1] / M[0, 0] and t_rev = det(M) / M[0, 0]. The reversed stack does not need to be
+        calculated explicitly.
+        :return: (r, t, R, T), (r_rev, t_rev, R_rev, T_rev)
+        """
+
+        key = self._get_sub_stack_key(idx_list, 0.)
+        key_rev = self._get_sub_stack_key(idx_list[::-1], 0.)
+
+        if key not in self.sub_stack_cache or key_rev not in self.sub_stack_cache:
+            T_mat = self._coherent_sub_stack_matrix(idx_list)
+            self.sub_stack_cache[key] = self._get_r_t_R_T_from_matrix(T_mat, idx_list)
+            self.sub_stack_cache[key_rev] = self._get_reverse_r_t_R_T_from_matrix(T_mat, idx_list)
+
+        return self.sub_stack_cache[key], self.sub_stack_cache[key_rev]
+
+    def _get_coherent_sub_stacks(self, layer_indices: List[int]) -> List[List[int]]:
+        """
+        Split the stack at the incoherent layers into coherent sub-stacks (as done in _get_sub_unit_L()), e.g.
+        [[0, 1, 2, 3]] for a coherent stack or [[0, 1, 2], [2, 3, 4]] if layer 2 is incoherent.
+        """
+
+        sub_stacks = []
+        idx_list = [layer_indices[0]]
+        for idx in layer_indices[1:]:
+            idx_list.append(idx)
+            if idx == layer_indices[-1] or not self.is_coherent_list[idx]:
+                sub_stacks.append(idx_list)
+                idx_list = [idx]
+
+        return sub_stacks
+
+    def _fill_sub_stack_cache_both_polarizations(self, idx_list: List[int], both_directions: bool):
+        """
+        Calculate (r, t, R, T) of a coherent sub-stack for s- and p-polarized light (optionally also for the reverse
+        direction, see _calc_coherent_sub_stack_both_directions()) and store them in the sub-stack cache.
+        """
+
+        polarizations = [Polarization.S, Polarization.P]
+
+        keys = [self._get_sub_stack_key(idx_list, 0., polarization) for polarization in polarizations]
+        if both_directions:
+            keys += [self._get_sub_stack_key(idx_list[::-1], 0., polarization) for polarization in polarizations]
+        if all([key in self.sub_stack_cache for key in keys]):
+            return
+
+        T_mats = self._coherent_sub_stack_matrices_both_polarizations(idx_list)
+
+        for polarization, T_mat in zip(polarizations, T_mats):
+            self.sub_stack_cache[self._get_sub_stack_key(idx_list, 0., polarization)] = \
+                self._get_r_t_R_T_from_matrix(T_mat, idx_list, polarization)
+            if both_directions:
+                self.sub_stack_cache[self._get_sub_stack_key(idx_list[::-1], 0., polarization)] = \
+                    self._get_reverse_r_t_R_T_from_matrix(T_mat, idx_list, polarization)
+
+    def _coherent_sub_stack_matrix(self, idx_list: List[int], distance_to_first_interface=0.,
+                                   do_position_resolved=False) -> np.array:
+        """
+        Calculate the transfer matrix (2, 2, wavelength, angle) of a coherent sub-stack defined by the layer indices.
+        """
+
         self.P_mat_save = []  # initialize lists for saving P and J in case of position-resolved calculations
         self.J_mat_save = []
         self.T_mat_save = []
 
-        zero_mat = np.zeros(self.kzs_3d[idx_list[0]].shape)
-        ones_mat = np.ones(self.kzs_3d[idx_list[0]].shape)
+        if self.use_compiled_kernels and not do_position_resolved:
+            propagation_distances = [distance_to_first_interface] + [self.thickness_list[i] for i in idx_list[1:-1]]
+            return compiled_kernels.coherent_sub_stack_matrix(self.kzs_3d, self.nks_3d, idx_list,
+                                                              propagation_distances,
+                                                              is_p_polarized=self.polarization == Polarization.P,
+                                                              complex_dtype=self.complex_dtype)
+
+        zero_mat = np.zeros(self.kzs_3d[idx_list[0]].shape, dtype=self.real_dtype)
+        ones_mat = np.ones(self.kzs_3d[idx_list[0]].shape, dtype=self.real_dtype)
 
         # intialize transfer matrix as identity matrix
-        T_mat = np.array([[ones_mat, zero_mat], [zero_mat, ones_mat]], dtype=complex)
+        T_mat = np.array([[ones_mat, zero_mat], [zero_mat, ones_mat]], dtype=self.complex_dtype)
         T_mat = np.transpose(T_mat, (2, 3, 0, 1))   # transpose to allow multidimensional multiplication
 
         for i in idx_list[0:-1]:
@@ -463,7 +716,7 @@ class TransferMatrix:
             else:
                 layer_thickness = self.thickness_list[i]
             a, d = self._P_matrix_diagonal(self.kzs_3d[i], layer_thickness)
-            P_mat = np.array([[a, zero_mat], [zero_mat, d]], dtype=complex)
+            P_mat = np.array([[a, zero_mat], [zero_mat, d]], dtype=self.complex_dtype)
 
             # interface to next layer (Note: it is not j=i+1 since sub-stack can be reverse/shuffled)
             j = idx_list[list(idx_list).index(i) + 1]  # index of next layer
@@ -487,43 +740,138 @@ class TransferMatrix:
         if do_position_resolved:  # save the T-matrix if we want to do position-resolved calculations later
             self.T_mat_save = T_mat
 
+        return T_mat
+
+    def _coherent_sub_stack_matrices_both_polarizations(self, idx_list: List[int]) -> (np.array, np.array):
+        """
+        Transfer matrices (2, 2, wavelength, angle) of a coherent sub-stack (see _coherent_sub_stack_matrix()) for s-
+        and p-polarized light. The propagation phases and the kz-values of the interfaces are evaluated once for both
+        polarizations and the matrix products of both polarizations are done in one step.
+        :return: T_mat_s, T_mat_p
+        """
+
+        if self.use_compiled_kernels:
+            propagation_distances = [0.] + [self.thickness_list[i] for i in idx_list[1:-1]]
+            return compiled_kernels.coherent_sub_stack_matrices_both_polarizations(self.kzs_3d, self.nks_3d, idx_list,
+                                                                                   propagation_distances,
+                                                                                   complex_dtype=self.complex_dtype)
+
+        # initialize transfer matrices (polarization (s, p), wavelength, angle, 2, 2) as identity matrices
+        T_mat = np.zeros((2,) + self.kzs_3d[idx_list[0]].shape + (2, 2), dtype=self.complex_dtype)
+        T_mat[..., 0, 0] = 1.
+        T_mat[..., 1, 1] = 1.
+
+        J_mat = np.zeros(T_mat.shape, dtype=self.complex_dtype)
+
+        for counter, i in enumerate(idx_list[0:-1]):
+            j = idx_list[counter + 1]   # index of next layer
+
+            # propagation in layer i (diagonal matrix -> scale columns), no propagation in the first layer
+            if counter > 0:
+                a, d = self._P_matrix_diagonal(self.kzs_3d[i], self.thickness_list[i])
+                T_mat[..., 0] *= a[..., None]
+                T_mat[..., 1] *= d[..., None]
+
+            # interface to next layer
+            kz_j = self._get_masked_interface_kz(self.kzs_3d[i])
+            for pol_idx, polarization in enumerate([Polarization.S, Polarization.P]):
+                a, b = self._J_coefficients(kz_j, self.kzs_3d[j], self.nks_3d[i], self.nks_3d[j], polarization)
+                J_mat[pol_idx, ..., 0, 0] = a
+                J_mat[pol_idx, ..., 0, 1] = b
+                J_mat[pol_idx, ..., 1, 0] = b
+                J_mat[pol_idx, ..., 1, 1] = a
+
+            T_mat = np.matmul(T_mat, J_mat)
+
+        T_mat = np.transpose(T_mat, (0, 3, 4, 1, 2))
+
+        return T_mat[0], T_mat[1]
+
+    def _get_r_t_R_T_from_matrix(self, T_mat: np.array, idx_list: List[int], polarization: Optional[Polarization] = None
+                                 ) -> (np.array, np.array, np.array, np.array):
+        """
+        Extract amplitude and power coefficients from the transfer matrix of a coherent sub-stack
+        :param polarization: polarization of the transfer matrix (current polarization if None)
+        """
+
         # Net complex transmission and reflection amplitudes
-        T_mat[0, 0] = np.ma.masked_where(T_mat[0, 0] == 0, T_mat[0, 0])  # avoid divide by zero error
+        T_mat_00 = np.ma.masked_where(T_mat[0, 0] == 0, T_mat[0, 0])  # avoid divide by zero error
 
-        r = T_mat[1, 0] / T_mat[0, 0]
-        t = 1. / T_mat[0, 0]
+        r = T_mat[1, 0] / T_mat_00
+        t = 1. / T_mat_00
 
         # Net transmitted and reflected power, as a proportion of the incoming light power
         R = self._R_from_r(r)
-        T = self._T_from_t(t, self.kzs_3d[idx_list[0]], self.kzs_3d[idx_list[-1]])
+        T = self._T_from_t(t, self.kzs_3d[idx_list[0]], self.kzs_3d[idx_list[-1]], polarization)
 
         return r, t, R, T
 
+    def _get_reverse_r_t_R_T_from_matrix(self, T_mat: np.array, idx_list: List[int],
+                                         polarization: Optional[Polarization] = None) -> (np.array, np.array, np.array,
+                                                                                          np.array):
+        """
+        Amplitude and power coefficients of a coherent sub-stack for incidence from the last layer, see
+        _calc_coherent_sub_stack_both_directions()
+        """
+
+        T_mat_00 = np.ma.masked_where(T_mat[0, 0] == 0, T_mat[0, 0])  # avoid divide by zero error
+        r_rev = - T_mat[0, 1] / T_mat_00
+        t_rev = (T_mat[0, 0] * T_mat[1, 1] - T_mat[0, 1] * T_mat[1, 0]) / T_mat_00
+        R_rev = self._R_from_r(r_rev)
+        T_rev = self._T_from_t(t_rev, self.kzs_3d[idx_list[-1]], self.kzs_3d[idx_list[0]], polarization)
+
+        return r_rev, t_rev, R_rev, T_rev
+
+    def _get_sub_stack_key(self, layer_indices: List[int], distance_to_first_interface: float,
+                           polarization: Optional[Polarization] = None) -> tuple:
+        if polarization is None:
+            polarization = self.polarization
+        return (tuple(int(idx) for idx in layer_indices), float(distance_to_first_interface), polarization,
+                self.kz_state_version)
+
+    def _reset_sub_stack_cache(self):
+        """Invalidate all cached sub-stack results (called whenever the kz-values change)"""
+        self.kz_state_version += 1
+        self.sub_stack_cache = {}
+
     def _J_matrix(self, kz_j, kz_i, n_j, n_i):
         """interface matrix for polarized light from layer j to layer i"""
 
-        # avoid divide by zero error
+        a, b = self._J_coefficients(self._get_masked_interface_kz(kz_j), kz_i, n_j, n_i, self.polarization)
+
+        J_mat = np.array([[a, b], [b, a]], dtype=self.complex_dtype)
+        return J_mat
+
+    @staticmethod
+    def _get_masked_interface_kz(kz_j):
+        """kz-values of the first layer of an interface (masked to avoid divide by zero errors)"""
+
         # todo: add mathematical solution for kz=0 values
         kz_j = np.ma.masked_where(kz_j == 0, kz_j)
         kz_j[np.isnan(kz_j)] = 1.e-21
+        return kz_j
 
-        if self.polarization == Polarization.S:
+    @staticmethod
+    def _J_coefficients(kz_j, kz_i, n_j, n_i, polarization: Polarization):
+        """diagonal (a) and off-diagonal (b) elements of the interface matrix from layer j to layer i"""
+
+        if polarization == Polarization.S:
             a = (kz_i + kz_j) / (2. * kz_j)
             b = (kz_j - kz_i) / (2. * kz_j)
-        elif self.polarization == Polarization.P:
+        elif polarization == Polarization.P:
             a = (kz_j * n_i ** 2 + kz_i * n_j ** 2.) / (2. * kz_j * n_i * n_j)
             b = (kz_j * n_i ** 2 - kz_i * n_j ** 2.) / (2. * kz_j * n_i * n_j)
         else:
             raise ValueError("Polarization must be 'Polarization.S' or 'Polarization.p'")
 
-        J_mat = np.array([[a, b], [b, a]], dtype=complex)
-        return J_mat
+        return a, b
 
     def _P_matrix_diagonal(self, kz_i, d_i):
         '''
         Return diagonal elements of propagation matrix of layer i at distance(s) d_i.
         d_i can be array-like or scalar.
         '''
+        d_i = np.asarray(d_i, dtype=self.real_dtype)     # keep the precision of kz (numpy floats would upcast)
         a = np.exp(-1.j * kz_i * d_i)
         d = np.exp(1.j * kz_i * d_i)
         return a, d
@@ -531,8 +879,7 @@ class TransferMatrix:
     def _interface_matrix_incoherent(self, layer_idx_list: List[int]) -> np.array:
         """Calculate interface matrix for transition from layer with index layer_idx to next layer"""
 
-        r, t, R, T = self._calc_coherent_sub_stack(layer_idx_list)
-        r_rev, t_rev, R_rev, T_rev = self._calc_coherent_sub_stack(layer_idx_list[::-1])
+        (r, t, R, T), (r_rev, t_rev, R_rev, T_rev) = self._calc_coherent_sub_stack_both_directions(layer_idx_list)
 
         T = np.ma.masked_where(T == 0, T)  # avoid divide by zero error
 
@@ -553,8 +900,8 @@ class TransferMatrix:
         else:
             thickness = explicit_thickness
 
-        P = np.exp(-2. * thickness * self.kzs_3d[layer_idx].imag)
-        P_mat = np.array([[1. / P, np.zeros(P.shape)], [np.zeros(P.shape), P]], dtype=complex)
+        P = np.exp(-2. * self.real_dtype(thickness) * self.kzs_3d[layer_idx].imag)
+        P_mat = np.array([[1. / P, np.zeros(P.shape)], [np.zeros(P.shape), P]], dtype=self.complex_dtype)
 
         return P_mat
 
@@ -564,27 +911,97 @@ class TransferMatrix:
         """
         return abs(r) ** 2
 
-    def _T_from_t(self, t, kz_i, kz_f):
-        '''[Furno, 2012] (A12), (A13)'''
+    def _T_from_t(self, t, kz_i, kz_f, polarization: Optional[Polarization] = None):
+        '''[Furno, 2012] (A12), (A13), current polarization if None'''
 
-        T = np.zeros(kz_i.shape)
+        if polarization is None:
+            polarization = self.polarization
+
+        T = np.zeros(kz_i.shape, dtype=self.real_dtype)
         rows, cols = np.where(kz_i.real != 0.)  # for purely imaginary kz_i transmission is set to zero
 
-        if self.polarization == Polarization.S:
+        if polarization == Polarization.S:
             T[rows, cols] = abs(t[rows, cols] ** 2) * kz_f[rows, cols].real / kz_i[rows, cols].real
-        elif self.polarization == Polarization.P:
+        elif polarization == Polarization.P:
             T[rows, cols] = abs(t[rows, cols] ** 2) * np.conj(kz_f[rows, cols]).real / np.conj(kz_i[rows, cols]).real
         else:
             raise ValueError("Polarization must be 'Polarization.S' or 'Polarization.P'")
         return T
 
+    def _get_position_grid(self, stepwidth: float) -> np.array:
+        return np.arange(0., np.sum(self.thickness_list[1:-1]), stepwidth)
+
+    def _get_nb_positions_per_block(self, max_memory: float) -> int:
+        """Number of positions per block such that the temporary arrays of a block fit into max_memory (bytes)"""
+
+        nb_complex_arrays_per_position = 12     # field amplitudes, propagation factors and temporaries
+        bytes_per_position = (nb_complex_arrays_per_position * np.prod(self.kzs_3d[0].shape)
+                              * np.dtype(self.complex_dtype).itemsize)
+
+        return max(1, int(max_memory // bytes_per_position))
+
+    def _get_field_amplitudes_after_interfaces(self, nb_coherent_layers: int) -> List[np.array]:
+        """
+        Field amplitudes (E_up, E_down) directly after the top interface of each coherent layer. Start with the known
+        field amplitudes at the bottom semi layer E_N = (t, 0) and go reversely through the coherent layers.
+        Note: If you do the calculation top->bottom you have to invert all matrices which is probably slower
+        """
+
+        current_E_after_interface = np.array([np.ones(self.kzs_3d[0].shape, dtype=self.complex_dtype) * self.t,
+                                              np.zeros(self.kzs_3d[0].shape, dtype=self.complex_dtype)])
+
+        E_after_interface_list = [None] * nb_coherent_layers
+        for idx_coherent in range(nb_coherent_layers)[::-1]:
+            idx_all = idx_coherent + 1
+
+            # cross interface from previous layer (i+1 -> i) and propagate (backwards) through current layer i
+            current_E_after_interface = self._matrices_dot_vectors(self.J_mat_save[idx_all], current_E_after_interface,
+                                                                   np.empty_like(current_E_after_interface))
+            current_E_after_interface = self._matrices_dot_vectors(self.P_mat_save[idx_all], current_E_after_interface,
+                                                                   np.empty_like(current_E_after_interface))
+            E_after_interface_list[idx_coherent] = current_E_after_interface
+
+        return E_after_interface_list
+
+    def _calc_field_poynting_absorption_block(self, E_after_interface: np.array, positions: np.array, layer_idx: int,
+                                              thetas: np.array) -> (np.array, np.array, np.array):
+        """
+        Field intensity, Poynting vector and absorption at the given positions (relative to the top interface) in one
+        layer. Shape of results: (position, wavelength, angle)
+        """
+
+        # calculate position resolved E-field amplitudes by propagating the field directly after the interface
+        a, d = self._P_matrix_diagonal(self.kzs_3d[layer_idx], positions[:, np.newaxis, np.newaxis])
+        E_of_z = np.array([E_after_interface[0] * d,  # NOTE: switched a,d to get forward propagation
+                           E_after_interface[1] * a])
+
+        # -- calculate Poyting vector and absorption from the E-field amplitudes (polarization dependent) --
+        Poynting_outofplane = self._poynting_from_Efield(E_of_z, self.nks_3d[layer_idx], thetas)
+        Absorption = self._absorption_from_Efield(E_of_z, self.nks_3d[layer_idx], thetas, self.kzs_3d[layer_idx])
+
+        # -- add the up and down contribution of the E-field (total field) and square (intensity)
+        if self.polarization == Polarization.S:
+            E_total = E_of_z[0] + E_of_z[1]     # Ey (Ex = Ez = 0)
+        elif self.polarization == Polarization.P:
+            Ex = (E_of_z[0] - E_of_z[1]) * np.cos(thetas)
+            Ez = (-E_of_z[0] - E_of_z[1]) * np.sin(thetas)
+            E_total = np.sqrt(Ex ** 2 + Ez ** 2)
+        else:
+            raise ValueError("Polarization must be 'Polarization.S' or 'Polarization.P'")
+
+        E_intens = np.abs(E_total)
+
+        return E_intens, Poynting_outofplane, Absorption
+
     def _matrices_dot_vectors(self, matrices, vectors, output_array):
         """
         Calculate dot product of an array of 2x2-matrices and an array of 2-vectors,
         save the result in output_array.
+        Note: output_array must not be the vectors array (the first component would be overwritten before it is used).
         """
         output_array[0] = matrices[0, 0] * vectors[0] + matrices[0, 1] * vectors[1]
         output_array[1] = matrices[1, 0] * vectors[0] + matrices[1, 1] * vectors[1]
+        return output_array
 
     def _split_positions_in_layers(self, positions):
         """
@@ -0,0 +1,214 @@
+"""
+Optional compiled (numba) kernels for the TransferMatrix.
+
+The numpy implementation loops over the layers and evaluates full (wavelength, angle) arrays for each propagation and
+interface matrix. The kernels here fuse the complete layer recursion into a single compiled loop over the (wavelength,
+angle) points, i.e. the 2x2 matrix products are evaluated in registers without temporary arrays.
+
+The kernels release the GIL, i.e. TransferMatrix instances can be run in parallel threads.
+
+numba is not a requirement of simojio. If it is not installed, is_available is False and the TransferMatrix uses the
+numpy implementation.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+is_available = numba is not None
+
+
+def coherent_sub_stack_matrix(kzs_3d: np.array, nks_3d: np.array, idx_list, propagation_distances: np.array,
+                              is_p_polarized: bool, complex_dtype) -> np.array:
+    """
+    Transfer matrix (2, 2, wavelength, angle) of a coherent sub-stack, see TransferMatrix._coherent_sub_stack_matrix().
+
+    :param idx_list: layer indices of the sub-stack (in the order of propagation)
+    :param propagation_distances: propagation distance in each layer of idx_list except the last one
+    :param is_p_polarized: True for p-polarized, False for s-polarized light
+    """
+
+    if not is_available:
+        raise ValueError("Compiled kernels not available (numba is not installed)")
+
+    T_mat = np.empty((2, 2) + kzs_3d.shape[1:], dtype=complex_dtype)
+    _coherent_sub_stack_matrix_kernel(kzs_3d, nks_3d, np.asarray(idx_list, dtype=np.int64),
+                                      np.asarray(propagation_distances, dtype=np.float64), is_p_polarized, T_mat)
+    return T_mat
+
+
+def coherent_sub_stack_matrices_both_polarizations(kzs_3d: np.array, nks_3d: np.array, idx_list,
+                                                  propagation_distances: np.array, complex_dtype) -> (np.array,
+                                                                                                      np.array):
+    """
+    Transfer matrices (2, 2, wavelength, angle) of a coherent sub-stack for s- and p-polarized light, see
+    TransferMatrix._coherent_sub_stack_matrices_both_polarizations(). The propagation phases are evaluated once for
+    both polarizations.
+    :return: T_mat_s, T_mat_p
+    """
+
+    if not is_available:
+        raise ValueError("Compiled kernels not available (numba is not installed)")
+
+    T_mat_s = np.empty((2, 2) + kzs_3d.shape[1:], dtype=complex_dtype)
+    T_mat_p = np.empty((2, 2) + kzs_3d.shape[1:], dtype=complex_dtype)
+    _coherent_sub_stack_matrices_both_polarizations_kernel(kzs_3d, nks_3d, np.asarray(idx_list, dtype=np.int64),
+                                                           np.asarray(propagation_distances, dtype=np.float64),
+                                                           T_mat_s, T_mat_p)
+    return T_mat_s, T_mat_p
+
+
+def _coherent_sub_stack_matrix_loop(kzs_3d, nks_3d, idx_arr, propagation_distances, is_p_polarized, T_mat):
+    """
+    Layer recursion T = P[0] * J[0, 1] * P[1] * J[1, 2] * ... for each (wavelength, angle) point.
+    Note: kz = 0 in the first layer of an interface is treated as in the numpy implementation, where these kz-values
+    are masked (see TransferMatrix._get_masked_interface_kz()) and the masked interface matrix elements keep the data of
+    the numerators, i.e. a = kz_i, b = 0 (s) and a = b = 0 (p). kz = nan is replaced by 1e-21.
+    """
+
+    nb_wavelengths = kzs_3d.shape[1]
+    nb_angles = kzs_3d.shape[2]
+
+    for wl_idx in range(nb_wavelengths):
+        for angle_idx in range(nb_angles):
+
+            # start with identity matrix
+            m00 = 1. + 0.j
+            m01 = 0. + 0.j
+            m10 = 0. + 0.j
+            m11 = 1. + 0.j
+
+            for counter in range(len(idx_arr) - 1):
+                i = idx_arr[counter]          # current layer
+                j = idx_arr[counter + 1]      # next layer
+
+                kz_j = complex(kzs_3d[i, wl_idx, angle_idx])
+                kz_i = complex(kzs_3d[j, wl_idx, angle_idx])
+
+                # propagation in current layer (diagonal matrix -> scale columns)
+                phase = 1.j * kz_j * propagation_distances[counter]
+                p_a = np.exp(-phase)
+                p_d = np.exp(phase)
+                m00 *= p_a
+                m10 *= p_a
+                m01 *= p_d
+                m11 *= p_d
+
+                # interface to next layer
+                if np.isnan(kz_j.real) or np.isnan(kz_j.imag):
+                    kz_j = 1.e-21 + 0.j
+
+                if kz_j == 0.:
+                    if is_p_polarized:
+                        a = 0. + 0.j
+                    else:
+                        a = kz_i
+                    b = 0. + 0.j
+                elif is_p_polarized:
+                    n_j = complex(nks_3d[i, wl_idx, angle_idx])
+                    n_i = complex(nks_3d[j, wl_idx, angle_idx])
+                    denominator = 2. * kz_j * n_i * n_j
+                    a = (kz_j * n_i ** 2 + kz_i * n_j ** 2) / denominator
+                    b = (kz_j * n_i ** 2 - kz_i * n_j ** 2) / denominator
+                else:
+                    a = (kz_i + kz_j) / (2. * kz_j)
+                    b = (kz_j - kz_i) / (2. * kz_j)
+
+                m00, m01 = m00 * a + m01 * b, m00 * b + m01 * a
+                m10, m11 = m10 * a + m11 * b, m10 * b + m11 * a
+
+            T_mat[0, 0, wl_idx, angle_idx] = m00
+            T_mat[0, 1, wl_idx, angle_idx] = m01
+            T_mat[1, 0, wl_idx, angle_idx] = m10
+            T_mat[1, 1, wl_idx, angle_idx] = m11
+
+
+def _coherent_sub_stack_matrices_both_polarizations_loop(kzs_3d, nks_3d, idx_arr, propagation_distances, T_mat_s,
+                                                         T_mat_p):
+    """
+    Layer recursion of _coherent_sub_stack_matrix_loop() for s- (s00, ..) and p-polarized (p00, ..) light (same
+    treatment of kz = 0 and kz = nan)
+    """
+
+    nb_wavelengths = kzs_3d.shape[1]
+    nb_angles = kzs_3d.shape[2]
+
+    for wl_idx in range(nb_wavelengths):
+        for angle_idx in range(nb_angles):
+
+            # start with identity matrices
+            s00 = 1. + 0.j
+            s01 = 0. + 0.j
+            s10 = 0. + 0.j
+            s11 = 1. + 0.j
+            p00 = 1. + 0.j
+            p01 = 0. + 0.j
+            p10 = 0. + 0.j
+            p11 = 1. + 0.j
+
+            for counter in range(len(idx_arr) - 1):
+                i = idx_arr[counter]          # current layer
+                j = idx_arr[counter + 1]      # next layer
+
+                kz_j = complex(kzs_3d[i, wl_idx, angle_idx])
+                kz_i = complex(kzs_3d[j, wl_idx, angle_idx])
+
+                # propagation in current layer (same phases for both polarizations)
+                phase = 1.j * kz_j * propagation_distances[counter]
+                p_a = np.exp(-phase)
+                p_d = np.exp(phase)
+                s00 *= p_a
+                s10 *= p_a
+                s01 *= p_d
+                s11 *= p_d
+                p00 *= p_a
+                p10 *= p_a
+                p01 *= p_d
+                p11 *= p_d
+
+                # interface to next layer
+                if np.isnan(kz_j.real) or np.isnan(kz_j.imag):
+                    kz_j = 1.e-21 + 0.j
+                is_masked = kz_j == 0.
+
+                if is_masked:
+                    a = kz_i
+                    b = 0. + 0.j
+                else:
+                    a = (kz_i + kz_j) / (2. * kz_j)
+                    b = (kz_j - kz_i) / (2. * kz_j)
+                s00, s01 = s00 * a + s01 * b, s00 * b + s01 * a
+                s10, s11 = s10 * a + s11 * b, s10 * b + s11 * a
+
+                if is_masked:
+                    a = 0. + 0.j
+                    b = 0. + 0.j
+                else:
+                    n_j = complex(nks_3d[i, wl_idx, angle_idx])
+                    n_i = complex(nks_3d[j, wl_idx, angle_idx])
+                    denominator = 2. * kz_j * n_i * n_j
+                    a = (kz_j * n_i ** 2 + kz_i * n_j ** 2) / denominator
+                    b = (kz_j * n_i ** 2 - kz_i * n_j ** 2) / denominator
+                p00, p01 = p00 * a + p01 * b, p00 * b + p01 * a
+                p10, p11 = p10 * a + p11 * b, p10 * b + p11 * a
+
+            T_mat_s[0, 0, wl_idx, angle_idx] = s00
+            T_mat_s[0, 1, wl_idx, angle_idx] = s01
+            T_mat_s[1, 0, wl_idx, angle_idx] = s10
+            T_mat_s[1, 1, wl_idx, angle_idx] = s11
+            T_mat_p[0, 0, wl_idx, angle_idx] = p00
+            T_mat_p[0, 1, wl_idx, angle_idx] = p01
+            T_mat_p[1, 0, wl_idx, angle_idx] = p10
+            T_mat_p[1, 1, wl_idx, angle_idx] = p11
+
+
+if is_available:
+    _coherent_sub_stack_matrix_kernel = numba.njit(cache=True, nogil=True)(_coherent_sub_stack_matrix_loop)
+    _coherent_sub_stack_matrices_both_polarizations_kernel = numba.njit(cache=True, nogil=True)(
+        _coherent_sub_stack_matrices_both_polarizations_loop)
+else:
+    _coherent_sub_stack_matrix_kernel = None
+    _coherent_sub_stack_matrices_both_polarizations_kernel = None
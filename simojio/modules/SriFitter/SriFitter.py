@@ -16,7 +16,9 @@ class SriFitter(Fitter):
     generic_parameters = []
     for par in sri_plotter.generic_parameters:
         if par.name not in [sri_plotter.enable_grid_par.name,
-                            sri_plotter.normalize_sri_par.name]:
+                            sri_plotter.normalize_sri_par.name,
+                            sri_plotter.live_mode_par.name,
+                            sri_plotter.live_mode_timeout_par.name]:
             generic_parameters.append(par)
 
     for par in sri_simulator.generic_parameters:
@@ -35,7 +37,12 @@ class SriFitter(Fitter):
         self.adf_plot_data_container = None
 
         self.normalized_sri = None
-        self.sri_difference = None
+        self.sri_residuals = None       # experimental - simulated SRI (flattened)
+        self.sri_difference = None      # norm of the residuals
+
+        # indices of the experimental angles in the simulated angles (only built again if the angle grids change)
+        self.angle_index_map_key = None
+        self.angle_index_map = None
 
     def configure_generic_parameters(self):
 
@@ -87,29 +94,21 @@ class SriFitter(Fitter):
     def get_fit_name_and_value(self) -> (str, float):
         return "SRI difference", self.sri_difference
 
+    def get_fit_residuals(self) -> np.array:
+        """Residuals (experimental - simulated normalized SRI) of all angles and wavelengths as flat array"""
+        return self.sri_residuals
+
     def calc_optimization_value(self):
 
         # -- get simulated data --
         # OledOpticsSimulator has no exclude angles function. Remove angles after calculation
-        # -> get indices of angles that are not in the experimental data (excluded angles)
-
-        excluded_angle_values = set(self.sri_simulator.angles_deg) - set(self.sri_plotter.angles)
-        excluded_angles_indices = [list(self.sri_simulator.angles_deg).index(angle) for angle in excluded_angle_values]
-
-        restricted_sri = []
-        for idx, spectrum in enumerate(self.sri_simulator.sri.T):
-            if idx not in excluded_angles_indices:
-                restricted_sri.append(spectrum)
+        # -> select the simulated spectra at the experimental angles
+        sim_angle_indices, normalization_idx = self.get_angle_index_map(self.sri_simulator.angles_deg,
+                                                                        self.sri_plotter.angles)
+        sim_data = self.sri_simulator.sri[:, sim_angle_indices]
 
-        sim_data = np.array(restricted_sri).T
-
-        # normalize simulated spectra to (new) smallest angle (it is calculated without exclude angles before)
-        idx, value = find_nearest(list(self.sri_plotter.angles), 0.)
-        spectrum = sim_data.T[idx]
-        sim_data = sim_data / max(spectrum)
-
-        # re-normalize simulated data (previous normalization angle might have been removed)
-        self.normalized_sri = self.normalize_sri(np.array(self.sri_plotter.angles), sim_data).T
+        # normalize simulated spectra to the (experimental) angle closest to zero deg
+        self.normalized_sri = (sim_data / np.max(sim_data[:, normalization_idx])).T
 
         # plot results
         plot_sri = len(self.sri_plotter.intensities) > 1
@@ -123,7 +122,35 @@ class SriFitter(Fitter):
             self.plot_adf(np.array(self.sri_plotter.angles), self.sri_simulator.wavelengths,
                           [self.sri_plotter.intensities, self.normalized_sri], ['experimental', 'simulated'])
 
-        self.sri_difference = np.linalg.norm(self.sri_plotter.intensities - self.normalized_sri)
+        self.sri_residuals = (self.sri_plotter.intensities - self.normalized_sri).ravel()
+        self.sri_difference = np.linalg.norm(self.sri_residuals)
+
+    def get_angle_index_map(self, simulated_angles: np.array, experimental_angles: np.array) -> (np.array, int):
+        """
+        Indices of the experimental angles in the simulated angles and index of the experimental angle closest to zero
+        deg. The map is only built if one of the angle grids has changed (i.e. usually once per fit).
+        :return: simulated angle indices, normalization index
+        """
+
+        key = (tuple(simulated_angles), tuple(experimental_angles))
+        if key != self.angle_index_map_key:
+            simulated_angles = np.asarray(simulated_angles)
+            experimental_angles = np.asarray(experimental_angles)
+
+            sim_angle_indices = find_nearest_indices(simulated_angles, experimental_angles,
+                                                     sorter=np.argsort(simulated_angles))
+
+            is_missing = simulated_angles[sim_angle_indices] != experimental_angles
+            if np.any(is_missing):
+                raise ValueError("Experimental angles not in simulated angles: "
+                                 + str(list(experimental_angles[is_missing])))
+
+            normalization_idx = int(np.argmin(np.abs(experimental_angles)))
+
+            self.angle_index_map = (sim_angle_indices, normalization_idx)
+            self.angle_index_map_key = key
+
+        return self.angle_index_map
 
     def normalize_sri(self, angles: np.array, intensities: np.array) -> np.array:
         idx, value = find_nearest(angles, 0.)
@@ -4,6 +4,7 @@ from pathlib import Path
 from packaging import version
 import numpy as np
 from simojio.modules.SriPlotter.FitType import FitType
+from simojio.modules.SriPlotter.ProcessedSriCache import ProcessedSriCache
 import datetime
 from simojio.lib.BasicFunctions import find_nearest, savgol_smooth, interpol, project_2d_array_onto_grid
 import matplotlib.pyplot as plt
@@ -37,7 +38,8 @@ class AngleSpectrumReader:
                                       reference_angle: Optional[float] = None, angle_offset: Optional[float] = 0.,
                                       boxcar: Optional[int] = 0, cycle: Optional[int] = 0,
                                       drift_fit_type: Optional[FitType] = FitType.NO,
-                                      normalize: Optional[bool] = True) -> dict:
+                                      normalize: Optional[bool] = True,
+                                      cache: Optional[ProcessedSriCache] = None) -> dict:
         """
         Read and process angle-resolved emission spectrum from experimental data (SweepMe).
         :param path:
@@ -49,9 +51,21 @@ class AngleSpectrumReader:
         :param cycle:
         :param drift_fit_type:
         :param normalize:
+        :param cache: if given, processed data are taken from the cache (unchanged files and parameters) or stored in it
         :return: angles, wavelengths, intensities
         """
 
+        if cache is not None:
+            key = cache.get_key(path, angles=angles, wavelengths=wavelengths, reference_angle=reference_angle,
+                                angle_offset=angle_offset, boxcar=boxcar, cycle=cycle, drift_fit_type=drift_fit_type,
+                                normalize=normalize)
+            data_dict = cache.get(key)
+            if data_dict is None:
+                data_dict = self.read_angle_spectrum_from_path(path, angles, wavelengths, reference_angle,
+                                                               angle_offset, boxcar, cycle, drift_fit_type, normalize)
+                cache.put(key, data_dict)
+            return data_dict
+
         version_str = self._get_sweepme_version(path)
         created = self._get_creation_date(path)
 
@@ -115,42 +129,6 @@ class AngleSpectrumReader:
         :return: times, angles, wavelengths, intensities
         """
 
-        def read_spectrometer_file(file_path: str) -> (np.array, np.array):
-            """Two columns [wavelengths, intensities]. First 3 lines are header."""
-            data = np.loadtxt(file_path, skiprows=3).transpose()
-            return data[0], data[1]
-
-        def read_motor_file(file_path: str) -> (float, float):
-            """
-            Read elapsed time and motor position (angle) from file. Last line are the numerical data. First line is
-            header.
-            """
-            lines = [line.rstrip().split("\t") for line in open(file_path, 'r')]
-
-            time_tags = ["time elapsed", "time"]    # This is auto generated by SweepMe so it shouldn't change to often
-            position_tag = "position"               # combined with name of motor device, but this can be anything
-
-            time_idx = None
-            position_idx = None
-
-            header = [str(item).lower() for item in lines[0]]
-            for time_tag in time_tags:
-                if time_tag in header:
-                    time_idx = header.index(time_tag)
-                    break
-
-            for position_idx, label in enumerate(lines[0]):
-                if position_tag in label.lower():
-                    break
-
-            if (time_idx is None) or (position_idx is None):
-                raise ValueError("Couldn't find time and/or position column in lines[0]" + "\t".join(lines[0]))
-
-            time_str = lines[-1][time_idx]
-            position_str = lines[-1][position_idx]
-
-            return float(time_str), float(position_str)
-
         all_file_names = [f for f in os.listdir(path) if f.endswith(self.file_extension)]
 
         id_list = []
@@ -159,11 +137,7 @@ class AngleSpectrumReader:
         # get all ID strings that are present in the file names
         for file_name in all_file_names:
             if id_tag in file_name:
-                id_tag_containing_components = [component for component in file_name.split("_") if
-                                                component.startswith(id_tag)]
-                if len(id_tag_containing_components) != 1:
-                    raise ValueError("There are multiple or zero ID-tag components in file name: " + file_name)
-                id_str = id_tag_containing_components[0]
+                id_str = self._get_id_str(file_name, id_tag)
                 if id_str not in id_list:
                     id_list.append(id_str)
 
@@ -181,14 +155,63 @@ class AngleSpectrumReader:
         wavelengths = []
         intensities = []
         for motor_file, spec_file in motor_spectrum_file_list:
-            time_elapsed, angle = read_motor_file(os.path.join(path, motor_file))
+            time_elapsed, angle = self._read_motor_file(os.path.join(path, motor_file))
             angles.append(angle)
             times.append(time_elapsed)
-            wavelengths, spectrum = read_spectrometer_file(os.path.join(path, spec_file))
+            wavelengths, spectrum = self._read_spectrometer_file(os.path.join(path, spec_file))
             intensities.append(spectrum)
 
         return times, angles, wavelengths, intensities
 
+    @staticmethod
+    def _get_id_str(file_name: str, id_tag="ID") -> str:
+        """ID string of a SweepMe file name, e.g. ID1-13 for QD_ID1-13_Motor=1.000e+01.txt"""
+
+        id_tag_containing_components = [component for component in file_name.split("_") if
+                                        component.startswith(id_tag)]
+        if len(id_tag_containing_components) != 1:
+            raise ValueError("There are multiple or zero ID-tag components in file name: " + file_name)
+
+        return id_tag_containing_components[0]
+
+    @staticmethod
+    def _read_spectrometer_file(file_path: str) -> (np.array, np.array):
+        """Two columns [wavelengths, intensities]. First 3 lines are header."""
+        data = np.loadtxt(file_path, skiprows=3).transpose()
+        return data[0], data[1]
+
+    @staticmethod
+    def _read_motor_file(file_path: str) -> (float, float):
+        """
+        Read elapsed time and motor position (angle) from file. Last line are the numerical data. First line is
+        header.
+        """
+        lines = [line.rstrip().split("\t") for line in open(file_path, 'r')]
+
+        time_tags = ["time elapsed", "time"]    # This is auto generated by SweepMe so it shouldn't change to often
+        position_tag = "position"               # combined with name of motor device, but this can be anything
+
+        time_idx = None
+        position_idx = None
+
+        header = [str(item).lower() for item in lines[0]]
+        for time_tag in time_tags:
+            if time_tag in header:
+                time_idx = header.index(time_tag)
+                break
+
+        for position_idx, label in enumerate(lines[0]):
+            if position_tag in label.lower():
+                break
+
+        if (time_idx is None) or (position_idx is None):
+            raise ValueError("Couldn't find time and/or position column in lines[0]" + "\t".join(lines[0]))
+
+        time_str = lines[-1][time_idx]
+        position_str = lines[-1][position_idx]
+
+        return float(time_str), float(position_str)
+
     @staticmethod
     def _get_creation_date(path: Path) -> str:
         """
@@ -226,10 +249,27 @@ class AngleSpectrumReader:
         :return: angles, wavelengths, intensities
         """
 
-        project_onto_grid = not ((angles_grid is None) and (wavelengths_grid is None))
-
         # (1) smooth the experimental spectra
-        intensities = np.array(savgol_smooth(exp_intensities, boxcar, polyorder=2))
+        intensities = self._smooth_spectra(exp_intensities, boxcar)
+
+        return self._process_smoothed_sri(exp_times, exp_angles, exp_wavelengths, intensities, angles_grid,
+                                          wavelengths_grid, reference_angle, angle_offset, cycle,
+                                          intensity_drift_fit_type, normalize)
+
+    @staticmethod
+    def _smooth_spectra(exp_intensities: np.array, boxcar: int) -> np.array:
+        """Smooth each spectrum (row) separately, i.e. new spectra can be smoothed independently of the others."""
+        return np.array(savgol_smooth(exp_intensities, boxcar, polyorder=2))
+
+    def _process_smoothed_sri(self, exp_times: np.array, exp_angles: np.array, exp_wavelengths: np.array,
+                              intensities: np.array, angles_grid: Optional[List[float]] = None,
+                              wavelengths_grid: Optional[List[float]] = None,
+                              reference_angle: Optional[float] = None, angle_offset: Optional[float] = 0.,
+                              cycle: Optional[int] = 0, intensity_drift_fit_type: Optional[FitType] = FitType.NO,
+                              normalize: Optional[bool] = True) -> dict:
+        """Steps (2) - (4) of _process_sri() for already smoothed spectra"""
+
+        project_onto_grid = not ((angles_grid is None) and (wavelengths_grid is None))
 
         # (2) correct for overall intensity decrease by fitting additional intermediate measurements at reference angle
         intensities, data_maxima, data_fit, data_corr = self._correct_intensity_drift(exp_times=exp_times,
@@ -287,7 +327,6 @@ class AngleSpectrumReader:
         else:
             # get spectra at reference angle
             idx_list = np.where(exp_angles == reference_angle)[0]
-            spectra_list = [exp_intensities[i] for i in idx_list]
 
             # get wavelength range (min/max index) in which to find the maximum intensity
             # Note: if projection onto angle-wavelength grid is disabled, the whole wavelength range is used
@@ -298,10 +337,10 @@ class AngleSpectrumReader:
                 max_idx, max_value = find_nearest(exp_wavelengths, max(wavelengths_grid))
 
             # get maxima of reference spectra (normalize to first value)
-            maxima_list = [max(spectrum[min_idx: (max_idx + 1)]) for spectrum in spectra_list]
-            normalized_maxima = np.array(maxima_list) / maxima_list[0]
+            maxima = np.max(exp_intensities[idx_list, min_idx: (max_idx + 1)], axis=1)
+            normalized_maxima = maxima / maxima[0]
 
-            times_for_maxima = [exp_times[idx] for idx in idx_list]
+            times_for_maxima = exp_times[idx_list]
 
             fit_values = self._fit_maxima_of_reference_spectra(times_for_maxima, normalized_maxima,
                                                                intensity_drift_fit_type, exp_times)
@@ -312,7 +351,7 @@ class AngleSpectrumReader:
             data_corr = [exp_times, correction_array]
 
             # correct intensities
-            intensities = np.array([exp_intensities[i] * correction_array[i] for i in range(len(exp_angles))])
+            intensities = exp_intensities * correction_array[:, np.newaxis]
 
         return intensities, data_maxima, data_fit, data_corr
 
@@ -391,122 +430,72 @@ class AngleSpectrumReader:
         :return:
         """
 
-        def get_slope_idx(value, left_value=None, right_value=None):
-            if (left_value is None) and (right_value is None):
-                return 0
-            elif left_value is None:
-                if right_value > value:
-                    return 1
-                elif right_value < value:
-                    return -1
-                else:
-                    return 0
-            elif right_value is None:
-                if left_value > value:
-                    return -1
-                elif left_value < value:
-                    return 1
-                else:
-                    return 0
-            else:
-                if (left_value < value) and (right_value > value):
-                    return 1
-                elif (left_value > value) and (right_value < value):
-                    return -1
-                else:
-                    return 0
-
-        def get_slope_idx_of_previous_undefined(idx_to_check):
-
-            if (angles[idx_to_check] == reference_angle) and (slope_idx_list[idx_to_check] == 0):
-                return 0
-            else:
-                # go to left/right until not reference angle found -> get slope from those values
-                left_value = None
-                right_value = None
-
-                total_idx_range = range(len(angles))
-
-                # go to left
-                current_idx = idx_to_check - 1
-                while current_idx in total_idx_range:
-                    if (angles[current_idx] == reference_angle) and (slope_idx_list[current_idx] == 0):
-                        pass
-                    else:
-                        left_value = angles[current_idx]
-                        break
-                    current_idx -= 1
-
-                # go to right
-                current_idx = idx_to_check + 1
-                while current_idx in total_idx_range:
-                    if (angles[current_idx] == reference_angle) and (slope_idx_list[current_idx] == 0):
-                        pass
-                    else:
-                        right_value = angles[current_idx]
-                        break
-                    current_idx += 1
-
-                return get_slope_idx(angles[idx_to_check], left_value, right_value)
-
-        def split_cycles():
-            # return list of index lists, one for each cycle (they still include the reference points)
-            # a new cycle is identified by a changing slope of the angles (e.g., in slope_idx_list 1 -> -1)
-
-            all_indices = list(np.arange(len(angles)))
-            cycle_start_indices = []
-            current_slope = None
-
-            for i in range(len(slope_idx_list)):
-                if slope_idx_list[i] != 0:
-                    if current_slope is None:
-                        current_slope = slope_idx_list[i]
-                    if slope_idx_list[i] != current_slope:
-                        cycle_start_indices.append(i)
-                        current_slope = slope_idx_list[i]
-
-            cycle_idx_lists = []
-            last_start_idx = 0
-            for i in range(len(cycle_start_indices)):
-                cycle_idx_lists.append(all_indices[last_start_idx:cycle_start_indices[i]])
-                last_start_idx = cycle_start_indices[i]
-
-            cycle_idx_lists.append(all_indices[last_start_idx:])  # append last cycle
-
-            return cycle_idx_lists
+        angles = np.asarray(angles)
 
         # -- identify angle cycles by rising/ falling angle values, difficulty: reference angles in between --
         # Note: need to keep the measurements that are in the row, e.g. keep reference angle 10 in row 8,9,10,11,12 but
         # kick it out in row 1,2,3,10,4,5,6
 
         # 1) check for decreasing/increasing values of direct neighbours
-        slope_idx_list = []  # list of slope-indices indicating a positive (1), undefined (0), or negative (-1) slope
-        for idx, angle in enumerate(angles):
-            if (idx == 0) or (idx == len(angles) - 1):  # first and last point are undefined
-                slope_idx_list.append(0)
-            else:
-                slope_idx_list.append(get_slope_idx(angle, angles[idx - 1], angles[idx + 1]))
+        # slope-indices indicating a positive (1), undefined (0), or negative (-1) slope
+        # Note: first and last point are undefined
+        slope_indices = self._get_slope_indices(angles)
 
         # 2) double check undefined values, if neighbour is reference angle, check next neighbour
-        for idx, slope_idx in enumerate(slope_idx_list):
-            if slope_idx_list[idx] == 0:
-                slope_idx_list[idx] = get_slope_idx_of_previous_undefined(idx)
-
-        # 3) get spectra of given cycle without reference spectra
-        cycle_idx_lists = split_cycles()
-        if cycle > len(cycle_idx_lists) - 1:
-            cycle_idx_list = cycle_idx_lists[0]
+        # -> undefined reference angles are skipped, the slope of the remaining undefined values is given by their
+        # neighbours in the remaining angles (one-sided at the boundaries)
+        if reference_angle is None:
+            is_skipped = np.zeros(len(angles), dtype=bool)
         else:
-            cycle_idx_list = cycle_idx_lists[cycle]
+            is_skipped = (angles == reference_angle) & (slope_indices == 0)
+        remaining_indices = np.flatnonzero(~is_skipped)
+        remaining_slope_indices = self._get_slope_indices(angles[remaining_indices], one_sided_boundaries=True)
+        is_undefined = slope_indices[remaining_indices] == 0
+        slope_indices[remaining_indices[is_undefined]] = remaining_slope_indices[is_undefined]
+
+        # 3) split cycles: a new cycle is identified by a changing slope of the angles (e.g., 1 -> -1)
+        # (they still include the reference points)
+        defined_indices = np.flatnonzero(slope_indices)
+        defined_slope_indices = slope_indices[defined_indices]
+        cycle_start_indices = defined_indices[1:][defined_slope_indices[1:] != defined_slope_indices[:-1]]
+        cycle_bounds = np.concatenate(([0], cycle_start_indices, [len(angles)]))
+        cycle_ranges = list(zip(cycle_bounds[:-1], cycle_bounds[1:]))
+
+        # 4) get spectra of given cycle without reference spectra
+        if cycle > len(cycle_ranges) - 1:
+            start_idx, stop_idx = cycle_ranges[0]
+        else:
+            start_idx, stop_idx = cycle_ranges[cycle]
+
+        cycle_indices = np.arange(start_idx, stop_idx)
+        cycle_indices = cycle_indices[slope_indices[cycle_indices] != 0]
+
+        return angles[cycle_indices], wavelengths, np.asarray(intensities)[cycle_indices]
+
+    @staticmethod
+    def _get_slope_indices(values: np.array, one_sided_boundaries=False) -> np.array:
+        """
+        Slope-index of each value, i.e. 1 (-1) if the value is strictly between its left and right neighbour with
+        increasing (decreasing) values, otherwise 0.
+        :param values:
+        :param one_sided_boundaries: if True, the slope-index of the first (last) value is given by its right (left)
+        neighbour only, otherwise it is 0
+        :return: slope_indices (int array)
+        """
+
+        slope_indices = np.zeros(len(values), dtype=int)
+        if len(values) < 2:
+            return slope_indices
+
+        steps = np.sign(np.diff(values)).astype(int)
+        is_monotonic = steps[:-1] == steps[1:]
+        slope_indices[1:-1] = np.where(is_monotonic, steps[:-1], 0)
 
-        intensities_new = []
-        angles_new = []
-        for idx in cycle_idx_list:
-            if slope_idx_list[idx] != 0:
-                angles_new.append(angles[idx])
-                intensities_new.append(intensities[idx])
+        if one_sided_boundaries:
+            slope_indices[0] = steps[0]
+            slope_indices[-1] = steps[-1]
 
-        return np.array(angles_new), wavelengths, np.array(intensities_new)
+        return slope_indices
 
     def _project_sri_onto_grid(self, angles: np.array, wavelengths: np.array, intensities: np.array,
                                angles_grid: np.array, wavelengths_grid: np.array, angle_offset: float) -> (
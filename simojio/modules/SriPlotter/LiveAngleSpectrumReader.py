@@ -0,0 +1,154 @@
+from typing import List, Optional
+import os
+from pathlib import Path
+import numpy as np
+from simojio.modules.SriPlotter.AngleSpectrumReader import AngleSpectrumReader
+from simojio.modules.SriPlotter.FitType import FitType
+
+
+class LiveAngleSpectrumReader(AngleSpectrumReader):
+    """
+    Incremental version of the AngleSpectrumReader for measurements that are still running.
+
+    The SweepMe results folder is polled with update(). Only the file pairs (motor file, spectrometer file) of new
+    measurement steps are read and their spectra are smoothed once. The smoothed spectra are kept in memory, i.e.
+    get_data_dict() only repeats the drift correction, the cycle selection, the projection and the normalization on the
+    data in memory (no files are read again).
+    """
+
+    # minimum number of reference spectra for the intensity drift fit (no correction until then)
+    min_nb_reference_spectra = 2
+
+    def __init__(self, path: Path, angles: Optional[List[float]] = None, wavelengths: Optional[List[float]] = None,
+                 reference_angle: Optional[float] = None, angle_offset: Optional[float] = 0.,
+                 boxcar: Optional[int] = 0, cycle: Optional[int] = 0,
+                 drift_fit_type: Optional[FitType] = FitType.NO, normalize: Optional[bool] = True):
+        """Parameters as for AngleSpectrumReader.read_angle_spectrum_from_path()"""
+
+        super().__init__()
+
+        self.path = path
+        self.angles_grid = angles
+        self.wavelengths_grid = wavelengths
+        self.reference_angle = reference_angle
+        self.angle_offset = angle_offset
+        self.boxcar = boxcar
+        self.cycle = cycle
+        self.drift_fit_type = drift_fit_type
+        self.normalize = normalize
+
+        self.read_id_strs = set()           # measurement steps that have been read already
+        self.pending_file_sizes = {}        # {id_str: file sizes} of steps that might still be written
+
+        # data of all read measurement steps (the arrays grow by doubling their capacity)
+        self.nb_steps = 0
+        self.exp_times = np.zeros(0)
+        self.exp_angles = np.zeros(0)
+        self.exp_wavelengths = None
+        self.smoothed_intensities = None
+
+    def update(self) -> bool:
+        """
+        Read the measurement steps that have been completed since the last update.
+        Note: a step is read once both of its files exist and their sizes did not change since the previous update
+        (i.e. SweepMe finished writing them).
+        :return: True if new measurement steps have been read
+        """
+
+        files_per_id = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(self.file_extension) and "ID" in entry.name:
+                    id_str = self._get_id_str(entry.name)
+                    if id_str not in self.read_id_strs:
+                        files_per_id.setdefault(id_str, []).append((entry.name, entry.stat().st_size))
+
+        completed_id_strs = []
+        for id_str, files in files_per_id.items():
+            if len(files) != 2:
+                continue
+            file_sizes = tuple(sorted(files))
+            if self.pending_file_sizes.get(id_str) == file_sizes:
+                completed_id_strs.append(id_str)
+            else:
+                self.pending_file_sizes[id_str] = file_sizes
+
+        if len(completed_id_strs) == 0:
+            return False
+
+        # read in order of the measurement steps (e.g. "ID1-9" before "ID1-10")
+        for id_str in sorted(completed_id_strs, key=self._get_step_numbers):
+            # sort by length of file-name str (the spectrometer file name is longer, see _eval_sweepme_files())
+            motor_file, spec_file = sorted([file_name for file_name, size in files_per_id[id_str]], key=len)
+
+            time_elapsed, angle = self._read_motor_file(os.path.join(self.path, motor_file))
+            wavelengths, spectrum = self._read_spectrometer_file(os.path.join(self.path, spec_file))
+            self._append_step(time_elapsed, angle, wavelengths, spectrum)
+
+            self.read_id_strs.add(id_str)
+            del self.pending_file_sizes[id_str]
+
+        return True
+
+    def get_nb_steps(self) -> int:
+        return self.nb_steps
+
+    def has_spectra_of_cycle(self) -> bool:
+        """True if the selected angle cycle contains any spectra (except for the reference spectra) yet"""
+
+        if self.nb_steps == 0:
+            return False
+
+        angles, wavelengths, intensities = self._get_spectra_of_cycle_without_reference_spectra(
+            self.exp_angles[:self.nb_steps], self.exp_wavelengths, self.smoothed_intensities[:self.nb_steps],
+            self.reference_angle, self.cycle)
+
+        return len(angles) > 0
+
+    def get_data_dict(self) -> dict:
+        """Processed data of all steps read so far, see AngleSpectrumReader.read_angle_spectrum_from_path()"""
+
+        if self.nb_steps == 0:
+            raise ValueError("No measurement steps found in " + str(self.path))
+
+        exp_angles = self.exp_angles[:self.nb_steps]
+
+        drift_fit_type = self.drift_fit_type
+        if np.count_nonzero(exp_angles == self.reference_angle) < self.min_nb_reference_spectra:
+            drift_fit_type = FitType.NO
+
+        return self._process_smoothed_sri(exp_times=self.exp_times[:self.nb_steps],
+                                          exp_angles=exp_angles,
+                                          exp_wavelengths=self.exp_wavelengths,
+                                          intensities=self.smoothed_intensities[:self.nb_steps],
+                                          angles_grid=self.angles_grid,
+                                          wavelengths_grid=self.wavelengths_grid,
+                                          reference_angle=self.reference_angle,
+                                          angle_offset=self.angle_offset,
+                                          cycle=self.cycle,
+                                          intensity_drift_fit_type=drift_fit_type,
+                                          normalize=self.normalize)
+
+    def _append_step(self, time_elapsed: float, angle: float, wavelengths: np.array, spectrum: np.array):
+
+        if self.exp_wavelengths is None:
+            self.exp_wavelengths = wavelengths
+            self.smoothed_intensities = np.zeros((0, len(wavelengths)))
+        elif len(wavelengths) != len(self.exp_wavelengths):
+            raise ValueError("Number of wavelengths changed during the measurement: " + str(len(wavelengths)))
+
+        if self.nb_steps == len(self.exp_angles):
+            capacity = max(2 * self.nb_steps, 16)
+            self.exp_times = np.resize(self.exp_times, capacity)
+            self.exp_angles = np.resize(self.exp_angles, capacity)
+            self.smoothed_intensities = np.resize(self.smoothed_intensities, (capacity, len(self.exp_wavelengths)))
+
+        self.exp_times[self.nb_steps] = time_elapsed
+        self.exp_angles[self.nb_steps] = angle
+        self.smoothed_intensities[self.nb_steps] = self._smooth_spectra(np.array([spectrum]), self.boxcar)[0]
+        self.nb_steps += 1
+
+    @staticmethod
+    def _get_step_numbers(id_str: str) -> tuple:
+        """(branch, step) of an ID string, e.g. (1, 13) for ID1-13"""
+        return tuple(int(number) for number in id_str[len("ID"):].split("-"))
@@ -0,0 +1,118 @@
+import os
+import json
+import pickle
+import hashlib
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+
+class ProcessedSriCache:
+    """
+    Cache of processed experimental SRI data (see AngleSpectrumReader.read_angle_spectrum_from_path()).
+
+    The key is a hash of the content of all files in the measurement folder and of the processing parameters. Changed
+    files or parameters result in a new key, i.e. the cache never needs to be invalidated explicitly. The processed data
+    are kept in memory (shared by all instances within a process, e.g. for the steps of an optimization) and optionally
+    written to disk to be reused in later runs.
+    """
+
+    # {key: data_dict} shared by all instances within a process (the oldest entries are removed first)
+    memory_cache = {}
+    max_nb_memory_entries = 20
+
+    # {folder path: (file states, content hash)} -> the files are only read again if their size or mtime has changed
+    folder_hash_registry = {}
+
+    def __init__(self, disk_cache_dir: Optional[str] = None):
+        """
+        :param disk_cache_dir: directory in which the processed data are stored (None: memory cache only)
+        """
+
+        self.disk_cache_dir = disk_cache_dir
+
+    def get_key(self, path: Path, **processing_parameters) -> str:
+        """Hash of the folder content and the processing parameters"""
+
+        parameters_str = json.dumps(processing_parameters, sort_keys=True, default=self._to_json_compatible)
+
+        key_hash = hashlib.sha256()
+        key_hash.update(self._get_folder_hash(path).encode())
+        key_hash.update(parameters_str.encode())
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Processed data of the key or None if not cached. Note: the returned data must not be changed."""
+
+        if key in self.memory_cache:
+            return self.memory_cache[key]
+
+        if self.disk_cache_dir is not None:
+            file_path = self._get_disk_cache_file_path(key)
+            if os.path.isfile(file_path):
+                try:
+                    with open(file_path, 'rb') as cache_file:
+                        data_dict = pickle.load(cache_file)
+                except Exception as e:
+                    print("WARNING: Cached SRI data could not be read from '" + file_path + "': " + str(e))
+                    return None
+                self._add_to_memory_cache(key, data_dict)
+                return data_dict
+
+        return None
+
+    def put(self, key: str, data_dict: dict):
+
+        self._add_to_memory_cache(key, data_dict)
+
+        if self.disk_cache_dir is not None:
+            os.makedirs(self.disk_cache_dir, exist_ok=True)
+            file_path = self._get_disk_cache_file_path(key)
+
+            # write to a temporary file first (several processes might write the same entry at the same time)
+            tmp_file_path = file_path + "." + str(os.getpid()) + ".tmp"
+            with open(tmp_file_path, 'wb') as cache_file:
+                pickle.dump(data_dict, cache_file)
+            os.replace(tmp_file_path, file_path)
+
+    def _add_to_memory_cache(self, key: str, data_dict: dict):
+
+        self.memory_cache[key] = data_dict
+        while len(self.memory_cache) > self.max_nb_memory_entries:
+            del self.memory_cache[next(iter(self.memory_cache))]
+
+    def _get_disk_cache_file_path(self, key: str) -> str:
+        return os.path.join(self.disk_cache_dir, key + ".pkl")
+
+    def _get_folder_hash(self, path: Path) -> str:
+        """Hash of the names and contents of all files in the folder (sub-folders are ignored)"""
+
+        file_states = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    file_states.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        file_states = tuple(sorted(file_states))
+
+        folder_key = os.path.abspath(path)
+        if folder_key in self.folder_hash_registry and self.folder_hash_registry[folder_key][0] == file_states:
+            return self.folder_hash_registry[folder_key][1]
+
+        content_hash = hashlib.sha256()
+        for file_name, size, mtime in file_states:
+            content_hash.update(file_name.encode())
+            with open(os.path.join(path, file_name), 'rb') as f:
+                content_hash.update(f.read())
+
+        self.folder_hash_registry[folder_key] = (file_states, content_hash.hexdigest())
+
+        return content_hash.hexdigest()
+
+    @staticmethod
+    def _to_json_compatible(value):
+        if isinstance(value, Enum):
+            return value.value
+        if hasattr(value, "tolist"):    # numpy arrays and numbers
+            return value.tolist()
+        return str(value)
@@ -1,4 +1,5 @@
 from abc import ABC
+import time
 import matplotlib.pyplot as plt
 
 # imports for simoji interface
@@ -8,6 +9,8 @@ from simojio.lib.parameters import *
 # imports of SriReader module
 from simojio.modules.SriPlotter.AngleSpectrumReader import AngleSpectrumReader
 from simojio.modules.SriPlotter.FitType import FitType
+from simojio.modules.SriPlotter.ProcessedSriCache import ProcessedSriCache
+from simojio.modules.SriPlotter.LiveAngleSpectrumReader import LiveAngleSpectrumReader
 from simojio.lib.BasicFunctions import *
 
 
@@ -36,10 +39,25 @@ class SriPlotter(Plotter, ABC):
     enable_grid_par = BoolParameter(name="enable angle-wavelength grid", value=True,
                                     description="select whether to project the data onto the angle-wavelength grid")
 
+    disk_cache_par = BoolParameter(name="cache processed data on disk", value=False,
+                                   description="Keep the processed data in modules/SriPlotter/processed_data_cache "
+                                               "to reuse them in later runs (for unchanged data and parameters)")
+
+    live_mode_par = BoolParameter(name="live mode", value=False,
+                                  description="Watch the SRI data folder of a running measurement and update the plots "
+                                              "for each new measurement step")
+    live_mode_timeout_par = FloatParameter(name="live mode timeout", value=60., bounds=(0., np.inf),
+                                           description="Stop watching the SRI data folder after this time (s) "
+                                                       "without new measurement steps")
+
     generic_parameters = [angles_par, wavelengths_par, boxcar_par, reference_angle_par,
                                               intensity_drift_fit_type_par, exclude_angles_par, cycle_par,
                                               normalize_sri_par,
-                                              angle_offset_par, enable_grid_par]
+                                              angle_offset_par, enable_grid_par, disk_cache_par, live_mode_par,
+                                              live_mode_timeout_par]
+
+    disk_cache_dir = os.path.join("modules", "SriPlotter", "processed_data_cache")
+    live_mode_poll_interval = 1.    # time (s) between two checks for new measurement steps in live mode
 
     # -- evaluation set parameters --
     path_par = PathParameter(name="SRI data", value=["exp_data"], description="Path to folder containing SRI data",
@@ -51,6 +69,7 @@ class SriPlotter(Plotter, ABC):
         super().__init__()
 
         self.angle_spectrum_reader = AngleSpectrumReader()
+        self.processed_sri_cache = ProcessedSriCache()     # processed data are not read/processed again if unchanged
 
         self.intensities = None
         self.wavelengths = None
@@ -79,6 +98,9 @@ class SriPlotter(Plotter, ABC):
 
         self.new_data = False
 
+        self.live_mode_bool = False
+        self.live_mode_timeout = 60.
+
     def update_generic_parameters(self):
         """
         This method is called for each execution step of the module. E.g. in optimization mode, the module instance
@@ -107,9 +129,17 @@ class SriPlotter(Plotter, ABC):
         self.reference_angle = self.get_generic_parameter_value(self.reference_angle_par)
         self.drift_fit_type = FitType(self.get_generic_parameter_value(self.intensity_drift_fit_type_par))
 
+        self.live_mode_bool = self.get_generic_parameter_value(self.live_mode_par)
+        self.live_mode_timeout = self.get_generic_parameter_value(self.live_mode_timeout_par)
+
+        if self.get_generic_parameter_value(self.disk_cache_par):
+            self.processed_sri_cache.disk_cache_dir = self.disk_cache_dir
+        else:
+            self.processed_sri_cache.disk_cache_dir = None
+
     def update_evaluation_set_parameters(self):
 
-        self.new_data = True    # todo: Add check, if data have been updated to avoid repeated data loading
+        self.new_data = True    # unchanged data are not processed again (see processed_sri_cache)
         self.sri_data_path = convert_list_to_path_str(self.get_evaluation_parameter_value(self.path_par))
 
     def run(self):
@@ -117,7 +147,9 @@ class SriPlotter(Plotter, ABC):
         self.update_generic_parameters()
         self.update_evaluation_set_parameters()
 
-        if self.new_data:
+        if self.live_mode_bool:
+            self.run_live_mode()
+        elif self.new_data:
             data_dict = self.angle_spectrum_reader.read_angle_spectrum_from_path(path=self.sri_data_path,
                                                                                  angles=self.angle_grid,
                                                                                  wavelengths=self.wavelength_grid,
@@ -126,22 +158,52 @@ class SriPlotter(Plotter, ABC):
                                                                                  boxcar=self.boxcar,
                                                                                  cycle=self.cycle,
                                                                                  drift_fit_type=self.drift_fit_type,
-                                                                                 normalize=self.normalize_bool)
-
-            # plot angle-spectra
-            self.angles = data_dict[self.angle_spectrum_reader.angles_label]
-            self.wavelengths = data_dict[self.angle_spectrum_reader.wavelengths_label]
-            self.intensities = data_dict[self.angle_spectrum_reader.intensities_label]
-
-            self.plot_adf(self.angles, self.wavelengths, self.intensities)
-            self.plot_sri(self.angles, self.wavelengths, self.intensities)
+                                                                                 normalize=self.normalize_bool,
+                                                                                 cache=self.processed_sri_cache)
+            self.plot_data(data_dict)
 
-            # plot intensity drift correction
-            data_max = data_dict[self.angle_spectrum_reader.maxima_label]
-            data_fit = data_dict[self.angle_spectrum_reader.fit_label]
-            data_corr = data_dict[self.angle_spectrum_reader.corrected_label]
+    def run_live_mode(self):
+        """
+        Watch the SRI data folder of a running measurement. Only new measurement steps are read and processed (see
+        LiveAngleSpectrumReader) and the plots are updated after each change. The live mode ends if no new
+        measurement step appeared within the live mode timeout.
+        """
 
-            self.plot_intensity_drift_corr(data_max, data_fit, data_corr)
+        live_reader = LiveAngleSpectrumReader(path=self.sri_data_path,
+                                              angles=self.angle_grid,
+                                              wavelengths=self.wavelength_grid,
+                                              reference_angle=self.reference_angle,
+                                              angle_offset=self.angle_offset,
+                                              boxcar=self.boxcar,
+                                              cycle=self.cycle,
+                                              drift_fit_type=self.drift_fit_type,
+                                              normalize=self.normalize_bool)
+
+        last_update_time = time.time()
+        while time.time() - last_update_time <= self.live_mode_timeout:
+            if live_reader.update():
+                last_update_time = time.time()
+                if live_reader.has_spectra_of_cycle():
+                    self.plot_data(live_reader.get_data_dict())
+            time.sleep(self.live_mode_poll_interval)
+
+    def plot_data(self, data_dict: dict):
+        """Plot the processed data of the AngleSpectrumReader"""
+
+        # plot angle-spectra
+        self.angles = data_dict[self.angle_spectrum_reader.angles_label]
+        self.wavelengths = data_dict[self.angle_spectrum_reader.wavelengths_label]
+        self.intensities = data_dict[self.angle_spectrum_reader.intensities_label]
+
+        self.plot_adf(self.angles, self.wavelengths, self.intensities)
+        self.plot_sri(self.angles, self.wavelengths, self.intensities)
+
+        # plot intensity drift correction
+        data_max = data_dict[self.angle_spectrum_reader.maxima_label]
+        data_fit = data_dict[self.angle_spectrum_reader.fit_label]
+        data_corr = data_dict[self.angle_spectrum_reader.corrected_label]
+
+        self.plot_intensity_drift_corr(data_max, data_fit, data_corr)
 
     def plot_adf(self, angles: np.array, wavelengths: np.array, intensities: np.array):
         """
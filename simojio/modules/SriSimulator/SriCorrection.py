@@ -1,7 +1,6 @@
 import simojio.lib.BasicFunctions as basic
 
 import numpy as np
-from scipy.interpolate import InterpolatedUnivariateSpline
 import scipy.integrate as integrate
 import scipy.optimize as scopt
 
@@ -123,44 +122,53 @@ class SriCorrection:
                              + str(intensities.shape[0]))
 
         # -- interpolate intensities to simulation angle grid (use trapz integration afterwards) --
-        intensities_interpolated = []
-        for idx, wavelength in enumerate(wavelengths):
-            intensities_wl = InterpolatedUnivariateSpline(angles, intensities[idx], k=1)
-            intensities_interpolated.append(intensities_wl(self.angles))
-        intensities_interpolated = np.array(intensities_interpolated)
-
-        # -- calculate altered intensity for each detector angle (step by step) --
-        intensities_corrected = []
-        boundary_angles = []
-        for detector_angle in angles:
+        intensities_interpolated = self.interpolate_on_angle_grid(angles, intensities)
 
-            [min_angle, max_angle] = self.calculate_boundary_angles(detector_angle)
-            if self.plot_boundary_angles_flag:
-                boundary_angles.append([min_angle, max_angle])
+        # -- integral from the first grid angle to each grid angle (the range integrals follow as differences) --
+        cumulative_intensities = integrate.cumulative_trapezoid(intensities_interpolated, dx=self.angle_stepwidth,
+                                                                axis=1, initial=0.)
 
-            idx_min_angle, value = basic.find_nearest(list(self.angles), min_angle)
-            idx_max_angle, value = basic.find_nearest(list(self.angles), max_angle)
+        # -- calculate the boundary angles for each detector angle --
+        boundary_angles = np.array([self.calculate_boundary_angles(detector_angle) for detector_angle in angles])
+        if self.plot_boundary_angles_flag:
+            self.plot_boundary_angles(angles, boundary_angles.T[0] - angles, boundary_angles.T[1] - angles)
 
-            if idx_min_angle == idx_max_angle:
-                intensities_at_angle = intensities_interpolated.T[idx_min_angle]
-            else:
-                intensities_at_angle = []
-                for idx, wavelength in enumerate(wavelengths):
-                    integrated_intensity = integrate.trapz(intensities_interpolated[idx][idx_min_angle:idx_max_angle],
-                                                           dx=self.angle_stepwidth)
-                    intensities_at_angle.append(integrated_intensity)
+        # nearest grid indices of the boundary angles
+        boundary_indices = basic.find_nearest_indices(self.angles, boundary_angles)
+        idx_min_angle = boundary_indices[:, 0]
+        idx_max_angle = boundary_indices[:, 1]
 
-            intensities_corrected.append(intensities_at_angle)
+        # -- integrate the intensities over the boundary angles of each detector angle --
+        # Note: the integration range is given by the grid slice [idx_min_angle:idx_max_angle] (last point excluded)
+        integrated_intensities = (cumulative_intensities[:, np.maximum(idx_max_angle - 1, 0)]
+                                  - cumulative_intensities[:, idx_min_angle])
+        integrated_intensities[:, idx_max_angle <= idx_min_angle] = 0.
 
-        if self.plot_boundary_angles_flag:
-            bounds_1 = np.array(boundary_angles).T[0]
-            bounds_2 = np.array(boundary_angles).T[1]
-            self.plot_boundary_angles(angles, bounds_1 - angles, bounds_2 - angles)
+        # for a single boundary index, the intensity at that angle is used
+        is_single_angle = idx_min_angle == idx_max_angle
+        integrated_intensities[:, is_single_angle] = intensities_interpolated[:, idx_min_angle[is_single_angle]]
 
-        intensities_normalized = self.normalize_sri(angles, np.array(intensities_corrected).T)
+        intensities_normalized = self.normalize_sri(angles, integrated_intensities)
 
         return angles, wavelengths, intensities_normalized
 
+    def interpolate_on_angle_grid(self, angles: np.array, intensities: np.array) -> np.array:
+        """
+        Linear interpolation of the intensities (wavelength, angle) onto the simulation angle grid for all wavelengths at
+        once. Outside the given angles, the intensities are extrapolated linearly from the first/last two angles.
+        :param angles: increasing angles (deg)
+        :return: intensities (wavelength, simulation angle)
+        """
+
+        angles = np.asarray(angles, dtype=float)
+
+        # index of the right neighbour of each grid angle (first/last interval for extrapolation)
+        right_indices = np.clip(np.searchsorted(angles, self.angles), 1, len(angles) - 1)
+        left_indices = right_indices - 1
+        weights = (self.angles - angles[left_indices]) / (angles[right_indices] - angles[left_indices])
+
+        return intensities[:, left_indices] * (1. - weights) + intensities[:, right_indices] * weights
+
     def calculate_boundary_angles(self, detector_angle_deg: float) -> list:
         """
         For a given detector angle, calculate the emission angles that correspond to the two rays that hit the edges of
@@ -377,7 +385,7 @@ class SriCorrection:
 
     def normalize_sri(self, angles: np.array, intensities: np.array) -> np.array:
         """Normalize SRI to maximum of spectrum at angle closest to zero deg."""
-        idx, value = basic.find_nearest(list(angles), 0.)
+        idx, value = basic.find_nearest(angles, 0.)
         spectrum = intensities.T[idx]
         return intensities / max(spectrum)
 
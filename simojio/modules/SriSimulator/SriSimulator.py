@@ -27,7 +27,9 @@ class SriSimulator(Calculator):
     generic_parameters = [
         oled_optics_simulator.polarization_par,
         oled_optics_simulator.wavelengths_par,
-        oled_optics_simulator.angles_par
+        oled_optics_simulator.angles_par,
+        oled_optics_simulator.u_grid_mode_par,
+        oled_optics_simulator.sri_mode_par
     ]
 
     # sri correction